@@ -0,0 +1,104 @@
+"""
+Integrator accuracy/cost benchmark for the CartPoleSwingUp dynamics.
+
+Rolls a batch of initial states forward under a fixed random action sequence with every
+integrator and substep count, and compares the trajectories against a high-resolution
+RK4 reference (many substeps per environment step). For each configuration it reports:
+
+- trajectory error: RMS deviation from the reference over all steps and states
+  (angles compared on the circle)
+- final error: RMS deviation at the last step
+- wall-clock cost of one ``CartPoleSwingUpEnv.step`` call with that configuration
+
+The cheapest configuration whose trajectory error is below ``--target-error`` is
+printed at the end.
+
+Usage:
+    python benchmarks/integrators.py [--steps 50] [--batch 256] [--target-error 1e-3]
+"""
+
+import argparse
+import time
+
+import numpy as np
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, CartPoleSwingUpFunctional
+
+INTEGRATORS = ("euler", "semi_implicit_euler", "rk4")
+SUBSTEPS = (1, 2, 4, 8, 16)
+
+
+def rollout(integrator, substeps, states, actions, params):
+    """Trajectory of shape (T, B, 4) under a (T, B, 1) action sequence."""
+    func = CartPoleSwingUpFunctional({"integrator": integrator, "substeps": substeps})
+    trajectory = np.empty((actions.shape[0],) + states.shape)
+    for t, action in enumerate(actions):
+        states = func.transition(states, action, None, params)
+        trajectory[t] = states
+    return trajectory
+
+
+def state_error(trajectory, reference):
+    """Per-element deviation with angles wrapped to [-pi, pi)."""
+    error = trajectory - reference
+    error[..., 2] = ((error[..., 2] + np.pi) % (2 * np.pi)) - np.pi
+    return error
+
+
+def step_cost(integrator, substeps, actions, repeats):
+    """Median seconds per CartPoleSwingUpEnv.step call."""
+    env = CartPoleSwingUpEnv(integrator=integrator, substeps=substeps, time_limit=10**9)
+    env.reset(seed=0)
+    times = []
+    for _ in range(repeats):
+        env.reset(options={"initial_state": [0.0, 0.0, np.pi, 0.0]})
+        start = time.perf_counter()
+        for action in actions:
+            env.step(action)
+        times.append((time.perf_counter() - start) / len(actions))
+    return sorted(times)[repeats // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--steps", type=int, default=50, help="environment steps per trajectory")
+    parser.add_argument("--batch", type=int, default=256, help="number of initial states")
+    parser.add_argument("--dt", type=float, default=0.1, help="environment time step")
+    parser.add_argument("--reference-substeps", type=int, default=512, help="RK4 substeps of the reference")
+    parser.add_argument("--target-error", type=float, default=1e-3, help="accuracy target (RMS)")
+    parser.add_argument("--repeats", type=int, default=5, help="timing repetitions")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    params = CartPoleSwingUpFunctional().get_default_params(dt=args.dt)
+    states = rng.normal(loc=[0.0, 0.0, np.pi, 0.0], scale=0.05, size=(args.batch, 4))
+    actions = rng.uniform(-1.0, 1.0, size=(args.steps, args.batch, 1))
+
+    reference = rollout("rk4", args.reference_substeps, states, actions, params)
+    timing_actions = actions[:, 0].astype(np.float32)
+
+    results = []
+    print(f"{'integrator':<22}{'substeps':>9}{'traj RMS':>12}{'final RMS':>12}{'us/step':>10}")
+    for integrator in INTEGRATORS:
+        for substeps in SUBSTEPS:
+            error = state_error(rollout(integrator, substeps, states, actions, params), reference)
+            trajectory_rms = float(np.sqrt(np.mean(error**2)))
+            final_rms = float(np.sqrt(np.mean(error[-1] ** 2)))
+            cost = step_cost(integrator, substeps, timing_actions, args.repeats)
+            results.append((integrator, substeps, trajectory_rms, cost))
+            print(f"{integrator:<22}{substeps:>9}{trajectory_rms:>12.3e}{final_rms:>12.3e}{cost * 1e6:>10.2f}")
+
+    feasible = [r for r in results if r[2] <= args.target_error]
+    if feasible:
+        integrator, substeps, error, cost = min(feasible, key=lambda r: r[3])
+        print(
+            f"\nCheapest configuration with trajectory RMS <= {args.target_error:g}: "
+            f"integrator={integrator!r}, substeps={substeps} ({cost * 1e6:.2f} us/step)"
+        )
+    else:
+        print(f"\nNo configuration reaches trajectory RMS <= {args.target_error:g}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Control-step latency and swing-up success of the MPPI reference controller.
+
+Runs :class:`MPPIController` on ``CartPoleSwingUpEnv`` for
+``--episodes`` episodes of ``--steps`` steps each, starting from the usual pole-down
+initial states. An episode counts as a swing-up success if the cart never leaves the
+track and ``cos(theta) > --upright`` holds for each of the last ``--hold`` steps.
+
+Reports per cost mode the median and 95th-percentile latency of one
+control step (planning only), the success rate, the mean return and the mean time to
+first upright. With ``--output`` the results are also written as JSON.
+
+Usage:
+    python benchmarks/mpc.py
+    python benchmarks/mpc.py --num-samples 4000 --horizon 20
+"""
+
+import argparse
+import json
+import time
+
+import numpy as np
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv
+from gymnasium_cartpole_swingup.mpc import MPPIController
+
+
+def run_episode(env, controller, steps, seed, upright):
+    """Latencies (s), upright flags, return and termination flag of one episode."""
+    env.reset(seed=seed)
+    controller.reset()
+    latencies, upright_flags, total = [], [], 0.0
+    terminated = False
+    for _ in range(steps):
+        start = time.perf_counter()
+        action = controller(env.state)
+        latencies.append(time.perf_counter() - start)
+        _, reward, terminated, truncated, _ = env.step(action)
+        total += reward
+        upright_flags.append(np.cos(env.state[2]) > upright)
+        if terminated or truncated:
+            break
+    return latencies, upright_flags, total, terminated
+
+
+def evaluate(cost_mode, args):
+    env = CartPoleSwingUpEnv(cost_mode=cost_mode)
+    kwargs = {"seed": 0}
+    if args.num_samples is not None:
+        kwargs["num_samples"] = args.num_samples
+    if args.horizon is not None:
+        kwargs["horizon"] = args.horizon
+    controller = MPPIController(env, **kwargs)
+
+    latencies, returns, successes, upright_times = [], [], [], []
+    for episode in range(args.episodes):
+        episode_latencies, upright_flags, total, terminated = run_episode(
+            env, controller, args.steps, episode, args.upright
+        )
+        latencies.extend(episode_latencies)
+        returns.append(total)
+        held = len(upright_flags) >= args.hold and all(upright_flags[-args.hold :])
+        successes.append(not terminated and held)
+        if any(upright_flags):
+            upright_times.append(upright_flags.index(True) * env.dt)
+
+    latencies = np.array(latencies) * 1e3
+    return {
+        "cost_mode": cost_mode,
+        "num_samples": controller.num_samples,
+        "horizon": controller.horizon,
+        "num_iterations": controller.num_iterations,
+        "latency_median_ms": float(np.median(latencies)),
+        "latency_p95_ms": float(np.percentile(latencies, 95)),
+        "success_rate": float(np.mean(successes)),
+        "mean_return": float(np.mean(returns)),
+        "mean_time_to_upright_s": float(np.mean(upright_times)) if upright_times else None,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--cost-modes", nargs="*", default=["default", "pilco"], choices=["default", "pilco"])
+    parser.add_argument("--episodes", type=int, default=10)
+    parser.add_argument("--steps", type=int, default=150, help="steps per episode")
+    parser.add_argument("--hold", type=int, default=30, help="final steps that must be upright")
+    parser.add_argument("--upright", type=float, default=0.9, help="cos(theta) threshold")
+    parser.add_argument("--num-samples", type=int, help="override the controller default")
+    parser.add_argument("--horizon", type=int, help="override the controller default")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    header = f"{'cost':<9}{'K':>6}{'H':>4}{'median ms':>11}{'p95 ms':>9}{'success':>9}{'return':>9}{'upright s':>11}"
+    print(header)
+    results = []
+    for cost_mode in args.cost_modes:
+        result = evaluate(cost_mode, args)
+        results.append(result)
+        upright = result["mean_time_to_upright_s"]
+        print(
+            f"{cost_mode:<9}{result['num_samples']:>6}{result['horizon']:>4}"
+            f"{result['latency_median_ms']:>11.2f}{result['latency_p95_ms']:>9.2f}"
+            f"{result['success_rate']:>9.0%}{result['mean_return']:>9.1f}"
+            f"{'-' if upright is None else f'{upright:.1f}':>11}",
+            flush=True,
+        )
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Startup benchmark for the CartPoleSwingUp environment.
+
+Measures the costs paid by every freshly spawned worker process before it can
+step an environment:
+
+- import time of ``gymnasium_cartpole_swingup`` (in a clean interpreter)
+- whether importing the package pulls in pygame
+- ``gym.make("CartPoleSwingUp-v0")`` construction time
+- pickled size of a constructed environment, as sent to ``AsyncVectorEnv`` workers
+
+Usage:
+    python benchmarks/startup.py [--repeats 20]
+"""
+
+import argparse
+import pickle
+import subprocess
+import sys
+import time
+
+import gymnasium as gym
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+
+IMPORT_SNIPPET = """
+import sys, time
+start = time.perf_counter()
+import gymnasium_cartpole_swingup
+elapsed = time.perf_counter() - start
+print(elapsed, "pygame" in sys.modules)
+"""
+
+BASELINE_SNIPPET = """
+import time
+start = time.perf_counter()
+import gymnasium
+print(time.perf_counter() - start)
+"""
+
+
+def measure_import(repeats):
+    """Median package import time and gymnasium-only baseline, in seconds."""
+    package_times, baseline_times = [], []
+    pygame_loaded = False
+    for _ in range(repeats):
+        out = subprocess.check_output([sys.executable, "-c", IMPORT_SNIPPET], text=True)
+        elapsed, loaded = out.split()
+        package_times.append(float(elapsed))
+        pygame_loaded = pygame_loaded or loaded == "True"
+        out = subprocess.check_output([sys.executable, "-c", BASELINE_SNIPPET], text=True)
+        baseline_times.append(float(out))
+    return sorted(package_times)[repeats // 2], sorted(baseline_times)[repeats // 2], pygame_loaded
+
+
+def measure_make(repeats):
+    """Median ``gym.make`` time in seconds."""
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        env = gym.make("CartPoleSwingUp-v0")
+        times.append(time.perf_counter() - start)
+        env.close()
+    return sorted(times)[repeats // 2]
+
+
+def measure_pickle():
+    """Pickled size in bytes of a fresh and of a reset environment."""
+    env = gym.make("CartPoleSwingUp-v0")
+    fresh = len(pickle.dumps(env))
+    env.reset(seed=0)
+    reset = len(pickle.dumps(env))
+    env.close()
+    return fresh, reset
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--repeats", type=int, default=20, help="repetitions per measurement")
+    args = parser.parse_args()
+
+    package_import, gymnasium_import, pygame_loaded = measure_import(args.repeats)
+    make_time = measure_make(args.repeats)
+    fresh_size, reset_size = measure_pickle()
+
+    print(f"import gymnasium_cartpole_swingup: {package_import * 1e3:8.2f} ms")
+    print(f"import gymnasium (baseline):       {gymnasium_import * 1e3:8.2f} ms")
+    print(f"  pygame imported:                 {pygame_loaded}")
+    print(f"gym.make('CartPoleSwingUp-v0'):    {make_time * 1e6:8.1f} us")
+    print(f"pickled env (fresh / after reset): {fresh_size} / {reset_size} bytes")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,276 @@
+"""
+Throughput benchmark suite with regression checks for the CartPoleSwingUp environment.
+
+Measures the rate of the operations on a training hot path:
+
+- ``CartPoleSwingUpEnv.step`` for every obs_mode/cost_mode combination and with ``jit=True``
+- ``step`` through the ``gym.make("CartPoleSwingUp-v0")`` wrapper stack
+- ``step`` with a trivial ``custom_reward_fn`` (overhead against the plain step, timed
+  in alternating runs)
+- ``reset``
+- ``render()`` in ``rgb_array`` mode (frames per second)
+- ``CartPoleSwingUpVectorEnv.step`` at several batch sizes (sub-environment steps per second)
+
+Each benchmark first runs untimed for ``--warmup`` seconds, then ``--repeats`` timed
+runs of at least ``--min-time`` seconds each. Its rate is that of the fastest run, the
+one least disturbed by the rest of the system; the median run is reported alongside.
+Results are printed as a table and, with ``--output``, written as JSON. Given a
+previous JSON file as ``--baseline``, the script exits with status 1 if any benchmark
+present in both is slower than the baseline by more than ``--threshold`` (a fraction,
+e.g. 0.1 for 10%). Benchmarks over the threshold are re-measured up to ``--retries``
+times first, so that a single noisy measurement does not fail the check.
+
+Usage:
+    python benchmarks/throughput.py --output current.json
+    python benchmarks/throughput.py --baseline release.json --threshold 0.1
+"""
+
+import argparse
+import contextlib
+import gc
+import json
+import platform
+import sys
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_cartpole_swingup
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, CartPoleSwingUpVectorEnv
+from gymnasium_cartpole_swingup.kernels import NUMBA_AVAILABLE
+
+OBS_MODES = ("raw", "trig", "pixels")
+COST_MODES = ("default", "pilco")
+VECTOR_SIZES = (1, 64, 1024, 16384)
+
+
+def _calls_per_second(operation, min_time):
+    """Rate of ``operation()`` calls over one run of at least ``min_time`` seconds."""
+    calls = 0
+    start = time.perf_counter()
+    while True:
+        operation()
+        calls += 1
+        elapsed = time.perf_counter() - start
+        if elapsed >= min_time:
+            return calls / elapsed
+
+
+@contextlib.contextmanager
+def _gc_disabled():
+    """Like timeit, keep garbage collection pauses out of the timed runs."""
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+def measure(operation, min_time, repeats, warmup, units_per_call=1):
+    """Best and median rate (units per second) of ``operation()`` over ``repeats`` timed runs."""
+    # Warm up caches, lazy imports, compilation and the CPU clock before timing
+    _calls_per_second(operation, warmup)
+    with _gc_disabled():
+        rates = sorted(
+            _calls_per_second(operation, min_time) * units_per_call for _ in range(repeats)
+        )
+    return rates[-1], rates[repeats // 2]
+
+
+def paired_overhead(operation, reference, min_time, repeats, warmup):
+    """
+    Median extra seconds per call of ``operation()`` over ``reference()``.
+
+    The two are timed in alternating runs, so that both see the same system load;
+    comparing rates measured minutes apart can even give a negative overhead.
+    """
+    _calls_per_second(reference, warmup)
+    _calls_per_second(operation, warmup)
+    with _gc_disabled():
+        differences = sorted(
+            1.0 / _calls_per_second(operation, min_time) - 1.0 / _calls_per_second(reference, min_time)
+            for _ in range(repeats)
+        )
+    return differences[repeats // 2]
+
+
+def stepper(env, num_envs=None):
+    """Step ``env`` with a fixed action, resetting whenever a scalar episode ends."""
+    shape = (1,) if num_envs is None else (num_envs, 1)
+    action = np.full(shape, 0.5, dtype=np.float32)
+    env.reset(seed=0)
+
+    def step():
+        result = env.step(action)
+        if num_envs is None and (result[2] or result[3]):
+            env.reset()
+
+    return step
+
+
+def benchmark_cases(vector_sizes):
+    """Yield ``(name, unit, factory)``; ``factory()`` returns ``(operation, units_per_call, env)``."""
+    for obs_mode in OBS_MODES:
+        for cost_mode in COST_MODES:
+            yield (
+                f"step[obs={obs_mode},cost={cost_mode}]",
+                "steps/s",
+                lambda o=obs_mode, c=cost_mode: _scalar(CartPoleSwingUpEnv(obs_mode=o, cost_mode=c)),
+            )
+    yield "step[jit]", "steps/s", lambda: _scalar(CartPoleSwingUpEnv(jit=True))
+    yield "step[gym.make]", "steps/s", lambda: _scalar(gym.make("CartPoleSwingUp-v0"))
+    yield (
+        "step[custom_reward_fn]",
+        "steps/s",
+        lambda: _scalar(CartPoleSwingUpEnv(custom_reward_fn=_zero_reward)),
+    )
+    yield "reset", "resets/s", _reset
+    yield "render[rgb_array]", "frames/s", _render
+    for num_envs in vector_sizes:
+        yield (
+            f"vector_step[N={num_envs}]",
+            "env-steps/s",
+            lambda n=num_envs: (stepper(CartPoleSwingUpVectorEnv(num_envs=n), n), n),
+        )
+
+
+def _zero_reward(state, action, next_state):
+    return 0.0
+
+
+def _scalar(env):
+    return stepper(env), 1
+
+
+def _reset():
+    env = CartPoleSwingUpEnv()
+    env.reset(seed=0)
+    return env.reset, 1
+
+
+def _render():
+    env = CartPoleSwingUpEnv(render_mode="rgb_array")
+    step = stepper(env)
+
+    def step_and_render():
+        step()
+        env.render()
+
+    return step_and_render, 1
+
+
+def run(args):
+    results = {}
+    for name, unit, factory in benchmark_cases(args.vector_sizes):
+        if args.filter and not any(pattern in name for pattern in args.filter):
+            continue
+        operation, units_per_call = factory()
+        rate, median = measure(operation, args.min_time, args.repeats, args.warmup, units_per_call)
+        results[name] = {"rate": rate, "median": median, "unit": unit}
+        print(f"{name:<34}{rate:>16,.0f} {unit:<12} (median {median:,.0f})", flush=True)
+
+    if "step[obs=raw,cost=default]" in results and "step[custom_reward_fn]" in results:
+        overhead = paired_overhead(
+            _scalar(CartPoleSwingUpEnv(custom_reward_fn=_zero_reward))[0],
+            _scalar(CartPoleSwingUpEnv())[0],
+            args.min_time,
+            args.repeats,
+            args.warmup,
+        )
+        results["step[custom_reward_fn]"]["overhead_us"] = overhead * 1e6
+        print(f"custom_reward_fn overhead: {overhead * 1e6:.2f} us/step")
+    return results
+
+
+def metadata():
+    return {
+        "package_version": gymnasium_cartpole_swingup.__version__,
+        "python": sys.version.split()[0],
+        "numpy": np.__version__,
+        "gymnasium": gym.__version__,
+        "numba": NUMBA_AVAILABLE,
+        "platform": platform.platform(),
+        "machine": platform.machine(),
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+    }
+
+
+def find_regressions(results, baseline, threshold):
+    """Names, baseline and current rates of benchmarks slower than ``(1 - threshold)`` x baseline."""
+    regressions = []
+    for name, entry in results.items():
+        reference = baseline.get(name)
+        if reference is None:
+            continue
+        if entry["rate"] < reference["rate"] * (1.0 - threshold):
+            regressions.append((name, reference["rate"], entry["rate"]))
+    return regressions
+
+
+def remeasure(results, names, args):
+    """Measure the named benchmarks again, keeping the best rate of every attempt."""
+    for name, _, factory in benchmark_cases(args.vector_sizes):
+        if name not in names:
+            continue
+        operation, units_per_call = factory()
+        rate, _ = measure(operation, args.min_time, args.repeats, args.warmup, units_per_call)
+        results[name]["rate"] = max(results[name]["rate"], rate)
+        print(f"{name:<34}{rate:>16,.0f} {results[name]['unit']} (re-measured)", flush=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--output", help="write results as JSON to this path")
+    parser.add_argument("--baseline", help="JSON results of a previous run to compare against")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed fractional slowdown vs the baseline")
+    parser.add_argument("--min-time", type=float, default=0.2, help="minimum seconds per timed run")
+    parser.add_argument("--repeats", type=int, default=9, help="timed runs per benchmark")
+    parser.add_argument("--warmup", type=float, default=0.5, help="untimed seconds before each benchmark")
+    parser.add_argument(
+        "--retries",
+        type=int,
+        default=2,
+        help="times a benchmark slower than the baseline is re-measured before it counts as a regression",
+    )
+    parser.add_argument(
+        "--vector-sizes",
+        type=lambda s: [int(n) for n in s.split(",")],
+        default=list(VECTOR_SIZES),
+        help="comma-separated num_envs values for the vector benchmarks",
+    )
+    parser.add_argument("--filter", nargs="*", help="only run benchmarks whose name contains one of these")
+    args = parser.parse_args()
+
+    report = {"metadata": metadata(), "results": run(args)}
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)["results"]
+        regressions = find_regressions(report["results"], baseline, args.threshold)
+        # A real slowdown persists; a run disturbed by the rest of the system does not
+        for _ in range(args.retries):
+            if not regressions:
+                break
+            remeasure(report["results"], {name for name, _, _ in regressions}, args)
+            regressions = find_regressions(report["results"], baseline, args.threshold)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+
+    if args.baseline:
+        for name, reference, current in regressions:
+            print(
+                f"REGRESSION {name}: {current:,.0f} vs baseline {reference:,.0f} "
+                f"({(1 - current / reference) * 100:.1f}% slower)"
+            )
+        if regressions:
+            sys.exit(1)
+        print(f"No regressions beyond {args.threshold:.0%} against {args.baseline}")
+
+
+if __name__ == "__main__":
+    main()
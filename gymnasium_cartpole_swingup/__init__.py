@@ -8,16 +8,60 @@ where the pole starts in a downward position and must be swung up and balanced.
 from gymnasium.envs.registration import register
 
 from gymnasium_cartpole_swingup.cartpole_swingup import CartPoleSwingUpEnv
+from gymnasium_cartpole_swingup.functional import (
+    CartPoleSwingUpFunctional,
+    CartPoleSwingUpParams,
+)
+from gymnasium_cartpole_swingup.mpc import MPPIController
+from gymnasium_cartpole_swingup.parallel import CartPoleSwingUpParallelVectorEnv
+from gymnasium_cartpole_swingup.profiling import PhaseProfiler
+from gymnasium_cartpole_swingup.recording import (
+    RecordTransitions,
+    RecordTransitionsVector,
+    TransitionDataset,
+    TransitionRecorder,
+)
+from gymnasium_cartpole_swingup.remote import RemoteCartPoleSwingUpEnv, SimulationServer
+from gymnasium_cartpole_swingup.rewards import (
+    batched_reward,
+    default_reward,
+    default_reward_gradient,
+    pilco_reward,
+    pilco_reward_gradient,
+)
+from gymnasium_cartpole_swingup.vector import CartPoleSwingUpVectorEnv
+from gymnasium_cartpole_swingup.viewer import LiveViewer
 
 # Register the environment with Gymnasium
 register(
     id="CartPoleSwingUp-v0",
     entry_point="gymnasium_cartpole_swingup.cartpole_swingup:CartPoleSwingUpEnv",
+    vector_entry_point="gymnasium_cartpole_swingup.vector:CartPoleSwingUpVectorEnv",
     max_episode_steps=1000,
 )
 
 # Explicitly export variables and classes to help with linting and import detection
-__all__ = ["CartPoleSwingUpEnv"]
+__all__ = [
+    "CartPoleSwingUpEnv",
+    "CartPoleSwingUpFunctional",
+    "CartPoleSwingUpParallelVectorEnv",
+    "CartPoleSwingUpParams",
+    "CartPoleSwingUpVectorEnv",
+    "LiveViewer",
+    "MPPIController",
+    "PhaseProfiler",
+    "RecordTransitions",
+    "RecordTransitionsVector",
+    "RemoteCartPoleSwingUpEnv",
+    "SimulationServer",
+    "TransitionDataset",
+    "TransitionRecorder",
+    "batched_reward",
+    "default_reward",
+    "default_reward_gradient",
+    "pilco_reward",
+    "pilco_reward_gradient",
+]
 
 # Version is defined here as the single source of truth
 # When updating version, only change it here
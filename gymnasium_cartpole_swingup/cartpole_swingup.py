@@ -1,11 +1,128 @@
+import array
 import math
 
 import gymnasium as gym
 import numpy as np
-import pygame  # Pygame is used for rendering (initialized when needed)
-import pygame.gfxdraw
 from gymnasium import spaces
 
+from gymnasium_cartpole_swingup.kernels import (
+    COST_MODE_CODES,
+    INTEGRATOR_CODES,
+    _get_kernels,
+    _reward,
+    step_kernel,
+)
+from gymnasium_cartpole_swingup.profiling import PhaseProfiler
+from gymnasium_cartpole_swingup.rendering import (
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    PygameRenderer,
+    _import_pygame,
+    pixel_observation,
+)
+from gymnasium_cartpole_swingup.rewards import is_batched_reward
+from gymnasium_cartpole_swingup.viewer import LiveViewer
+
+# Supported integration schemes for the equations of motion
+INTEGRATORS = ("euler", "semi_implicit_euler", "rk4")
+
+# Whether a float32 scalar times a Python float stays float32 (NumPy >= 2, NEP 50),
+# which decides the rounding of the force computed in step
+_FLOAT32_SCALAR_PRODUCT = (np.float32(1.0) * 0.1).dtype == np.float32
+
+# Layout of the flat float64 array returned by get_state: the physical state, the step
+# counter, then the PCG64 generator state as six 64-bit words stored bit for bit
+SNAPSHOT_SIZE = 11
+_MASK64 = (1 << 64) - 1
+
+
+def encode_rng_state(generator):
+    """Bit-cast the state of a PCG64 ``np.random.Generator`` into six float64 values."""
+    state = generator.bit_generator.state
+    if state["bit_generator"] != "PCG64":
+        raise ValueError(f"Cannot snapshot a {state['bit_generator']} generator; only PCG64 is supported")
+    inner = state["state"]
+    words = [
+        inner["state"] >> 64,
+        inner["state"] & _MASK64,
+        inner["inc"] >> 64,
+        inner["inc"] & _MASK64,
+        state["has_uint32"],
+        state["uinteger"],
+    ]
+    return np.array(words, dtype=np.uint64).view(np.float64)
+
+
+def decode_rng_state(generator, encoded):
+    """Restore a generator state produced by :func:`encode_rng_state`."""
+    words = [int(w) for w in np.ascontiguousarray(encoded, dtype=np.float64).view(np.uint64)]
+    generator.bit_generator.state = {
+        "bit_generator": "PCG64",
+        "state": {"state": (words[0] << 64) | words[1], "inc": (words[2] << 64) | words[3]},
+        "has_uint32": words[4],
+        "uinteger": words[5],
+    }
+
+
+def resolve_dtypes(dtype):
+    """
+    State and observation dtypes for the ``dtype`` option of the environments.
+
+    None keeps float64 states with float32 observations; float32 or float64 selects
+    that precision for both.
+    """
+    if dtype is None:
+        return np.dtype(np.float64), np.dtype(np.float32)
+    dtype = np.dtype(dtype)
+    if dtype not in (np.float32, np.float64):
+        raise ValueError(f"Invalid dtype: {dtype}. Must be float32, float64 or None")
+    return dtype, dtype
+
+
+def make_observation_space(
+    obs_mode: str,
+    x_threshold: float,
+    pixel_width: int = 64,
+    pixel_height: int = 64,
+    grayscale: bool = False,
+    dtype=np.float32,
+) -> spaces.Box:
+    """Build the single-environment observation space for the given obs_mode."""
+    if obs_mode == "raw":
+        # Original: [x, x_dot, theta, theta_dot]
+        high = np.array([
+            x_threshold * 2,
+            np.finfo(dtype).max,
+            np.pi * 2,
+            np.finfo(dtype).max
+        ], dtype=dtype)
+        return spaces.Box(low=-high, high=high, dtype=dtype)
+    elif obs_mode == "trig":
+        # Trigonometric: [x, x_dot, sin(theta), cos(theta), theta_dot]
+        high = np.array([
+            x_threshold * 2,
+            np.finfo(dtype).max,
+            1.0,  # sin(theta)
+            1.0,  # cos(theta)
+            np.finfo(dtype).max
+        ], dtype=dtype)
+        low = np.array([
+            -x_threshold * 2,
+            -np.finfo(dtype).max,
+            -1.0,  # sin(theta)
+            -1.0,  # cos(theta)
+            -np.finfo(dtype).max
+        ], dtype=dtype)
+        return spaces.Box(low=low, high=high, dtype=dtype)
+    elif obs_mode == "pixels":
+        # Rendered frame: (height, width, 3) RGB or (height, width, 1) grayscale
+        channels = 1 if grayscale else 3
+        return spaces.Box(
+            low=0, high=255, shape=(pixel_height, pixel_width, channels), dtype=np.uint8
+        )
+    else:
+        raise ValueError(f"Invalid obs_mode: {obs_mode}. Must be 'raw', 'trig' or 'pixels'")
+
 
 class CartPoleSwingUpEnv(gym.Env):
     """
@@ -27,12 +144,49 @@ class CartPoleSwingUpEnv(gym.Env):
         time_limit (int): Maximum number of steps per episode.
         cost_mode (str): Reward function mode ('default' or 'pilco').
         sigma_c (float): Parameter for PILCO reward function.
-        obs_mode (str): Observation mode ('raw' or 'trig').
-        custom_reward_fn (callable): Custom reward function.
+        obs_mode (str): Observation mode ('raw', 'trig' or 'pixels').
+        custom_reward_fn (callable): Custom reward function. Functions marked with
+            ``batched_reward`` receive arrays of ``dtype`` with a leading batch
+            dimension of one. With ``preallocate=True`` the state arrays passed to
+            either kind are buffers reused by the next step: copy them to keep them.
         initial_state_mean (np.ndarray): Mean of the initial state distribution [x, x_dot, theta, theta_dot].
             Default is [0.0, 0.0, π, 0.0] (pole pointing down).
         initial_state_noise (np.ndarray): Standard deviation for each state component.
             Default is [0.05, 0.05, 0.05, 0.05].
+        integrator (str): Integration scheme ('euler', 'semi_implicit_euler' or 'rk4').
+            Default is 'euler', the original explicit Euler update.
+        substeps (int): Number of integrator steps of length dt / substeps per step.
+        jit (bool): Compile the fused step kernel (dynamics, built-in reward and
+            termination) with Numba when it is installed (and cached on disk). Without
+            it the same kernel runs as pure Python. This speeds up the dynamics only,
+            so the gain is largest with ``preallocate=True`` or with ``substeps`` and
+            'rk4', where the per-step action and observation handling weighs less.
+        profile (bool): Record the time spent in each phase of ``step`` and ``render``
+            in ``self.profiler`` (a :class:`PhaseProfiler`). The built-in reward and
+            the termination check are part of the 'step.dynamics' phase.
+        dtype: Precision of the state and of the observations: np.float32 (less
+            memory and bandwidth in large batches) or np.float64 (accuracy over long
+            horizons). The default None keeps float64 states, stored as a tuple of
+            Python floats, with float32 observations. A dtype stores the state as an
+            array of that dtype. The scalar step always computes in Python floats
+            (float64): float32 only rounds the stored state after every step, so it
+            saves no work here and differs slightly from the batched variants, which
+            compute in float32.
+        preallocate (bool): Step without allocating: the state is a persistent
+            array updated in place, observations are written into one reused buffer
+            and the info dict is reused. The returned observation and info are
+            overwritten by the next ``step`` or ``reset``; copy them to keep them. Not
+            available for obs_mode='pixels'.
+        obs_buffer (np.ndarray): Caller-provided buffer of the observation shape and
+            dtype that receives observations (implies ``preallocate=True``).
+        pixel_width (int): Observation width in pixels when obs_mode is 'pixels'.
+        pixel_height (int): Observation height in pixels when obs_mode is 'pixels'.
+        grayscale (bool): Whether 'pixels' observations have a single luma channel.
+        async_render (bool): With render_mode='human', show the environment in a
+            :class:`LiveViewer` process that redraws the latest state at ``render_fps``
+            and drops the states in between, so ``step`` and ``reset`` never wait for
+            the display. By default the window is drawn in this process and stepping
+            is paced to ``render_fps``.
     
     Note:
         The reset method can be used in two ways:
@@ -41,6 +195,10 @@ class CartPoleSwingUpEnv(gym.Env):
         
         2. Default randomized: Use the environment's default initialization parameters.
            Example: `env.reset()`
+
+        :meth:`get_state` and :meth:`set_state` save and restore the simulator (physical
+        state, step counter and RNG) as a flat array of ``SNAPSHOT_SIZE`` floats, which
+        is much cheaper than ``copy.deepcopy(env)`` for tree search.
     """
 
     metadata = {"render_modes": ["human", "rgb_array"], "render_fps": 50}
@@ -63,6 +221,17 @@ class CartPoleSwingUpEnv(gym.Env):
         custom_reward_fn: callable = None,
         initial_state_mean: np.ndarray = None,
         initial_state_noise: np.ndarray = None,
+        integrator: str = "euler",
+        substeps: int = 1,
+        dtype=None,
+        jit: bool = False,
+        profile: bool = False,
+        preallocate: bool = False,
+        obs_buffer: np.ndarray = None,
+        pixel_width: int = 64,
+        pixel_height: int = 64,
+        grayscale: bool = False,
+        async_render: bool = False,
     ):
         super().__init__()
         # Physical constants and parameters
@@ -74,13 +243,40 @@ class CartPoleSwingUpEnv(gym.Env):
         self.m_p_l = self.m_p * self.l
         self.force_mag = force_mag  # Force magnitude scale applied to cart
         self.dt = dt  # Simulation time step
+        if integrator not in INTEGRATORS:
+            raise ValueError(f"Invalid integrator: {integrator}. Must be one of {INTEGRATORS}")
+        if substeps < 1:
+            raise ValueError(f"Invalid substeps: {substeps}. Must be at least 1")
+        self.integrator = integrator  # Integration scheme
+        self.substeps = substeps  # Integrator steps per environment step
         self.b = friction  # Friction coefficient
         self.t = 0  # Time steps counter
         self.t_limit = time_limit  # Episode step limit
         self.cost_mode = cost_mode
         self.sigma_c = sigma_c
-        self.obs_mode = obs_mode  # Observation mode: 'raw' or 'trig'
+        self.obs_mode = obs_mode  # Observation mode: 'raw', 'trig' or 'pixels'
+        # Pixel observations are rasterized directly at this resolution
+        self.pixel_width = pixel_width
+        self.pixel_height = pixel_height
+        self.grayscale = grayscale
+        # Precision of the stored state and of the observations
+        self.dtype, self.obs_dtype = resolve_dtypes(dtype)
+        # Whether the default step path keeps the state as a tuple of Python floats
+        self._tuple_state = dtype is None
+        # Whether each step rounds the state, so reward and termination read it back
+        self._round_state = self.dtype != np.float64
         self.custom_reward_fn = custom_reward_fn  # Custom reward function
+        self.jit = jit  # Use the fused step kernel
+        if jit:
+            if cost_mode not in COST_MODE_CODES:
+                raise ValueError(f"Invalid cost_mode: {cost_mode}. Must be 'default' or 'pilco'")
+            # Imports Numba and compiles (or loads) the kernel once per process
+            _, compiled = _get_kernels()
+            if not compiled:
+                gym.logger.warn(
+                    "jit=True but numba is not installed; using the pure-Python step kernel. "
+                    "Install it with `pip install numba`."
+                )
         
         # Initial state configuration
         # Default initial state: [x=0, x_dot=0, theta=pi, theta_dot=0]
@@ -98,39 +294,40 @@ class CartPoleSwingUpEnv(gym.Env):
         self.action_space = spaces.Box(low=-1.0, high=1.0, shape=(1,), dtype=np.float32)
         
         # Observation space depends on obs_mode
-        if self.obs_mode == "raw":
-            # Original: [x, x_dot, theta, theta_dot]
-            high = np.array([
-                self.x_threshold * 2,
-                np.finfo(np.float32).max,
-                np.pi * 2,
-                np.finfo(np.float32).max
-            ], dtype=np.float32)
-            self.observation_space = spaces.Box(low=-high, high=high, dtype=np.float32)
-        elif self.obs_mode == "trig":
-            # Trigonometric: [x, x_dot, sin(theta), cos(theta), theta_dot]
-            high = np.array([
-                self.x_threshold * 2,
-                np.finfo(np.float32).max,
-                1.0,  # sin(theta)
-                1.0,  # cos(theta)
-                np.finfo(np.float32).max
-            ], dtype=np.float32)
-            low = np.array([
-                -self.x_threshold * 2,
-                -np.finfo(np.float32).max,
-                -1.0,  # sin(theta)
-                -1.0,  # cos(theta)
-                -np.finfo(np.float32).max
-            ], dtype=np.float32)
-            self.observation_space = spaces.Box(low=low, high=high, dtype=np.float32)
-        else:
-            raise ValueError(f"Invalid obs_mode: {self.obs_mode}. Must be 'raw' or 'trig'")
+        self.observation_space = make_observation_space(
+            self.obs_mode, self.x_threshold, pixel_width, pixel_height, grayscale, self.obs_dtype
+        )
+
+        # Zero-allocation stepping: persistent state, observation and info objects
+        self.preallocate = preallocate or obs_buffer is not None
+        if self.preallocate:
+            if obs_mode == "pixels":
+                raise ValueError("preallocate is not supported with obs_mode='pixels'")
+            shape = self.observation_space.shape
+            if obs_buffer is None:
+                obs_buffer = np.zeros(shape, dtype=self.obs_dtype)
+            elif obs_buffer.shape != shape or obs_buffer.dtype != self.obs_dtype:
+                raise ValueError(
+                    f"obs_buffer must be a {self.obs_dtype} array of shape {shape}, "
+                    f"got {obs_buffer.dtype} {obs_buffer.shape}"
+                )
+        self._obs_buffer = obs_buffer
+        self._state_buffer = np.zeros(4, dtype=self.dtype)
+        self._prev_state_buffer = np.zeros(4, dtype=self.dtype)
+        # One-element float32 scratch used to round the action and force
+        self._f32 = array.array("f", [0.0])
+        self._info = {}
+
+        # Per-phase timing of step and render, None unless profiling is enabled
+        self.profiler = PhaseProfiler() if profile else None
 
         # Rendering related
         self.render_mode = render_mode
+        self.async_render = async_render
         self.screen = None
         self.clock = None
+        self._renderer = None
+        self._viewer = None
 
         # Initialize internal state
         self.state = None
@@ -142,16 +339,29 @@ class CartPoleSwingUpEnv(gym.Env):
         # Check if options contains exact initial state specification
         if options is not None and "initial_state" in options:
             # Set exact initial state (deterministic)
-            self.state = np.array(options["initial_state"], dtype=np.float32)
+            self.state = np.array(options["initial_state"], dtype=self.dtype)
         else:
             # Default: Use instance variables for randomization
             self.state = self.np_random.normal(
                 loc=self.initial_state_mean,
                 scale=self.initial_state_noise,
-            )
-            
+            ).astype(self.dtype)
+        if self._tuple_state:
+            self.state = tuple(self.state.tolist())
+
         self.t = 0  # Reset step counter
 
+        if self.preallocate:
+            # Adopt the persistent state array and write into the shared buffers
+            self._state_buffer[:] = self.state
+            self.state = self._state_buffer
+            self._info.clear()
+            x, x_dot, theta, theta_dot = self.state.tolist()
+            self._write_obs(x, x_dot, theta, theta_dot)
+            if self.render_mode == "human":
+                self.render()
+            return self._obs_buffer, self._info
+
         # Return observation based on the selected mode
         obs = self._get_obs()
 
@@ -164,99 +374,135 @@ class CartPoleSwingUpEnv(gym.Env):
     def _get_obs(self):
         """Convert the internal state to the desired observation format."""
         x, x_dot, theta, theta_dot = self.state
-        
+
         if self.obs_mode == "raw":
             # Return raw state [x, x_dot, theta, theta_dot]
-            return np.array(self.state, dtype=np.float32)
+            return np.array(self.state, dtype=self.obs_dtype)
         elif self.obs_mode == "trig":
             # Return [x, x_dot, sin(theta), cos(theta), theta_dot]
             sin_theta = math.sin(theta)
             cos_theta = math.cos(theta)
-            return np.array([x, x_dot, sin_theta, cos_theta, theta_dot], dtype=np.float32)
+            return np.array([x, x_dot, sin_theta, cos_theta, theta_dot], dtype=self.obs_dtype)
+        elif self.obs_mode == "pixels":
+            # Rasterize at the observation size instead of resizing a 600x600 render
+            return pixel_observation(
+                self.state,
+                self.l,
+                self.x_threshold,
+                self.pixel_width,
+                self.pixel_height,
+                self.grayscale,
+            )
         else:
             raise ValueError(f"Invalid obs_mode: {self.obs_mode}")
 
     def _compute_default_reward(self, state):
         """Calculate the default reward function (cos(theta) * cos(x))."""
         x, _, theta, _ = state
-        return math.cos(theta) * math.cos(x)
+        return _reward(x, theta, self.l, COST_MODE_CODES["default"], self.sigma_c)
     
     def _compute_pilco_reward(self, state):
         """Calculate the PILCO reward function based on tip position."""
         x, _, theta, _ = state
-        tip_x = x + self.l * math.sin(theta)
-        tip_y = self.l * math.cos(theta)
-        target_x = 0.0
-        target_y = self.l
-        square_distance = (tip_x - target_x)**2 + (tip_y - target_y)**2
-        cost = 1 - math.exp(-square_distance / (2 * self.sigma_c**2))
-        return -cost
+        return _reward(x, theta, self.l, COST_MODE_CODES["pilco"], self.sigma_c)
+
+    def _force(self, action):
+        """Clip the action and scale it to a force, both rounded through float32."""
+        f32 = self._f32
+        # ndarray.item returns a Python float; indexing would allocate a NumPy scalar
+        a = action.item(0) if isinstance(action, np.ndarray) else action[0]
+        f32[0] = -1.0 if a < -1.0 else 1.0 if a > 1.0 else a
+        if _FLOAT32_SCALAR_PRODUCT:
+            f32[0] = f32[0] * self.force_mag
+            return f32[0]
+        return f32[0] * self.force_mag
+
+    def _dynamics(self, x, x_dot, theta, theta_dot, force):
+        """
+        One step of the scalar step kernel from the given state and force.
+
+        Returns ``(x, x_dot, theta, theta_dot, reward, terminated)`` with the built-in
+        reward and termination of the new state as computed in float64.
+        """
+        # Looked up with `in` and [] since a bound dict.get would allocate
+        if self.cost_mode in COST_MODE_CODES:
+            cost_mode = COST_MODE_CODES[self.cost_mode]
+        elif self.custom_reward_fn is None:
+            raise ValueError(f"Invalid cost_mode: {self.cost_mode}")
+        else:
+            # The built-in reward is unused with a custom reward
+            cost_mode = COST_MODE_CODES["default"]
+        kernel = _get_kernels()[0] if self.jit else step_kernel
+        return kernel(
+            x, x_dot, theta, theta_dot, force,
+            self.m_c, self.m_p, self.l, self.g, self.b, self.dt, self.substeps,
+            INTEGRATOR_CODES[self.integrator], self.x_threshold, cost_mode, self.sigma_c,
+        )
 
     def step(self, action):
+        if self.preallocate:
+            return self._step_preallocated(action)
+
+        profiler = self.profiler
+        if profiler is not None:
+            lap = profiler.clock()
+
         # Convert action to force
-        act = np.clip(action, -1.0, 1.0).astype(np.float32)
-        # action is a shape=(1,) array, convert to scalar
-        force = float(act[0] * self.force_mag)
+        force = self._force(action)
+        if profiler is not None:
+            lap = profiler.lap("step.action", lap)
 
+        # Unpack state variables as Python floats
+        x, x_dot, theta, theta_dot = self._state_values()
         # Store previous state for reward calculation
         prev_state = self.state
-        
-        # Unpack state variables
-        x, x_dot, theta, theta_dot = self.state
-        # Calculate trigonometric functions
-        s = math.sin(theta)
-        c = math.cos(theta)
-        # Update state based on analytical solution (CartPole dynamics equations)
-        xdot_update = (
-            -2 * self.m_p_l * (theta_dot**2) * s
-            + 3 * self.m_p * self.g * s * c
-            + 4 * force
-            - 4 * self.b * x_dot
-        ) / (4 * self.total_m - 3 * self.m_p * c**2)
-        thetadot_update = (
-            -3 * self.m_p_l * (theta_dot**2) * s * c
-            + 6 * self.total_m * self.g * s
-            + 6 * (force - self.b * x_dot) * c
-        ) / (4 * self.l * self.total_m - 3 * self.m_p_l * c**2)
-        # Update state using Euler method
-        x = x + x_dot * self.dt
-        theta = theta + theta_dot * self.dt
-        x_dot = x_dot + xdot_update * self.dt
-        theta_dot = theta_dot + thetadot_update * self.dt
-        
-        # Keep theta within [-pi, pi]
-        theta = ((theta + np.pi) % (2 * np.pi)) - np.pi
-        
-        self.state = (x, x_dot, theta, theta_dot)
+        # Dynamics, built-in reward and termination in one step kernel call
+        x, x_dot, theta, theta_dot, reward, terminated = self._dynamics(
+            x, x_dot, theta, theta_dot, force
+        )
+        if self._tuple_state:
+            self.state = (x, x_dot, theta, theta_dot)
+        else:
+            # Stored at the configured precision
+            self.state = np.array((x, x_dot, theta, theta_dot), dtype=self.dtype)
+            if self._round_state:
+                # The kernel saw the unrounded state; reward and termination read it back
+                x, _, theta, _ = self.state.tolist()
+                reward, terminated = self._rounded_outcome(x, theta)
+        if profiler is not None:
+            lap = profiler.lap("step.dynamics", lap)
 
         # Calculate reward
         if self.custom_reward_fn is not None:
             # Use custom reward function if provided
             # The function should take (state, action, next_state) as input
-            reward = self.custom_reward_fn(prev_state, action, self.state)
-        elif self.cost_mode == "pilco":
-            reward = self._compute_pilco_reward(self.state)
-        elif self.cost_mode == "default":
-            reward = self._compute_default_reward(self.state)
-        else:
-            raise ValueError(f"Invalid cost_mode: {self.cost_mode}")
+            if is_batched_reward(self.custom_reward_fn):
+                # Batched functions see a batch of one transition
+                reward = self.custom_reward_fn(
+                    np.asarray(prev_state, dtype=self.dtype)[None],
+                    np.asarray(action)[None],
+                    np.asarray(self.state, dtype=self.dtype)[None],
+                )[0]
+            else:
+                reward = self.custom_reward_fn(prev_state, action, self.state)
+        if profiler is not None:
+            lap = profiler.lap("step.reward", lap)
 
-        # Termination conditions
-        terminated = False
-        truncated = False
-        # Terminate if cart moves beyond boundaries (failure)
-        if x < -self.x_threshold or x > self.x_threshold:
-            terminated = True
         # Truncate if episode exceeds step limit
+        truncated = False
         self.t += 1
         if self.t >= self.t_limit:
             truncated = True
         # If both conditions are met, prioritize termination
         if terminated:
             truncated = False
+        if profiler is not None:
+            lap = profiler.lap("step.termination", lap)
 
         # Return observation based on selected mode
         obs = self._get_obs()
+        if profiler is not None:
+            profiler.lap("step.observation", lap)
 
         # Update rendering if in human mode
         if self.render_mode == "human":
@@ -264,145 +510,345 @@ class CartPoleSwingUpEnv(gym.Env):
 
         return obs, float(reward), terminated, truncated, {}
 
-    def render(self):
+    def _rounded_outcome(self, x, theta):
+        """Built-in reward and termination of a state read back at the stored precision."""
+        # pilco or, also when a custom reward replaces the built-in one, default
+        cost_mode = COST_MODE_CODES["pilco" if self.cost_mode == "pilco" else "default"]
+        reward = _reward(x, theta, self.l, cost_mode, self.sigma_c)
+        return reward, x < -self.x_threshold or x > self.x_threshold
+
+    def _state_values(self):
+        """The state as four Python floats, adopting a state assigned from outside."""
+        state = self.state
+        if self._tuple_state:
+            if type(state) is not tuple:
+                state = self.state = tuple(np.asarray(state, dtype=np.float64).tolist())
+            return state
+        if not isinstance(state, np.ndarray) or state.dtype != self.dtype:
+            state = self.state = np.array(state, dtype=self.dtype)
+        return state.tolist()
+
+    def _write_obs(self, x, x_dot, theta, theta_dot):
+        """Write the observation for the given state into the reused buffer."""
+        obs = self._obs_buffer
+        if self.obs_mode == "raw":
+            obs[0] = x
+            obs[1] = x_dot
+            obs[2] = theta
+            obs[3] = theta_dot
+        elif self.obs_mode == "trig":
+            obs[0] = x
+            obs[1] = x_dot
+            obs[2] = math.sin(theta)
+            obs[3] = math.cos(theta)
+            obs[4] = theta_dot
+        # 'pixels' observations are rasterized in one batch by rollout
+
+    def _step_preallocated(self, action):
+        """
+        ``step`` without allocating new objects (``preallocate=True``).
+
+        Produces the same transition, reward and flags as the default path, working on
+        Python floats and writing results into the persistent state, observation and
+        info objects.
+        """
+        profiler = self.profiler
+        if profiler is not None:
+            lap = profiler.clock()
+
+        state = self._state_buffer
+        if self.state is not state:
+            # The state was replaced from outside, e.g. env.state = (...)
+            state[:] = self.state
+            self.state = state
+
+        force = self._force(action)
+        if profiler is not None:
+            lap = profiler.lap("step.action", lap)
+
+        prev_state = self._prev_state_buffer
+        x = prev_state[0] = state.item(0)
+        x_dot = prev_state[1] = state.item(1)
+        theta = prev_state[2] = state.item(2)
+        theta_dot = prev_state[3] = state.item(3)
+        x, x_dot, theta, theta_dot, reward, terminated = self._dynamics(
+            x, x_dot, theta, theta_dot, force
+        )
+        state[0] = x
+        state[1] = x_dot
+        state[2] = theta
+        state[3] = theta_dot
+        if self._round_state:
+            # Continue with the values as stored at the lower precision
+            x = state.item(0)
+            x_dot = state.item(1)
+            theta = state.item(2)
+            theta_dot = state.item(3)
+            reward, terminated = self._rounded_outcome(x, theta)
+        if profiler is not None:
+            lap = profiler.lap("step.dynamics", lap)
+
+        if self.custom_reward_fn is not None:
+            if is_batched_reward(self.custom_reward_fn):
+                reward = self.custom_reward_fn(
+                    prev_state[None], np.asarray(action)[None], state[None]
+                )[0]
+            else:
+                reward = self.custom_reward_fn(prev_state, action, state)
+        if profiler is not None:
+            lap = profiler.lap("step.reward", lap)
+
+        self.t += 1
+        truncated = self.t >= self.t_limit and not terminated
+        if profiler is not None:
+            lap = profiler.lap("step.termination", lap)
+
+        self._write_obs(x, x_dot, theta, theta_dot)
+        if profiler is not None:
+            profiler.lap("step.observation", lap)
+
+        if self.render_mode == "human":
+            self.render()
+
+        return self._obs_buffer, float(reward), terminated, truncated, self._info
+
+    def rollout(self, actions):
+        """
+        Execute a sequence of actions from the current state in one call.
+
+        A ``(T, 1)`` sequence advances this environment exactly as ``T`` calls to
+        ``step`` would, stopping early at termination or truncation, without the
+        per-step wrapper and allocation overhead. A ``(B, T, 1)`` batch of candidate
+        sequences is evaluated with the batched dynamics from the current state, which
+        is left unchanged; sequences are masked after they end (state frozen, reward 0,
+        flags False).
+
+        Args:
+            actions (np.ndarray): ``(T, 1)`` (or ``(T,)``) action sequence, or ``(B, T, 1)``
+                batch of sequences.
+
+        Returns:
+            tuple: ``(observations, rewards, terminated, truncated, info)``. For a single
+            sequence the arrays have ``L <= T`` rows, one per executed step. For a batch
+            they have shape ``(B, T, ...)`` and ``info["lengths"]`` holds the number of
+            unmasked steps of each sequence.
+        """
+        assert self.state is not None, "Call reset before using rollout method."
+        actions = np.asarray(actions)
+        if actions.ndim == 3:
+            return self._rollout_batch(actions)
+        actions = actions.reshape(len(actions), 1)
+        horizon = len(actions)
+
+        pixels = self.obs_mode == "pixels"
+        if pixels:
+            # States are collected and rasterized in one batch at the end
+            states = np.empty((horizon, 4), dtype=self.dtype)
+        else:
+            observations = np.empty((horizon,) + self.observation_space.shape, dtype=self.obs_dtype)
+        rewards = np.zeros(horizon)
+        terminated = np.zeros(horizon, dtype=np.bool_)
+        truncated = np.zeros(horizon, dtype=np.bool_)
+
+        # Run the allocation-free step, writing each observation straight into its row
+        obs_buffer = self._obs_buffer
+        length = 0
+        try:
+            for k in range(horizon):
+                if not pixels:
+                    self._obs_buffer = observations[k]
+                _, rewards[k], terminated[k], truncated[k], _ = self._step_preallocated(actions[k])
+                if pixels:
+                    states[k] = self._state_buffer
+                length = k + 1
+                if terminated[k] or truncated[k]:
+                    break
+        finally:
+            self._obs_buffer = obs_buffer
+            if not self.preallocate:
+                # The default step path replaces its state on every step
+                state = self._state_buffer
+                self.state = tuple(state.tolist()) if self._tuple_state else state.copy()
+
+        if pixels:
+            observations = pixel_observation(
+                states[:length],
+                self.l,
+                self.x_threshold,
+                self.pixel_width,
+                self.pixel_height,
+                self.grayscale,
+            )
+        else:
+            observations = observations[:length]
+        return observations, rewards[:length], terminated[:length], truncated[:length], {}
+
+    def _rollout_batch(self, actions):
+        """``rollout`` of a ``(B, T, 1)`` batch with the batched functional dynamics."""
+        # Imported here because functional.py imports this module
+        from gymnasium_cartpole_swingup.functional import (
+            CartPoleSwingUpFunctional,
+            CartPoleSwingUpParams,
+        )
+
+        func = CartPoleSwingUpFunctional({
+            "obs_mode": self.obs_mode,
+            # The built-in reward is unused (and cost_mode unchecked) with a custom reward
+            "cost_mode": self.cost_mode if self.custom_reward_fn is None else "default",
+            "integrator": self.integrator,
+            "substeps": self.substeps,
+            "pixel_width": self.pixel_width,
+            "pixel_height": self.pixel_height,
+            "grayscale": self.grayscale,
+            # None unless the observations follow the state precision
+            "dtype": self.dtype if self.obs_dtype == self.dtype else None,
+        })
+        params = CartPoleSwingUpParams.from_env(self)
+
+        reward_fn = self.custom_reward_fn
+        if reward_fn is not None and not is_batched_reward(reward_fn):
+            custom_reward_fn = reward_fn
+
+            def reward_fn(states, acts, next_states):
+                return np.array([
+                    custom_reward_fn(states[i], acts[i], next_states[i])
+                    for i in range(len(states))
+                ])
+
+        state = np.asarray(self.state, dtype=self.dtype)
+        states, rewards, terminated, truncated, lengths = func.rollout(
+            state, actions, None, params, time_left=self.t_limit - self.t, reward_fn=reward_fn
+        )
+        observations = func.observation(states, None, params)
+        return observations, rewards, terminated, truncated, {"lengths": lengths}
+
+    def get_state(self) -> np.ndarray:
+        """
+        Snapshot of the simulator as a flat float64 array of ``SNAPSHOT_SIZE`` values.
+
+        The layout is ``[x, x_dot, theta, theta_dot, t, rng...]`` where the last six
+        values hold the PCG64 state of ``np_random`` bit for bit (they are not meaningful
+        as numbers). Restoring it with :meth:`set_state` reproduces every later step and
+        reset exactly.
+        """
+        assert self.state is not None, "Call reset before using get_state method."
+        snapshot = np.empty(SNAPSHOT_SIZE)
+        snapshot[:4] = self.state
+        snapshot[4] = self.t
+        snapshot[5:] = encode_rng_state(self.np_random)
+        return snapshot
+
+    def set_state(self, snapshot):
+        """
+        Restore a snapshot taken by :meth:`get_state` (of this or another environment).
+
+        Only the simulator is restored; the configuration, e.g. physical parameters and
+        obs_mode, stays that of this environment.
+        """
+        snapshot = np.asarray(snapshot, dtype=np.float64)
+        if snapshot.shape != (SNAPSHOT_SIZE,):
+            raise ValueError(
+                f"Invalid snapshot shape: {snapshot.shape}. Must be ({SNAPSHOT_SIZE},)"
+            )
+        if self.preallocate:
+            self._state_buffer[:] = snapshot[:4]
+            self.state = self._state_buffer
+        elif self._tuple_state:
+            self.state = tuple(snapshot[:4].tolist())
+        else:
+            self.state = snapshot[:4].astype(self.dtype)
+        self.t = int(snapshot[4])
+        decode_rng_state(self.np_random, snapshot[5:])
+
+    def __getstate__(self):
+        """Pickle everything except the Pygame screen, clock, renderer and viewer handles."""
+        state = self.__dict__.copy()
+        state["screen"] = None
+        state["clock"] = None
+        state["_renderer"] = None
+        state["_viewer"] = None
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+
+    def render(self, out: np.ndarray = None):
+        """
+        Render the current state.
+
+        Args:
+            out (np.ndarray): Optional ``(600, 600, 3)`` uint8 buffer that receives the
+                frame in 'rgb_array' mode, avoiding a new allocation per frame.
+        """
         if self.render_mode is None:
             # No rendering mode
             return None
 
+        if self.render_mode == "human" and self.async_render:
+            # Hand the state to the viewer process; it draws on its own schedule
+            if self._viewer is None:
+                self._viewer = LiveViewer(self.l, fps=self.metadata["render_fps"])
+            if self.state is not None:
+                if self.profiler is not None:
+                    lap = self.profiler.clock()
+                self._viewer.show(self.state)
+                if self.profiler is not None:
+                    self.profiler.lap("render.publish", lap)
+            return None
+
         # Setup Pygame if not initialized
         if self.screen is None:
-            # Initialize Pygame
+            # Pygame is imported on first use so that non-rendering workers never load it
+            pygame = _import_pygame()
             pygame.init()
             if self.render_mode == "human":
                 pygame.display.init()
                 # Create window
-                self.screen = pygame.display.set_mode((600, 600))
+                self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
             else:  # "rgb_array"
-                # Offscreen surface for rendering
-                self.screen = pygame.Surface((600, 600))
+                # Offscreen surface for rendering, reused for every frame
+                self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
             self.clock = pygame.time.Clock()
+            self._renderer = PygameRenderer(self.screen, self.l)
 
         # Don't render if state is missing
         if self.state is None:
             return None
 
-        # Clear screen with white background
-        surf = pygame.Surface((600, 600))
-        surf.fill((255, 255, 255))
-        screen_width, screen_height = 600, 600
-
-        # Scale for coordinate conversion (world width 5m maps to 600px)
-        world_width = 5.0  # Visible range [-2.5, 2.5]m
-        scale = screen_width / world_width
-        # Cart drawing size
-        carty = (
-            screen_height / 2
-        )  # Y-position of cart's top surface in drawing coordinates
-        cart_width = 40.0
-        cart_height = 20.0
-        pole_width = 6.0
-        pole_len = scale * self.l  # Pole length in pixels
-
-        x, x_dot, theta, theta_dot = self.state
-        # Cart center coordinates (px). x=0 corresponds to screen center
-        cartx = x * scale + screen_width / 2.0
-
-        # Draw cart (rectangle)
-        left = -cart_width / 2
-        right = cart_width / 2
-        top = cart_height / 2
-        bottom = -cart_height / 2
-        cart_coords = [(left, bottom), (left, top), (right, top), (right, bottom)]
-        # Offset to cart position
-        cart_coords = [(cartx + cx, carty + cy) for (cx, cy) in cart_coords]
-        # Draw anti-aliased polygon (red cart)
-        pygame.gfxdraw.aapolygon(surf, cart_coords, (255, 0, 0))
-        pygame.gfxdraw.filled_polygon(surf, cart_coords, (255, 0, 0))
-
-        # Draw pole (rotated rectangle)
-        # Pole endpoints (unrotated). Pivot is pole bottom (cart connection) = (0,0)
-        left = -pole_width / 2
-        right = pole_width / 2
-        top = pole_len - pole_width / 2
-        bottom = -pole_width / 2
-        pole_coords = [(left, bottom), (left, top), (right, top), (right, bottom)]
-        # Rotate pole by theta (negate since in pygame coordinate system, down is +θ)
-        pole_coords_rotated = []
-        for coord in pole_coords:
-            vec = pygame.math.Vector2(coord).rotate_rad(theta)
-            pole_coords_rotated.append((vec[0] + cartx, vec[1] + carty))
-        # Draw pole (blue)
-        pygame.gfxdraw.aapolygon(surf, pole_coords_rotated, (0, 0, 255))
-        pygame.gfxdraw.filled_polygon(surf, pole_coords_rotated, (0, 0, 255))
-
-        # Draw axle (circle at pole base)
-        axle_radius = pole_width / 2
-        pygame.gfxdraw.aacircle(
-            surf, int(cartx), int(carty), int(axle_radius), (26, 255, 255)
-        )
-        pygame.gfxdraw.filled_circle(
-            surf, int(cartx), int(carty), int(axle_radius), (26, 255, 255)
-        )
-
-        # Draw pole tip (small black circle)
-        # Use the same coordinate system and rotation as the pole itself
-        # This ensures the black circle stays exactly at the end of the pole
-        pole_top = pygame.math.Vector2(0, pole_len).rotate_rad(theta)
-        pole_top_x = int(cartx + pole_top.x)
-        pole_top_y = int(carty + pole_top.y)
-
-        pygame.gfxdraw.aacircle(
-            surf, pole_top_x, pole_top_y, int(axle_radius), (0, 0, 0)
-        )
-        pygame.gfxdraw.filled_circle(
-            surf, pole_top_x, pole_top_y, int(axle_radius), (0, 0, 0)
-        )
-
-        # Draw wheels (black circles on left/right bottom of cart)
-        wheel_radius = cart_height / 4.0
-        # Left wheel center coordinates
-        wheel_x_left = cartx - cart_width / 2
-        wheel_y = carty - cart_height / 2
-        # Right wheel center coordinates
-        wheel_x_right = cartx + cart_width / 2
-        # Draw left and right wheels
-        pygame.gfxdraw.aacircle(
-            surf, int(wheel_x_left), int(wheel_y), int(wheel_radius), (0, 0, 0)
-        )
-        pygame.gfxdraw.filled_circle(
-            surf, int(wheel_x_left), int(wheel_y), int(wheel_radius), (0, 0, 0)
-        )
-        pygame.gfxdraw.aacircle(
-            surf, int(wheel_x_right), int(wheel_y), int(wheel_radius), (0, 0, 0)
-        )
-        pygame.gfxdraw.filled_circle(
-            surf, int(wheel_x_right), int(wheel_y), int(wheel_radius), (0, 0, 0)
-        )
-
-        # Draw track ground line (black line)
-        track_y = carty - cart_height / 2 - wheel_radius  # Ground height
-        pygame.gfxdraw.hline(surf, 0, screen_width, int(track_y), (0, 0, 0))
-
-        # Flip the rendered surface vertically to apply to screen (convert coordinate system upward)
-        surf = pygame.transform.flip(surf, False, True)
-        self.screen.blit(surf, (0, 0))
+        profiler = self.profiler
+        self._renderer.draw(self.state, profiler)
+        if profiler is not None:
+            lap = profiler.clock()
 
         if self.render_mode == "human":
+            pygame = _import_pygame()
             # Display on screen
             pygame.display.flip()
+            if profiler is not None:
+                lap = profiler.lap("render.flip", lap)
             # Wait to maintain appropriate FPS
             self.clock.tick(self.metadata["render_fps"])
+            if profiler is not None:
+                lap = profiler.lap("render.tick", lap)
             # Process event loop (to keep window responsive)
             pygame.event.pump()
+            if profiler is not None:
+                profiler.lap("render.events", lap)
             return None
         elif self.render_mode == "rgb_array":
             # Return pixel array
-            image = pygame.surfarray.pixels3d(self.screen)
-            return np.transpose(np.array(image), axes=(1, 0, 2))
+            frame = self._renderer.frame(out)
+            if profiler is not None:
+                profiler.lap("render.pixels", lap)
+            return frame
 
     def close(self):
+        if self._viewer is not None:
+            self._viewer.close()
+            self._viewer = None
         if self.screen is not None:
             # Release Pygame resources
+            pygame = _import_pygame()
             try:
                 pygame.display.quit()
                 pygame.quit()
@@ -410,3 +856,4 @@ class CartPoleSwingUpEnv(gym.Env):
                 pass
             self.screen = None
             self.clock = None
+            self._renderer = None
@@ -0,0 +1,457 @@
+from typing import NamedTuple
+
+import numpy as np
+from gymnasium import spaces
+from gymnasium.experimental.functional import FuncEnv
+
+from gymnasium_cartpole_swingup.cartpole_swingup import (
+    INTEGRATORS,
+    make_observation_space,
+    resolve_dtypes,
+)
+from gymnasium_cartpole_swingup.rendering import pixel_observation
+from gymnasium_cartpole_swingup.rewards import (
+    default_reward,
+    default_reward_gradient,
+    pilco_reward,
+    pilco_reward_gradient,
+)
+
+
+class CartPoleSwingUpParams(NamedTuple):
+    """
+    Physical parameters of the cart-pole swing-up system.
+
+    Field names match the keyword arguments of :class:`CartPoleSwingUpEnv`. Every field
+    may be a scalar or an array that broadcasts against the leading batch dimensions
+    of the states passed to :class:`CartPoleSwingUpFunctional`.
+    """
+
+    gravity: float = 9.82
+    cart_mass: float = 0.5
+    pole_mass: float = 0.5
+    pole_length: float = 0.6
+    force_mag: float = 10.0
+    dt: float = 0.1
+    friction: float = 0.1
+    x_threshold: float = 2.4
+    sigma_c: float = 0.25
+
+    @classmethod
+    def from_env(cls, env):
+        """Read the parameters of an existing (possibly wrapped) CartPoleSwingUpEnv."""
+        env = env.unwrapped
+        return cls(
+            gravity=env.g,
+            cart_mass=env.m_c,
+            pole_mass=env.m_p,
+            pole_length=env.l,
+            force_mag=env.force_mag,
+            dt=env.dt,
+            friction=env.b,
+            x_threshold=env.x_threshold,
+            sigma_c=env.sigma_c,
+        )
+
+
+class CartPoleSwingUpFunctional(FuncEnv):
+    """
+    Stateless, batched form of the cart-pole swing-up dynamics.
+
+    States are arrays of shape ``(..., 4)`` holding ``[x, x_dot, theta, theta_dot]`` and
+    actions are arrays of shape ``(..., 1)`` in ``[-1, 1]``. No method reads or writes
+    instance state, so a whole population of candidate states can be evaluated in one
+    call, e.g. ``func.transition(states, actions, None, params)`` with ``(B, 4)`` states
+    and ``(B, 1)`` actions.
+
+    The equations are those of :meth:`CartPoleSwingUpEnv.step`, integrated with the same
+    ``integrator`` and ``substeps`` options, with theta wrapped to ``[-pi, pi)``.
+    Truncation is not part of the functional API; use the step counter of the caller.
+
+    Args:
+        options (dict): Optional overrides of the class attributes ``obs_mode``
+            ('raw', 'trig' or 'pixels'), ``cost_mode`` ('default' or 'pilco'),
+            ``initial_state_mean``, ``initial_state_noise``, ``integrator``
+            ('euler', 'semi_implicit_euler' or 'rk4'), ``substeps``, and ``pixel_width``,
+            ``pixel_height`` and ``grayscale`` for pixel observations, and ``dtype``
+            (np.float32 or np.float64) for the precision of states and observations;
+            the default None keeps float64 states with float32 observations.
+            :meth:`transition` computes in the precision of the state it is given.
+
+    Example:
+        >>> func = CartPoleSwingUpFunctional({"cost_mode": "pilco"})
+        >>> params = func.get_default_params(pole_length=0.8)
+        >>> states = func.initial(np.random.default_rng(0), params, batch_size=64)
+        >>> actions = np.zeros((64, 1))
+        >>> next_states = func.transition(states, actions, None, params)
+        >>> rewards = func.reward(states, actions, next_states, None, params)
+    """
+
+    obs_mode = "raw"
+    cost_mode = "default"
+    initial_state_mean = np.array([0.0, 0.0, np.pi, 0.0])
+    initial_state_noise = np.array([0.05, 0.05, 0.05, 0.05])
+    integrator = "euler"
+    substeps = 1
+    pixel_width = 64
+    pixel_height = 64
+    grayscale = False
+    dtype = None
+
+    action_space = spaces.Box(low=-1.0, high=1.0, shape=(1,), dtype=np.float32)
+
+    def __init__(self, options: dict = None):
+        super().__init__(options)
+        if self.cost_mode not in ("default", "pilco"):
+            raise ValueError(f"Invalid cost_mode: {self.cost_mode}. Must be 'default' or 'pilco'")
+        if self.integrator not in INTEGRATORS:
+            raise ValueError(f"Invalid integrator: {self.integrator}. Must be one of {INTEGRATORS}")
+        if self.substeps < 1:
+            raise ValueError(f"Invalid substeps: {self.substeps}. Must be at least 1")
+        self.state_dtype, self.obs_dtype = resolve_dtypes(self.dtype)
+        self.observation_space = make_observation_space(
+            self.obs_mode,
+            self.default_params.x_threshold,
+            self.pixel_width,
+            self.pixel_height,
+            self.grayscale,
+            self.obs_dtype,
+        )
+
+    def get_default_params(self, **kwargs) -> CartPoleSwingUpParams:
+        """Return the default parameters, with any field overridden by ``kwargs``."""
+        return CartPoleSwingUpParams(**kwargs)
+
+    def initial(self, rng: np.random.Generator, params: CartPoleSwingUpParams = None, batch_size: int = None):
+        """Sample initial state(s) around the pole-down position."""
+        shape = (4,) if batch_size is None else (batch_size, 4)
+        return rng.normal(
+            loc=self.initial_state_mean, scale=self.initial_state_noise, size=shape
+        ).astype(self.state_dtype, copy=False)
+
+    def _accelerations(self, x_dot, theta, theta_dot, force, params):
+        """Cart and pole accelerations (CartPole dynamics equations)."""
+        m_p = params.pole_mass
+        total_m = params.cart_mass + m_p
+        m_p_l = m_p * params.pole_length
+        g = params.gravity
+        b = params.friction
+
+        s = np.sin(theta)
+        c = np.cos(theta)
+        xdot_update = (
+            -2 * m_p_l * (theta_dot**2) * s
+            + 3 * m_p * g * s * c
+            + 4 * force
+            - 4 * b * x_dot
+        ) / (4 * total_m - 3 * m_p * c**2)
+        thetadot_update = (
+            -3 * m_p_l * (theta_dot**2) * s * c
+            + 6 * total_m * g * s
+            + 6 * (force - b * x_dot) * c
+        ) / (4 * params.pole_length * total_m - 3 * m_p_l * c**2)
+        return xdot_update, thetadot_update
+
+    def transition(self, state, action, rng=None, params: CartPoleSwingUpParams = None):
+        """Advance ``state`` by one time step under ``action``."""
+        params = self.default_params if params is None else params
+        state = np.asarray(state)
+        action = np.asarray(action)
+
+        force = np.clip(action[..., 0], -1.0, 1.0) * params.force_mag
+        if state.dtype == np.float32:
+            # Keep single-precision states in single precision
+            force = force.astype(np.float32, copy=False)
+        x = state[..., 0]
+        x_dot = state[..., 1]
+        theta = state[..., 2]
+        theta_dot = state[..., 3]
+
+        accelerations = self._accelerations
+        h = params.dt / self.substeps
+        for _ in range(self.substeps):
+            if self.integrator == "euler":
+                # Explicit Euler: positions advance with the old velocities
+                xdot_update, thetadot_update = accelerations(x_dot, theta, theta_dot, force, params)
+                x = x + x_dot * h
+                theta = theta + theta_dot * h
+                x_dot = x_dot + xdot_update * h
+                theta_dot = theta_dot + thetadot_update * h
+            elif self.integrator == "semi_implicit_euler":
+                # Semi-implicit Euler: positions advance with the updated velocities
+                xdot_update, thetadot_update = accelerations(x_dot, theta, theta_dot, force, params)
+                x_dot = x_dot + xdot_update * h
+                theta_dot = theta_dot + thetadot_update * h
+                x = x + x_dot * h
+                theta = theta + theta_dot * h
+            else:  # "rk4"
+                a1, b1 = accelerations(x_dot, theta, theta_dot, force, params)
+                xd2, td2 = x_dot + a1 * h / 2, theta_dot + b1 * h / 2
+                a2, b2 = accelerations(xd2, theta + theta_dot * h / 2, td2, force, params)
+                xd3, td3 = x_dot + a2 * h / 2, theta_dot + b2 * h / 2
+                a3, b3 = accelerations(xd3, theta + td2 * h / 2, td3, force, params)
+                xd4, td4 = x_dot + a3 * h, theta_dot + b3 * h
+                a4, b4 = accelerations(xd4, theta + td3 * h, td4, force, params)
+                x = x + (x_dot + 2 * xd2 + 2 * xd3 + xd4) * h / 6
+                theta = theta + (theta_dot + 2 * td2 + 2 * td3 + td4) * h / 6
+                x_dot = x_dot + (a1 + 2 * a2 + 2 * a3 + a4) * h / 6
+                theta_dot = theta_dot + (b1 + 2 * b2 + 2 * b3 + b4) * h / 6
+
+        return np.stack(
+            [x, x_dot, ((theta + np.pi) % (2 * np.pi)) - np.pi, theta_dot],
+            axis=-1,
+        )
+
+    def _acceleration_tangents(self, x_dot, dx_dot, theta, dtheta, theta_dot, dtheta_dot, force, dforce, params):
+        """
+        Accelerations and their tangents, given the tangents ``d*`` (shape ``(..., 5)``)
+        of the inputs with respect to ``[x, x_dot, theta, theta_dot, action]``.
+        """
+        m_p = params.pole_mass
+        total_m = params.cart_mass + m_p
+        m_p_l = m_p * params.pole_length
+        g = params.gravity
+        b = params.friction
+
+        s = np.sin(theta)
+        c = np.cos(theta)
+        w2 = theta_dot**2
+        denominator = 4 * total_m - 3 * m_p * c**2
+        d_denominator = 6 * m_p * c * s  # d denominator / d theta
+
+        xdot_update = (-2 * m_p_l * w2 * s + 3 * m_p * g * s * c + 4 * force - 4 * b * x_dot) / denominator
+        d_xdot_update = (
+            -4 * b * dx_dot
+            + (-2 * m_p_l * w2 * c + 3 * m_p * g * (c**2 - s**2) - xdot_update * d_denominator)[..., None] * dtheta
+            + (-4 * m_p_l * theta_dot * s)[..., None] * dtheta_dot
+            + 4 * dforce
+        ) / denominator[..., None]
+
+        # The pole equation shares the denominator, scaled by pole_length
+        pole_denominator = params.pole_length * denominator
+        thetadot_update = (
+            -3 * m_p_l * w2 * s * c + 6 * total_m * g * s + 6 * (force - b * x_dot) * c
+        ) / pole_denominator
+        d_thetadot_update = (
+            (-6 * b * c)[..., None] * dx_dot
+            + (
+                -3 * m_p_l * w2 * (c**2 - s**2)
+                + 6 * total_m * g * c
+                - 6 * (force - b * x_dot) * s
+                - thetadot_update * params.pole_length * d_denominator
+            )[..., None] * dtheta
+            + (-6 * m_p_l * theta_dot * s * c)[..., None] * dtheta_dot
+            + (6 * c)[..., None] * dforce
+        ) / np.asarray(pole_denominator)[..., None]
+        return xdot_update, d_xdot_update, thetadot_update, d_thetadot_update
+
+    def transition_jacobians(self, state, action, rng=None, params: CartPoleSwingUpParams = None):
+        """
+        Closed-form derivatives of :meth:`transition` with respect to state and action.
+
+        The derivatives are exact for the configured ``integrator`` and ``substeps``
+        (forward-mode differentiation of the update equations, no finite differences).
+        The theta wrap and the action clip are treated as piecewise: the derivative with
+        respect to an action outside ``[-1, 1]`` is zero.
+
+        Args:
+            state: State(s) of shape ``(..., 4)``.
+            action: Action(s) of shape ``(..., 1)``.
+            rng: Unused; the dynamics are deterministic.
+            params (CartPoleSwingUpParams): Physical parameters, e.g.
+                ``CartPoleSwingUpParams.from_env(env)``.
+
+        Returns:
+            tuple: ``(A, B)`` with ``A = d next_state / d state`` of shape ``(..., 4, 4)``
+            and ``B = d next_state / d action`` of shape ``(..., 4, 1)``.
+        """
+        params = self.default_params if params is None else params
+        state = np.asarray(state, dtype=np.float64)
+        action = np.asarray(action, dtype=np.float64)
+
+        force = np.clip(action[..., 0], -1.0, 1.0) * params.force_mag
+        x = state[..., 0]
+        x_dot = state[..., 1]
+        theta = state[..., 2]
+        theta_dot = state[..., 3]
+
+        # Tangents with respect to [x, x_dot, theta, theta_dot, action]
+        shape = np.broadcast(x, force).shape + (5,)
+        seed = np.eye(5)
+        dx, dx_dot, dtheta, dtheta_dot = (np.broadcast_to(seed[i], shape) for i in range(4))
+        unclipped = np.abs(action[..., 0]) <= 1.0
+        dforce = np.where(unclipped, params.force_mag, 0.0)[..., None] * seed[4]
+
+        def accelerations(x_dot, dx_dot, theta, dtheta, theta_dot, dtheta_dot):
+            return self._acceleration_tangents(
+                x_dot, dx_dot, theta, dtheta, theta_dot, dtheta_dot, force, dforce, params
+            )
+
+        h = params.dt / self.substeps
+        hd = np.asarray(h)[..., None]
+        for _ in range(self.substeps):
+            if self.integrator == "euler":
+                a, da, b, db = accelerations(x_dot, dx_dot, theta, dtheta, theta_dot, dtheta_dot)
+                x, dx = x + x_dot * h, dx + dx_dot * hd
+                theta, dtheta = theta + theta_dot * h, dtheta + dtheta_dot * hd
+                x_dot, dx_dot = x_dot + a * h, dx_dot + da * hd
+                theta_dot, dtheta_dot = theta_dot + b * h, dtheta_dot + db * hd
+            elif self.integrator == "semi_implicit_euler":
+                a, da, b, db = accelerations(x_dot, dx_dot, theta, dtheta, theta_dot, dtheta_dot)
+                x_dot, dx_dot = x_dot + a * h, dx_dot + da * hd
+                theta_dot, dtheta_dot = theta_dot + b * h, dtheta_dot + db * hd
+                x, dx = x + x_dot * h, dx + dx_dot * hd
+                theta, dtheta = theta + theta_dot * h, dtheta + dtheta_dot * hd
+            else:  # "rk4"
+                a1, da1, b1, db1 = accelerations(x_dot, dx_dot, theta, dtheta, theta_dot, dtheta_dot)
+                xd2, dxd2 = x_dot + a1 * h / 2, dx_dot + da1 * hd / 2
+                td2, dtd2 = theta_dot + b1 * h / 2, dtheta_dot + db1 * hd / 2
+                a2, da2, b2, db2 = accelerations(
+                    xd2, dxd2, theta + theta_dot * h / 2, dtheta + dtheta_dot * hd / 2, td2, dtd2
+                )
+                xd3, dxd3 = x_dot + a2 * h / 2, dx_dot + da2 * hd / 2
+                td3, dtd3 = theta_dot + b2 * h / 2, dtheta_dot + db2 * hd / 2
+                a3, da3, b3, db3 = accelerations(
+                    xd3, dxd3, theta + td2 * h / 2, dtheta + dtd2 * hd / 2, td3, dtd3
+                )
+                xd4, dxd4 = x_dot + a3 * h, dx_dot + da3 * hd
+                td4, dtd4 = theta_dot + b3 * h, dtheta_dot + db3 * hd
+                a4, da4, b4, db4 = accelerations(xd4, dxd4, theta + td3 * h, dtheta + dtd3 * hd, td4, dtd4)
+                x = x + (x_dot + 2 * xd2 + 2 * xd3 + xd4) * h / 6
+                dx = dx + (dx_dot + 2 * dxd2 + 2 * dxd3 + dxd4) * hd / 6
+                theta = theta + (theta_dot + 2 * td2 + 2 * td3 + td4) * h / 6
+                dtheta = dtheta + (dtheta_dot + 2 * dtd2 + 2 * dtd3 + dtd4) * hd / 6
+                x_dot = x_dot + (a1 + 2 * a2 + 2 * a3 + a4) * h / 6
+                dx_dot = dx_dot + (da1 + 2 * da2 + 2 * da3 + da4) * hd / 6
+                theta_dot = theta_dot + (b1 + 2 * b2 + 2 * b3 + b4) * h / 6
+                dtheta_dot = dtheta_dot + (db1 + 2 * db2 + 2 * db3 + db4) * hd / 6
+
+        jacobian = np.stack([dx, dx_dot, dtheta, dtheta_dot], axis=-2)
+        return jacobian[..., :4], jacobian[..., 4:]
+
+    def reward_gradients(self, state, action, rng=None, params: CartPoleSwingUpParams = None):
+        """
+        Gradients of the built-in reward of the transition from ``state`` under ``action``.
+
+        The reward depends on the next state only, so the gradients are those of the
+        configured ``cost_mode`` reward at ``transition(state, action)`` chained with
+        :meth:`transition_jacobians`.
+
+        Returns:
+            tuple: ``(reward_state, reward_action)`` of shapes ``(..., 4)`` and ``(..., 1)``.
+        """
+        params = self.default_params if params is None else params
+        next_state = self.transition(state, action, None, params)
+        if self.cost_mode == "pilco":
+            gradient = pilco_reward_gradient(next_state, params.pole_length, params.sigma_c)
+        else:
+            gradient = default_reward_gradient(next_state)
+        jacobian_state, jacobian_action = self.transition_jacobians(state, action, None, params)
+        return (
+            np.einsum("...i,...ij->...j", gradient, jacobian_state),
+            np.einsum("...i,...ij->...j", gradient, jacobian_action),
+        )
+
+    def rollout(
+        self,
+        state,
+        actions,
+        rng=None,
+        params: CartPoleSwingUpParams = None,
+        time_left: int = None,
+        reward_fn=None,
+    ):
+        """
+        Execute action sequences of shape ``(B, T, 1)`` from states of shape ``(B, 4)``.
+
+        A sequence ends at its first terminal state, or after ``time_left`` steps
+        (truncation). Later entries are masked: the state stays frozen, the reward is 0
+        and both flags are False.
+
+        Args:
+            state: Start state(s), ``(B, 4)`` or a single ``(4,)`` state for every sequence.
+            actions: Action sequences of shape ``(B, T, 1)``.
+            rng: Unused; the dynamics are deterministic.
+            params (CartPoleSwingUpParams): Physical parameters.
+            time_left (int): Steps until truncation, or None for no time limit.
+            reward_fn (callable): Optional batched ``(states, actions, next_states)``
+                reward used instead of :meth:`reward`.
+
+        Returns:
+            tuple: ``(states, rewards, terminated, truncated, lengths)`` where ``states``
+            is ``(B, T, 4)`` (the state after each step), the next three are ``(B, T)``
+            and ``lengths`` holds the number of unmasked steps of each sequence.
+        """
+        params = self.default_params if params is None else params
+        actions = np.asarray(actions)
+        batch_size, horizon = actions.shape[:2]
+        state = np.array(np.broadcast_to(state, (batch_size, 4)), dtype=self.state_dtype)
+        # Round through float32 exactly like CartPoleSwingUpEnv.step
+        clipped = np.clip(actions, -1.0, 1.0).astype(np.float32)
+
+        states = np.empty((batch_size, horizon, 4), dtype=self.state_dtype)
+        rewards = np.zeros((batch_size, horizon))
+        terminated = np.zeros((batch_size, horizon), dtype=np.bool_)
+        truncated = np.zeros((batch_size, horizon), dtype=np.bool_)
+        lengths = np.zeros(batch_size, dtype=np.int64)
+        alive = np.ones(batch_size, dtype=np.bool_)
+
+        for k in range(horizon):
+            next_state = self.transition(state, clipped[:, k], None, params)
+            if reward_fn is None:
+                reward = self.reward(state, actions[:, k], next_state, None, params)
+            else:
+                reward = reward_fn(state, actions[:, k], next_state)
+            term = self.terminal(next_state, None, params)
+            trunc = ~term if time_left is not None and k + 1 >= time_left else np.zeros_like(term)
+
+            next_state[~alive] = state[~alive]
+            states[:, k] = next_state
+            rewards[:, k] = np.where(alive, reward, 0.0)
+            terminated[:, k] = term & alive
+            truncated[:, k] = trunc & alive
+            lengths += alive
+            alive &= ~(term | trunc)
+            state = next_state
+            if not alive.any():
+                states[:, k + 1:] = state[:, None]
+                break
+
+        return states, rewards, terminated, truncated, lengths
+
+    def observation(self, state, rng=None, params: CartPoleSwingUpParams = None):
+        """Convert state(s) to observation(s) for the configured obs_mode."""
+        state = np.asarray(state)
+        if self.obs_mode == "raw":
+            return state.astype(self.obs_dtype)
+        elif self.obs_mode == "trig":
+            theta = state[..., 2]
+            return np.stack(
+                [state[..., 0], state[..., 1], np.sin(theta), np.cos(theta), state[..., 3]],
+                axis=-1,
+            ).astype(self.obs_dtype)
+        elif self.obs_mode == "pixels":
+            params = self.default_params if params is None else params
+            return pixel_observation(
+                state,
+                params.pole_length,
+                params.x_threshold,
+                self.pixel_width,
+                self.pixel_height,
+                self.grayscale,
+            )
+        else:
+            raise ValueError(f"Invalid obs_mode: {self.obs_mode}")
+
+    def reward(self, state, action, next_state, rng=None, params: CartPoleSwingUpParams = None):
+        """Reward of the transition for the configured cost_mode."""
+        params = self.default_params if params is None else params
+        if self.cost_mode == "pilco":
+            return pilco_reward(next_state, params.pole_length, params.sigma_c)
+        return default_reward(next_state)
+
+    def terminal(self, state, rng=None, params: CartPoleSwingUpParams = None):
+        """Whether the cart has left the track."""
+        params = self.default_params if params is None else params
+        x = np.asarray(state)[..., 0]
+        return (x < -params.x_threshold) | (x > params.x_threshold)
@@ -0,0 +1,226 @@
+"""
+Parallel, resumable generation of CartPoleSwingUp transition datasets.
+
+The dataset is split into ``--num-shards`` shards. Each shard steps a
+``gym.make_vec("CartPoleSwingUp-v0", num_envs=...)`` environment for
+``--steps-per-shard`` steps under the chosen policy and records it with
+:class:`~gymnasium_cartpole_swingup.recording.TransitionRecorder` (float32 columns by
+default) into ``<output>/shard-XXXXX``. Shards are generated by a process pool and
+seeded from ``np.random.SeedSequence(--seed).spawn(num_shards)``, so the content of a
+shard does not depend on the number of workers or on the order of completion.
+
+A shard is written to a temporary directory and renamed when complete. Re-running the
+same command after an interruption skips the completed shards and regenerates the rest;
+``<output>/config.json`` guards against resuming with different settings.
+
+Policies:
+    random      uniform random actions
+    energy      energy-pumping swing-up with a linear balancing controller near upright
+    zero        no force
+    MODULE:NAME a user factory ``NAME(env, rng)`` returning ``policy(observations)``,
+                which maps ``(num_envs, ...)`` observations to ``(num_envs, 1)`` actions
+
+Usage:
+    cartpole-swingup-generate data/swingup --num-shards 64 --steps-per-shard 10000 \\
+        --num-envs 256 --policy energy --noise 0.3 --workers 8
+"""
+
+import argparse
+import importlib
+import json
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_cartpole_swingup
+from gymnasium_cartpole_swingup.recording import RecordTransitionsVector
+
+CONFIG_FILE = "config.json"
+
+
+def random_policy(env, rng):
+    """Uniform random actions."""
+    shape = (env.num_envs, 1)
+    return lambda observations: rng.uniform(-1.0, 1.0, size=shape)
+
+
+def zero_policy(env, rng):
+    """No force."""
+    actions = np.zeros((env.num_envs, 1))
+    return lambda observations: actions
+
+
+def energy_policy(env, rng):
+    """
+    Scripted swing-up controller acting on the physical state.
+
+    Away from upright it pumps energy into the pole towards the upright energy while
+    keeping the cart near the centre; within about 30 degrees of upright it switches to
+    a linear balancing controller.
+    """
+    unwrapped = env.unwrapped
+    params = unwrapped.params
+
+    def policy(observations):
+        x, x_dot, theta, theta_dot = unwrapped.state.T
+        m, length, g = params.pole_mass, params.pole_length, params.gravity
+        c = np.cos(theta)
+        energy = m * length**2 / 6 * theta_dot**2 + m * g * length / 2 * c
+        swing = (m * g * length / 2 - energy) * theta_dot * c - 0.1 * x - 0.2 * x_dot
+        balance = -2.0 * theta - 0.6 * theta_dot + 0.1 * x + 0.2 * x_dot
+        return np.clip(np.where(c > 0.85, balance, swing), -1.0, 1.0)[:, None]
+
+    return policy
+
+
+POLICIES = {"random": random_policy, "zero": zero_policy, "energy": energy_policy}
+
+
+def load_policy(spec):
+    """Resolve a built-in policy name or a ``module:attribute`` policy factory."""
+    if spec in POLICIES:
+        return POLICIES[spec]
+    if ":" not in spec:
+        raise ValueError(
+            f"Unknown policy {spec!r}: use one of {sorted(POLICIES)} or 'module:factory'"
+        )
+    module_name, attribute = spec.split(":", 1)
+    return getattr(importlib.import_module(module_name), attribute)
+
+
+def shard_name(index):
+    return f"shard-{index:05d}"
+
+
+def generate_shard(output, index, seed_sequence, config):
+    """Generate one shard into a temporary directory and publish it atomically."""
+    final_path = os.path.join(output, shard_name(index))
+    tmp_path = final_path + ".tmp"
+    shutil.rmtree(tmp_path, ignore_errors=True)
+
+    env_seed, policy_seed = seed_sequence.generate_state(2)
+    rng = np.random.default_rng(policy_seed)
+    envs = gym.make_vec(
+        "CartPoleSwingUp-v0", num_envs=config["num_envs"], **config["env_kwargs"]
+    )
+    envs = RecordTransitionsVector(
+        envs,
+        tmp_path,
+        dtype=np.dtype(config["dtype"]),
+        metadata={"shard": index, "env_seed": int(env_seed), "policy_seed": int(policy_seed)},
+    )
+    policy = load_policy(config["policy"])(envs, rng)
+    noise = config["noise"]
+
+    observations, _ = envs.reset(seed=int(env_seed))
+    for _ in range(config["steps_per_shard"]):
+        actions = np.asarray(policy(observations), dtype=np.float64).reshape(config["num_envs"], 1)
+        if noise > 0:
+            actions = np.clip(actions + rng.normal(0.0, noise, size=actions.shape), -1.0, 1.0)
+        observations, _, _, _, _ = envs.step(actions)
+    envs.close()
+
+    os.replace(tmp_path, final_path)
+    return index
+
+
+def completed_shards(output, num_shards):
+    """Indices of shards that were fully written by a previous run."""
+    return {
+        index
+        for index in range(num_shards)
+        if os.path.exists(os.path.join(output, shard_name(index), "meta.json"))
+    }
+
+
+def check_config(output, config):
+    """Store the configuration, or make sure it matches the one being resumed."""
+    path = os.path.join(output, CONFIG_FILE)
+    if os.path.exists(path):
+        with open(path) as f:
+            previous = json.load(f)
+        previous.pop("package_version", None)
+        if previous != config:
+            raise SystemExit(
+                f"{output} was generated with different settings:\n"
+                f"  existing: {json.dumps(previous, sort_keys=True)}\n"
+                f"  current:  {json.dumps(config, sort_keys=True)}\n"
+                "Use another output directory or --overwrite."
+            )
+    else:
+        with open(path, "w") as f:
+            json.dump({**config, "package_version": gymnasium_cartpole_swingup.__version__}, f, indent=2)
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cartpole-swingup-generate",
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("\n\n", 1)[1],
+    )
+    parser.add_argument("output", help="dataset directory")
+    parser.add_argument("--num-shards", type=int, default=8)
+    parser.add_argument("--steps-per-shard", type=int, default=10_000, help="vector steps per shard")
+    parser.add_argument("--num-envs", type=int, default=64, help="sub-environments per shard")
+    parser.add_argument("--policy", default="random", help="random, energy, zero or module:factory")
+    parser.add_argument("--noise", type=float, default=0.0, help="std of Gaussian action noise")
+    parser.add_argument("--seed", type=int, default=0, help="root seed of all shards")
+    parser.add_argument("--dtype", default="float32", choices=["float32", "float64"])
+    parser.add_argument("--env-kwargs", type=json.loads, default={}, help="JSON keyword arguments of the env")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    parser.add_argument("--overwrite", action="store_true", help="delete an existing dataset first")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    load_policy(args.policy)  # Fail early on a bad policy spec
+    config = {
+        "num_shards": args.num_shards,
+        "steps_per_shard": args.steps_per_shard,
+        "num_envs": args.num_envs,
+        "policy": args.policy,
+        "noise": args.noise,
+        "seed": args.seed,
+        "dtype": args.dtype,
+        "env_kwargs": args.env_kwargs,
+    }
+
+    if args.overwrite:
+        shutil.rmtree(args.output, ignore_errors=True)
+    os.makedirs(args.output, exist_ok=True)
+    check_config(args.output, config)
+
+    seeds = np.random.SeedSequence(args.seed).spawn(args.num_shards)
+    done = completed_shards(args.output, args.num_shards)
+    pending = [index for index in range(args.num_shards) if index not in done]
+    if done:
+        print(f"Resuming: {len(done)} of {args.num_shards} shards already complete")
+
+    start = time.perf_counter()
+    transitions_per_shard = args.steps_per_shard * args.num_envs
+    if args.workers <= 1:
+        finished = (generate_shard(args.output, i, seeds[i], config) for i in pending)
+        _report(finished, len(pending), transitions_per_shard, start)
+    else:
+        with ProcessPoolExecutor(max_workers=args.workers) as pool:
+            futures = [pool.submit(generate_shard, args.output, i, seeds[i], config) for i in pending]
+            finished = (future.result() for future in as_completed(futures))
+            _report(finished, len(pending), transitions_per_shard, start)
+    print(f"Dataset complete: {args.num_shards} shards in {args.output}")
+
+
+def _report(finished, total, transitions_per_shard, start):
+    for count, index in enumerate(finished, 1):
+        elapsed = time.perf_counter() - start
+        rate = count * transitions_per_shard / elapsed
+        print(f"[{count}/{total}] {shard_name(index)} done ({rate:,.0f} transitions/s)", flush=True)
+
+
+if __name__ == "__main__":
+    main()
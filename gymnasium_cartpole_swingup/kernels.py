@@ -0,0 +1,135 @@
+"""
+Scalar step kernel for the cart-pole swing-up dynamics, optionally JIT-compiled.
+
+:func:`step_kernel` fuses integration, the built-in reward and the termination check of
+``CartPoleSwingUpEnv.step`` into one function of plain floats. When Numba is installed
+it is compiled by :func:`_get_kernels` with ``cache=True``, so the machine code is
+written next to this module (or to ``NUMBA_CACHE_DIR``) on first use and later processes
+only load it from disk. Without Numba the same source runs as ordinary Python, which is
+how ``CartPoleSwingUpEnv`` steps when ``jit=False``: this module holds the one scalar
+implementation of the dynamics, as ``functional.py`` holds the batched one.
+
+Numba is imported only when the first ``jit=True`` environment is constructed: it adds
+a few tenths of a second to the import, which processes that never use the kernel
+(e.g. vector-env workers) should not pay.
+"""
+
+import functools
+import importlib.util
+import math
+import types
+
+# Integer codes for the string options, since compiled code cannot branch on strings
+INTEGRATOR_CODES = {"euler": 0, "semi_implicit_euler": 1, "rk4": 2}
+COST_MODE_CODES = {"default": 0, "pilco": 1}
+
+NUMBA_AVAILABLE = importlib.util.find_spec("numba") is not None
+
+
+def _accelerations(x_dot, theta, theta_dot, force, m_p, total_m, m_p_l, pole_length, g, b):
+    """Cart and pole accelerations (CartPole dynamics equations)."""
+    s = math.sin(theta)
+    c = math.cos(theta)
+    xdot_update = (
+        -2 * m_p_l * (theta_dot**2) * s
+        + 3 * m_p * g * s * c
+        + 4 * force
+        - 4 * b * x_dot
+    ) / (4 * total_m - 3 * m_p * c**2)
+    thetadot_update = (
+        -3 * m_p_l * (theta_dot**2) * s * c
+        + 6 * total_m * g * s
+        + 6 * (force - b * x_dot) * c
+    ) / (4 * pole_length * total_m - 3 * m_p_l * c**2)
+    return xdot_update, thetadot_update
+
+
+def _reward(x, theta, pole_length, cost_mode, sigma_c):
+    """Built-in reward of a state: PILCO tip-distance (``cost_mode`` 1) or cos(theta) * cos(x)."""
+    if cost_mode == 1:
+        tip_x = x + pole_length * math.sin(theta)
+        tip_y = pole_length * math.cos(theta)
+        square_distance = tip_x**2 + (tip_y - pole_length) ** 2
+        return -(1 - math.exp(-square_distance / (2 * sigma_c**2)))
+    return math.cos(theta) * math.cos(x)
+
+
+def step_kernel(
+    x, x_dot, theta, theta_dot, force,
+    m_c, m_p, pole_length, g, b, dt, substeps, integrator,
+    x_threshold, cost_mode, sigma_c,
+):
+    """
+    Advance one environment step and evaluate the built-in reward and termination.
+
+    ``integrator`` and ``cost_mode`` are codes from :data:`INTEGRATOR_CODES` and
+    :data:`COST_MODE_CODES`. Returns ``(x, x_dot, theta, theta_dot, reward, terminated)``.
+    """
+    total_m = m_c + m_p
+    m_p_l = m_p * pole_length
+    h = dt / substeps
+    # A countdown rather than range() keeps the uncompiled kernel allocation-free
+    remaining = substeps
+    while remaining > 0:
+        remaining -= 1
+        if integrator == 0:
+            # Explicit Euler: positions advance with the old velocities
+            a, alpha = _accelerations(x_dot, theta, theta_dot, force, m_p, total_m, m_p_l, pole_length, g, b)
+            x = x + x_dot * h
+            theta = theta + theta_dot * h
+            x_dot = x_dot + a * h
+            theta_dot = theta_dot + alpha * h
+        elif integrator == 1:
+            # Semi-implicit Euler: positions advance with the updated velocities
+            a, alpha = _accelerations(x_dot, theta, theta_dot, force, m_p, total_m, m_p_l, pole_length, g, b)
+            x_dot = x_dot + a * h
+            theta_dot = theta_dot + alpha * h
+            x = x + x_dot * h
+            theta = theta + theta_dot * h
+        else:  # RK4
+            a1, b1 = _accelerations(x_dot, theta, theta_dot, force, m_p, total_m, m_p_l, pole_length, g, b)
+            xd2 = x_dot + a1 * h / 2
+            td2 = theta_dot + b1 * h / 2
+            a2, b2 = _accelerations(xd2, theta + theta_dot * h / 2, td2, force, m_p, total_m, m_p_l, pole_length, g, b)
+            xd3 = x_dot + a2 * h / 2
+            td3 = theta_dot + b2 * h / 2
+            a3, b3 = _accelerations(xd3, theta + td2 * h / 2, td3, force, m_p, total_m, m_p_l, pole_length, g, b)
+            xd4 = x_dot + a3 * h
+            td4 = theta_dot + b3 * h
+            a4, b4 = _accelerations(xd4, theta + td3 * h, td4, force, m_p, total_m, m_p_l, pole_length, g, b)
+            x = x + (x_dot + 2 * xd2 + 2 * xd3 + xd4) * h / 6
+            theta = theta + (theta_dot + 2 * td2 + 2 * td3 + td4) * h / 6
+            x_dot = x_dot + (a1 + 2 * a2 + 2 * a3 + a4) * h / 6
+            theta_dot = theta_dot + (b1 + 2 * b2 + 2 * b3 + b4) * h / 6
+
+    # Keep theta within [-pi, pi]
+    theta = ((theta + math.pi) % (2 * math.pi)) - math.pi
+
+    reward = _reward(x, theta, pole_length, cost_mode, sigma_c)
+    terminated = x < -x_threshold or x > x_threshold
+    return x, x_dot, theta, theta_dot, reward, terminated
+
+
+@functools.lru_cache(maxsize=None)
+def _get_kernels():
+    """
+    The step kernel to call, compiled with Numba on first use when it is installed.
+
+    Returns:
+        tuple: ``(step_kernel, compiled)``; without Numba, the pure-Python
+        :func:`step_kernel` and False.
+    """
+    if not NUMBA_AVAILABLE:
+        return step_kernel, False
+    import numba
+
+    # The compiled kernel must call compiled helpers, so it is built from the same code
+    # object with those globals rebound; the module functions stay Python
+    namespace = dict(
+        step_kernel.__globals__,
+        _accelerations=numba.njit(cache=True)(_accelerations),
+        _reward=numba.njit(cache=True)(_reward),
+    )
+    kernel = types.FunctionType(step_kernel.__code__, namespace, step_kernel.__name__)
+    kernel.__doc__ = step_kernel.__doc__
+    return numba.njit(cache=True)(kernel), True
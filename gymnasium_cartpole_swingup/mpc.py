@@ -0,0 +1,130 @@
+"""
+Sampling-based model-predictive reference controller for the swing-up task.
+
+:class:`MPPIController` plans on
+:meth:`CartPoleSwingUpFunctional.rollout`: every control step scores ``num_samples``
+candidate action sequences of ``horizon`` steps in a handful of batched NumPy calls,
+executes the first action of the plan and keeps the rest to warm-start the next step.
+It is meant as a strong, known-good baseline, e.g. to check that a parameterization
+of the environment can be solved at all, not as a fast learned policy.
+
+Example:
+    >>> env = gym.make("CartPoleSwingUp-v0")
+    >>> controller = MPPIController(env, seed=0)
+    >>> env.reset(seed=0)
+    >>> for _ in range(200):
+    ...     action = controller(env.unwrapped.state)
+    ...     env.step(action)
+"""
+
+import numpy as np
+
+from gymnasium_cartpole_swingup.functional import (
+    CartPoleSwingUpFunctional,
+    CartPoleSwingUpParams,
+)
+
+
+class MPPIController:
+    """
+    Model predictive path integral (MPPI) control on the batched swing-up dynamics.
+
+    Each iteration perturbs the current plan with Gaussian noise and replaces it by the
+    average of the sampled sequences weighted by ``exp(return / temperature)``.
+
+    Args:
+        env: Environment to control; its physical parameters, ``cost_mode``,
+            ``integrator`` and ``substeps`` become the model (optional).
+        params (CartPoleSwingUpParams): Model parameters (default: those of ``env``,
+            else the defaults).
+        horizon (int): Planning horizon in steps.
+        num_samples (int): Candidate action sequences per iteration.
+        num_iterations (int): Sampling iterations per control step.
+        noise_std (float): Standard deviation of the action perturbations.
+        temperature (float): Softmax temperature of the returns; lower is greedier.
+        termination_penalty (float): Subtracted from the return of sequences that leave
+            the track.
+        cost_mode (str): Override of the model reward ('default' or 'pilco').
+        integrator (str): Override of the model integrator.
+        substeps (int): Override of the model substeps.
+        reward_fn (callable): Batched ``(states, actions, next_states)`` reward used
+            instead of the built-in one.
+        seed (int): Seed of the sampling noise.
+    """
+
+    def __init__(
+        self,
+        env=None,
+        params: CartPoleSwingUpParams = None,
+        horizon: int = 15,
+        num_samples: int = 2000,
+        num_iterations: int = 1,
+        noise_std: float = 0.5,
+        temperature: float = 0.1,
+        termination_penalty: float = 100.0,
+        cost_mode: str = None,
+        integrator: str = None,
+        substeps: int = None,
+        reward_fn: callable = None,
+        seed: int = None,
+    ):
+        if horizon < 1 or num_samples < 1 or num_iterations < 1:
+            raise ValueError(
+                f"Invalid planner size: horizon={horizon}, num_samples={num_samples}, "
+                f"num_iterations={num_iterations}. Each must be at least 1"
+            )
+        # Model options default to those of the controlled environment
+        options = {}
+        if env is not None:
+            unwrapped = env.unwrapped
+            params = CartPoleSwingUpParams.from_env(unwrapped) if params is None else params
+            options = {
+                "cost_mode": unwrapped.cost_mode,
+                "integrator": unwrapped.integrator,
+                "substeps": unwrapped.substeps,
+            }
+        for name, value in (("cost_mode", cost_mode), ("integrator", integrator), ("substeps", substeps)):
+            if value is not None:
+                options[name] = value
+        self.func = CartPoleSwingUpFunctional(options)
+        self.params = self.func.default_params if params is None else params
+
+        self.horizon = horizon
+        self.num_samples = num_samples
+        self.num_iterations = num_iterations
+        self.noise_std = noise_std
+        self.temperature = temperature
+        self.termination_penalty = termination_penalty
+        self.reward_fn = reward_fn
+        self.np_random = np.random.default_rng(seed)
+        self.reset()
+
+    def reset(self):
+        """Forget the warm-start plan, e.g. at the start of an episode."""
+        self.mean = np.zeros((self.horizon, 1))
+
+    def returns(self, state, actions):
+        """Total reward of each ``(K, H, 1)`` action sequence from ``state``, with termination penalized."""
+        _, rewards, terminated, _, _ = self.func.rollout(
+            state, actions, None, self.params, reward_fn=self.reward_fn
+        )
+        return rewards.sum(axis=1) - self.termination_penalty * terminated.any(axis=1)
+
+    def plan(self, state):
+        """Optimize and return the ``(horizon, 1)`` action sequence from ``state``."""
+        state = np.asarray(state, dtype=np.float64)
+        for _ in range(self.num_iterations):
+            noise = self.np_random.normal(scale=self.noise_std, size=(self.num_samples, self.horizon, 1))
+            actions = np.clip(self.mean + noise, -1.0, 1.0)
+            returns = self.returns(state, actions)
+            weights = np.exp((returns - returns.max()) / self.temperature)
+            weights /= weights.sum()
+            self.mean = np.einsum("k,kha->ha", weights, actions)
+        return self.mean
+
+    def __call__(self, state):
+        """Action of shape ``(1,)`` for the physical ``state`` ``[x, x_dot, theta, theta_dot]``."""
+        action = self.plan(state)[0].astype(np.float32)
+        # Shift the plan by one step to warm-start the next call
+        self.mean = np.concatenate([self.mean[1:], np.zeros((1, 1))])
+        return action
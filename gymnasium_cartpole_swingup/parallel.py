@@ -0,0 +1,333 @@
+"""
+Multi-process, shared-memory form of :class:`CartPoleSwingUpVectorEnv`.
+
+A very large batch is partitioned into contiguous slices, one per worker process. The
+state, action, observation, reward and done arrays live in shared memory allocated by
+the parent, and every worker steps its own slice in place with the batched dynamics.
+Per step the parent only sends each worker a short command over a pipe; no arrays are
+pickled.
+"""
+
+import contextlib
+import multiprocessing
+import os
+import sys
+import traceback
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import VectorEnv
+
+from gymnasium_cartpole_swingup.rendering import rasterize
+from gymnasium_cartpole_swingup.vector import (
+    EPISODE_STATISTICS,
+    CartPoleSwingUpVectorEnv,
+)
+
+
+def _shared_array(ctx, shape, dtype):
+    """Allocate a zeroed shared-memory buffer for an array of ``shape`` and ``dtype``."""
+    nbytes = int(np.prod(shape)) * np.dtype(dtype).itemsize
+    return ctx.RawArray("b", max(nbytes, 1)), shape, np.dtype(dtype)
+
+
+def _as_array(buffer):
+    """NumPy view of a buffer created by :func:`_shared_array`."""
+    raw, shape, dtype = buffer
+    count = int(np.prod(shape))
+    return np.frombuffer(raw, dtype=dtype, count=count).reshape(shape)
+
+
+class CartPoleSwingUpParallelVectorEnv(VectorEnv):
+    """
+    Batched cart-pole swing-up environment stepped by a pool of worker processes.
+
+    The ``num_envs`` sub-environments are split into ``num_workers`` contiguous slices.
+    Each worker owns a :class:`CartPoleSwingUpVectorEnv` for its slice and reads its
+    actions from, and writes its states, observations, rewards and done flags to, shared
+    arrays of shape ``(num_envs, ...)``. Stepping semantics, including
+    ``AutoresetMode.NEXT_STEP``, are those of :class:`CartPoleSwingUpVectorEnv`.
+
+    Use it when a single process cannot keep up with the batch, e.g. tens of thousands
+    of sub-environments. Unlike ``gymnasium.vector.AsyncVectorEnv`` with one
+    :class:`CartPoleSwingUpEnv` per process, the per-step IPC cost is one small message
+    per worker rather than per sub-environment.
+
+    Args:
+        num_envs (int): Number of sub-environments.
+        num_workers (int): Number of worker processes (default: CPU count, at most
+            ``num_envs``).
+        context (str): Multiprocessing start method ('fork', 'spawn', 'forkserver' or
+            None for the platform default). With 'spawn', ``custom_reward_fn`` must be
+            picklable.
+        copy (bool): Whether ``reset`` and ``step`` return copies of the shared arrays.
+            With ``copy=False`` the returned arrays are overwritten by the next call.
+        **kwargs: Any other keyword argument of :class:`CartPoleSwingUpVectorEnv`
+            (``render_mode``, physical parameters, ``obs_mode``, ``cost_mode``, ...).
+
+    Note:
+        With ``profile=True``, :attr:`profiler` times the parent side of ``step``
+        ('step.dispatch', 'step.wait', 'step.output') and :meth:`worker_profiles`
+        returns the phase counters of each worker's :class:`CartPoleSwingUpVectorEnv`.
+
+        :attr:`state` is the shared ``(num_envs, 4)`` array itself. Workers read it at
+        the start of every step, so it may be edited in place between steps.
+
+        ``reset(seed=s)`` seeds worker ``i`` with ``s + i``; trajectories depend on
+        ``num_workers`` only through the initial-state (and ``randomize``) draws.
+        Randomized parameters are drawn by the workers and mirrored in
+        :attr:`params` as shared ``(num_envs,)`` arrays. With
+        ``episode_statistics=True`` the workers' episode statistics are gathered
+        through shared arrays into the same ``info["episode"]`` as in
+        :class:`CartPoleSwingUpVectorEnv`.
+    """
+
+    metadata = CartPoleSwingUpVectorEnv.metadata
+
+    def __init__(
+        self,
+        num_envs: int = 1,
+        num_workers: int = None,
+        context: str = None,
+        copy: bool = True,
+        **kwargs,
+    ):
+        # Validates the arguments and provides spaces and parameters, in this process
+        template = CartPoleSwingUpVectorEnv(num_envs=num_envs, **kwargs)
+        self.num_envs = num_envs
+        self.render_mode = template.render_mode
+        self.params = template.params
+        self.t_limit = template.t_limit
+        self.single_action_space = template.single_action_space
+        self.action_space = template.action_space
+        self.single_observation_space = template.single_observation_space
+        self.observation_space = template.observation_space
+        self.copy = copy
+        # Parent-side phases; the workers keep their own profilers (see worker_profiles)
+        self.profiler = template.profiler
+
+        if num_workers is None:
+            num_workers = os.cpu_count() or 1
+        num_workers = max(1, min(num_workers, num_envs))
+        self.num_workers = num_workers
+        bounds = np.linspace(0, num_envs, num_workers + 1).astype(int)
+        self.slices = [slice(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+
+        ctx = multiprocessing.get_context(context)
+        obs_space = self.single_observation_space
+        self._buffers = {
+            "state": _shared_array(ctx, (num_envs, 4), template.dtype),
+            "actions": _shared_array(ctx, (num_envs, 1), np.float32),
+            "observations": _shared_array(ctx, (num_envs,) + obs_space.shape, obs_space.dtype),
+            "rewards": _shared_array(ctx, (num_envs,), np.float64),
+            "terminated": _shared_array(ctx, (num_envs,), np.bool_),
+            "truncated": _shared_array(ctx, (num_envs,), np.bool_),
+        }
+        # Per-sub-environment parameters drawn by the workers (see randomize)
+        for name in template.randomize:
+            self._buffers[f"params.{name}"] = _shared_array(ctx, (num_envs,), template.dtype)
+        # Statistics of the episodes that ended in the last step (see episode_statistics)
+        if template.episode_statistics:
+            for key, dtype in EPISODE_STATISTICS.items():
+                self._buffers[f"episode.{key}"] = _shared_array(ctx, (num_envs,), dtype)
+        self._episode_statistics = template.episode_statistics
+        self._arrays = {name: _as_array(buffer) for name, buffer in self._buffers.items()}
+        self.state = self._arrays["state"]
+        self.params = self.params._replace(
+            **{name: self._arrays[f"params.{name}"] for name in template.randomize}
+        )
+        self._has_reset = False
+
+        self.parent_pipes, self.processes = [], []
+        for index, bounds_slice in enumerate(self.slices):
+            parent_pipe, child_pipe = ctx.Pipe()
+            process = ctx.Process(
+                target=_worker,
+                name=f"CartPoleSwingUpWorker-{index}",
+                args=(child_pipe, parent_pipe, kwargs, bounds_slice, self._buffers),
+                daemon=True,
+            )
+            self.parent_pipes.append(parent_pipe)
+            self.processes.append(process)
+            process.start()
+            child_pipe.close()
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+        self._assert_is_running()
+
+        initial_state = None
+        if options is not None and "initial_state" in options:
+            initial_state = np.broadcast_to(
+                np.asarray(options["initial_state"], dtype=self.state.dtype), (self.num_envs, 4)
+            )
+        for index, (pipe, bounds_slice) in enumerate(zip(self.parent_pipes, self.slices)):
+            worker_seed = None if seed is None else seed + index
+            worker_options = None
+            if initial_state is not None:
+                worker_options = {"initial_state": initial_state[bounds_slice]}
+            pipe.send(("reset", (worker_seed, worker_options)))
+        self._receive()
+        self._has_reset = True
+
+        return self._output(self._arrays["observations"]), {}
+
+    def step(self, actions):
+        assert self._has_reset, "Call reset before using step method."
+        self._assert_is_running()
+        profiler = self.profiler
+        if profiler is not None:
+            lap = profiler.clock()
+
+        self._arrays["actions"][:] = np.asarray(actions).reshape(self.num_envs, 1)
+        for pipe in self.parent_pipes:
+            pipe.send(("step", None))
+        if profiler is not None:
+            lap = profiler.lap("step.dispatch", lap)
+        self._receive()
+        if profiler is not None:
+            lap = profiler.lap("step.wait", lap)
+
+        arrays = self._arrays
+        info = {}
+        if self._episode_statistics:
+            done = arrays["terminated"] | arrays["truncated"]
+            if done.any():
+                info["episode"] = {
+                    key: np.where(done, arrays[f"episode.{key}"], 0) for key in EPISODE_STATISTICS
+                }
+                info["_episode"] = done
+        result = (
+            self._output(arrays["observations"]),
+            self._output(arrays["rewards"]),
+            self._output(arrays["terminated"]),
+            self._output(arrays["truncated"]),
+            info,
+        )
+        if profiler is not None:
+            profiler.lap("step.output", lap)
+        return result
+
+    def worker_profiles(self, reset: bool = False):
+        """
+        Snapshots of the worker profilers, one per worker (empty without ``profile=True``).
+
+        Args:
+            reset (bool): Clear the worker counters after reading them.
+        """
+        self._assert_is_running()
+        for pipe in self.parent_pipes:
+            pipe.send(("profile", reset))
+        return self._receive()
+
+    def render(self):
+        if self.render_mode is None:
+            gym.logger.warn(
+                "You are calling render method without specifying any render mode. "
+                "You can specify the render_mode at initialization, "
+                'e.g. CartPoleSwingUpParallelVectorEnv(num_envs=N, render_mode="rgb_array")'
+            )
+            return None
+        if not self._has_reset:
+            return None
+        return rasterize(self.state, self.params.pole_length)
+
+    def _output(self, array):
+        return array.copy() if self.copy else array
+
+    def _assert_is_running(self):
+        if self.closed:
+            raise gym.error.ClosedEnvironmentError(
+                f"Trying to operate on `{type(self).__name__}`, after a call to `close()`."
+            )
+
+    def _receive(self):
+        """Wait for every worker, re-raise the first reported error, return the replies."""
+        replies, errors = [], []
+        for index, pipe in enumerate(self.parent_pipes):
+            try:
+                success, message = pipe.recv()
+            except EOFError:
+                success, message = False, "worker exited unexpectedly"
+            if not success:
+                errors.append((index, message))
+            replies.append(message)
+        if errors:
+            index, message = errors[0]
+            self.close(terminate=True)
+            raise RuntimeError(f"Worker {index} failed:\n{message}")
+        return replies
+
+    def close_extras(self, terminate: bool = False):
+        for pipe, process in zip(self.parent_pipes, self.processes):
+            if not terminate and process.is_alive():
+                with contextlib.suppress(BrokenPipeError, OSError):
+                    pipe.send(("close", None))
+        for pipe, process in zip(self.parent_pipes, self.processes):
+            # A worker whose start failed (e.g. unpicklable arguments under spawn) has no
+            # process to stop
+            if process.pid is not None:
+                if terminate:
+                    process.terminate()
+                process.join(timeout=5)
+                if process.is_alive():
+                    process.terminate()
+                    process.join()
+            pipe.close()
+
+    def __del__(self):
+        if not getattr(self, "closed", True) and hasattr(self, "processes"):
+            self.close(terminate=True)
+
+
+def _worker(pipe, parent_pipe, env_kwargs, bounds_slice, buffers):
+    """Step one slice of the shared arrays on command from the parent."""
+    parent_pipe.close()
+    arrays = {name: _as_array(buffer)[bounds_slice] for name, buffer in buffers.items()}
+    try:
+        env = CartPoleSwingUpVectorEnv(
+            num_envs=bounds_slice.stop - bounds_slice.start, **env_kwargs
+        )
+        while True:
+            command, data = pipe.recv()
+            if command == "reset":
+                seed, options = data
+                observations, _ = env.reset(seed=seed, options=options)
+                arrays["state"][:] = env.state
+                arrays["observations"][:] = observations
+                _publish_params(env, arrays)
+            elif command == "step":
+                # The shared state is authoritative; the parent may have edited it
+                env.state = arrays["state"]
+                observations, rewards, terminated, truncated, info = env.step(arrays["actions"])
+                arrays["state"][:] = env.state
+                arrays["observations"][:] = observations
+                arrays["rewards"][:] = rewards
+                arrays["terminated"][:] = terminated
+                arrays["truncated"][:] = truncated
+                for key, values in info.get("episode", {}).items():
+                    arrays[f"episode.{key}"][:] = values
+                _publish_params(env, arrays)
+            elif command == "profile":
+                reply = {} if env.profiler is None else env.profiler.snapshot()
+                if data and env.profiler is not None:
+                    env.profiler.reset()
+                pipe.send((True, reply))
+                continue
+            elif command == "close":
+                break
+            else:
+                raise RuntimeError(f"Unknown command {command!r}")
+            pipe.send((True, None))
+    except (KeyboardInterrupt, EOFError):
+        pass
+    except Exception:
+        pipe.send((False, "".join(traceback.format_exception(*sys.exc_info()))))
+    finally:
+        pipe.close()
+
+
+def _publish_params(env, arrays):
+    """Copy the randomized parameters of a worker's slice to the shared arrays."""
+    for name in env.randomize:
+        arrays[f"params.{name}"][:] = getattr(env.params, name)
@@ -0,0 +1,84 @@
+"""
+Opt-in per-phase timing for ``step`` and ``render``.
+
+Environments created with ``profile=True`` hold a :class:`PhaseProfiler` in their
+``profiler`` attribute and report the time spent in each phase of ``step`` (e.g.
+``"step.dynamics"``) and ``render`` (e.g. ``"render.pixels"``). With the default
+``profile=False`` the attribute is None and each phase boundary costs one ``is None``
+check.
+
+Example:
+    >>> env = gym.make("CartPoleSwingUp-v0", profile=True)
+    >>> ...  # run some episodes
+    >>> print(env.unwrapped.profiler.report())
+    >>> env.unwrapped.profiler.reset()
+"""
+
+import time
+
+
+class PhaseProfiler:
+    """
+    Cumulative wall-clock time and call counts per named phase.
+
+    Instrumented code reads ``start = profiler.clock()`` once and then calls
+    ``start = profiler.lap(phase, start)`` at the end of each phase, so consecutive
+    phases share one clock reading per boundary.
+
+    Args:
+        clock (callable): Monotonic clock returning seconds (default ``time.perf_counter``).
+    """
+
+    def __init__(self, clock=time.perf_counter):
+        self.clock = clock
+        self._totals = {}  # phase -> [seconds, calls]
+
+    def lap(self, phase: str, start: float) -> float:
+        """Charge the time since ``start`` to ``phase`` and return the current time."""
+        now = self.clock()
+        entry = self._totals.get(phase)
+        if entry is None:
+            self._totals[phase] = [now - start, 1]
+        else:
+            entry[0] += now - start
+            entry[1] += 1
+        return now
+
+    def merge(self, snapshot: dict):
+        """Add the counters of a :meth:`snapshot` (e.g. from another process)."""
+        for phase, stats in snapshot.items():
+            entry = self._totals.setdefault(phase, [0.0, 0])
+            entry[0] += stats["total_s"]
+            entry[1] += stats["calls"]
+
+    def snapshot(self) -> dict:
+        """
+        Copy of the counters as ``{phase: {"total_s", "calls", "mean_us"}}``.
+
+        Later phases do not modify a snapshot, so two snapshots can be compared to
+        measure an interval.
+        """
+        return {
+            phase: {
+                "total_s": total,
+                "calls": calls,
+                "mean_us": total / calls * 1e6 if calls else 0.0,
+            }
+            for phase, (total, calls) in self._totals.items()
+        }
+
+    def reset(self):
+        """Clear all counters."""
+        self._totals.clear()
+
+    def report(self) -> str:
+        """Human-readable table of the counters, slowest phase first."""
+        snapshot = self.snapshot()
+        grand_total = sum(stats["total_s"] for stats in snapshot.values()) or 1.0
+        lines = [f"{'phase':<22}{'calls':>10}{'total ms':>12}{'mean us':>10}{'share':>8}"]
+        for phase, stats in sorted(snapshot.items(), key=lambda item: -item[1]["total_s"]):
+            lines.append(
+                f"{phase:<22}{stats['calls']:>10}{stats['total_s'] * 1e3:>12.2f}"
+                f"{stats['mean_us']:>10.2f}{stats['total_s'] / grand_total:>8.1%}"
+            )
+        return "\n".join(lines)
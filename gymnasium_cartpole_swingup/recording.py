@@ -0,0 +1,499 @@
+"""
+Streaming transition recorder writing memory-mapped ``.npy`` columns.
+
+A dataset is a directory with one ``.npy`` file per column:
+
+- ``states.npy``, ``next_states.npy``: ``(n, 4)`` physical states before/after each step
+- ``actions.npy``: ``(n, 1)`` actions
+- ``rewards.npy``: ``(n,)`` rewards
+- ``terminated.npy``, ``truncated.npy``: ``(n,)`` episode-end flags
+- ``episodes.npy``: ``(num_episodes, 4)`` int64 rows ``[start, length, env_id, complete]``
+
+Transitions of one episode are stored contiguously, so an episode is a plain slice of
+every column. Files are ordinary ``.npy`` files readable with ``np.load(..., mmap_mode="r")``;
+while recording, their headers are rewritten after every flush so that the committed
+prefix can already be read.
+
+:class:`TransitionRecorder` buffers the current episode of each sub-environment in
+memory and hands finished episodes to a background thread, which appends them to
+memory-mapped files that grow geometrically. Stepping never waits for the disk unless
+more than ``max_pending`` episodes are queued. :class:`RecordTransitions` and
+:class:`RecordTransitionsVector` attach a recorder to a scalar or vector environment,
+and :class:`TransitionDataset` opens a dataset lazily.
+"""
+
+import json
+import os
+import queue
+import struct
+import threading
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium.vector import VectorWrapper
+
+# Every column file starts with a fixed-size .npy header, so it can be rewritten in
+# place when the file grows
+HEADER_SIZE = 128
+
+COLUMNS = ("states", "actions", "rewards", "next_states", "terminated", "truncated")
+EPISODE_FIELDS = ("start", "length", "env_id", "complete")
+
+
+def _column_specs(dtype):
+    """Item shape and dtype of every transition column."""
+    return {
+        "states": ((4,), dtype),
+        "actions": ((1,), dtype),
+        "rewards": ((), dtype),
+        "next_states": ((4,), dtype),
+        "terminated": ((), np.bool_),
+        "truncated": ((), np.bool_),
+    }
+
+
+def _write_header(f, dtype, shape):
+    """Write a version 1.0 ``.npy`` header padded to :data:`HEADER_SIZE` bytes."""
+    header = repr({
+        "descr": np.lib.format.dtype_to_descr(np.dtype(dtype)),
+        "fortran_order": False,
+        "shape": tuple(int(n) for n in shape),
+    })
+    prefix = np.lib.format.magic(1, 0)
+    padding = HEADER_SIZE - len(prefix) - 2 - len(header) - 1
+    if padding < 0:
+        raise ValueError(f"Array header too long for shape {shape}")
+    body = (header + " " * padding + "\n").encode("latin1")
+    f.seek(0)
+    f.write(prefix + struct.pack("<H", len(body)) + body)
+
+
+class _Column:
+    """Append-only ``.npy`` file backed by a memory map that grows geometrically."""
+
+    def __init__(self, path, item_shape, dtype, capacity):
+        self.path = path
+        self.item_shape = tuple(item_shape)
+        self.dtype = np.dtype(dtype)
+        self.row_bytes = int(np.prod(self.item_shape, dtype=np.int64)) * self.dtype.itemsize
+        self.size = 0
+        self.capacity = 0
+        self._map = None
+        with open(path, "wb") as f:
+            _write_header(f, self.dtype, (0,) + self.item_shape)
+        self._resize(capacity)
+
+    def _resize(self, capacity):
+        if self._map is not None:
+            self._map.flush()
+            self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + capacity * self.row_bytes)
+        self.capacity = capacity
+        if capacity > 0:
+            self._map = np.memmap(
+                self.path,
+                dtype=self.dtype,
+                mode="r+",
+                offset=HEADER_SIZE,
+                shape=(capacity,) + self.item_shape,
+            )
+
+    def append(self, rows):
+        n = len(rows)
+        if self.size + n > self.capacity:
+            self._resize(max(2 * self.capacity, self.size + n))
+        self._map[self.size:self.size + n] = rows
+        self.size += n
+
+    def flush(self):
+        """Write dirty pages and publish the committed length in the header."""
+        if self._map is not None:
+            self._map.flush()
+        with open(self.path, "r+b") as f:
+            _write_header(f, self.dtype, (self.size,) + self.item_shape)
+
+    def close(self):
+        """Flush and trim the file to the committed rows."""
+        self.flush()
+        self._map = None
+        with open(self.path, "r+b") as f:
+            f.truncate(HEADER_SIZE + self.size * self.row_bytes)
+
+
+class TransitionRecorder:
+    """
+    Streams transitions of ``num_envs`` sub-environments to a dataset directory.
+
+    Call :meth:`record` once per step with batched arrays (leading dimension
+    ``num_envs``). Steps are kept in an in-memory ring buffer; when episodes end, their
+    rows are gathered into one block, ordered episode by episode, and queued for the
+    background writer thread. Episodes cut short by :meth:`end_episodes` (e.g. on a
+    manual reset) or still running at :meth:`close` are written with ``complete = 0``.
+
+    The ring buffer holds every running episode, so it has at least as many rows as the
+    longest one (256 to start with, doubling as needed), each holding one transition per
+    sub-environment: about ``rows * num_envs * (10 * itemsize + 2)`` bytes, e.g. 700 MB
+    for 65536 sub-environments at float32. Record very wide batches in several shards,
+    or with fewer ``num_envs`` per recorder.
+
+    Args:
+        path (str): Output directory (created if missing; existing columns are
+            overwritten).
+        num_envs (int): Number of sub-environments recorded per call.
+        dtype: Floating dtype of the state, action and reward columns.
+        initial_capacity (int): Rows preallocated per column file; files double in size
+            whenever they fill up.
+        max_pending (int): Maximum number of blocks of finished episodes (at most one
+            per step) queued for the writer before :meth:`record` blocks, bounding memory
+            use when the disk falls behind.
+        flush_interval (float): Seconds between flushes of written data to disk, which
+            also publish it to concurrent readers.
+        metadata (dict): Extra JSON-serializable information stored in ``meta.json``.
+
+    Example:
+        >>> with TransitionRecorder("data/run0") as recorder:
+        ...     recorder.record(states, actions, rewards, next_states, terminated, truncated)
+    """
+
+    def __init__(
+        self,
+        path: str,
+        num_envs: int = 1,
+        dtype=np.float32,
+        initial_capacity: int = 1 << 16,
+        max_pending: int = 256,
+        flush_interval: float = 1.0,
+        metadata: dict = None,
+    ):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.num_envs = num_envs
+        self.dtype = np.dtype(dtype)
+        self.metadata = dict(metadata or {})
+        self.flush_interval = flush_interval
+        self._specs = _column_specs(self.dtype)
+
+        self._columns = {
+            name: _Column(os.path.join(path, f"{name}.npy"), shape, dt, initial_capacity)
+            for name, (shape, dt) in self._specs.items()
+        }
+        self._episodes = _Column(
+            os.path.join(path, "episodes.npy"), (len(EPISODE_FIELDS),), np.int64,
+            max(initial_capacity // 64, 16),
+        )
+
+        # Time-major ring buffer of recent steps: row ``step % capacity`` holds the whole
+        # batch of that step, and each sub-environment remembers the step its current
+        # episode started at. It grows when an episode outlives the ring.
+        self._stage_capacity = 256
+        self._stage = {
+            name: np.empty((self._stage_capacity, num_envs) + shape, dtype=dt)
+            for name, (shape, dt) in self._specs.items()
+        }
+        self._step = 0
+        self._episode_start = np.zeros(num_envs, dtype=np.int64)
+
+        self._queue = queue.Queue(maxsize=max_pending)
+        self._error = None
+        self._closed = False
+        self._writer = threading.Thread(target=self._write_loop, name="TransitionRecorder", daemon=True)
+        self._writer.start()
+
+    def record(self, states, actions, rewards, next_states, terminated, truncated, mask=None):
+        """
+        Append one transition per sub-environment.
+
+        Args:
+            states, actions, rewards, next_states, terminated, truncated: Arrays with a
+                leading ``num_envs`` dimension.
+            mask (np.ndarray): Optional boolean ``(num_envs,)`` array; sub-environments
+                where it is False are skipped (e.g. autoreset steps of a vector env).
+        """
+        self._raise_if_failed()
+        step = self._step
+        if step - self._episode_start.min() >= self._stage_capacity:
+            self._grow_stage()
+        row = step % self._stage_capacity
+        stage = self._stage
+        stage["states"][row] = np.reshape(states, (self.num_envs, 4))
+        stage["actions"][row] = np.reshape(actions, (self.num_envs, 1))
+        stage["rewards"][row] = np.reshape(rewards, self.num_envs)
+        stage["next_states"][row] = np.reshape(next_states, (self.num_envs, 4))
+        stage["terminated"][row] = np.reshape(terminated, self.num_envs)
+        stage["truncated"][row] = np.reshape(truncated, self.num_envs)
+        self._step = step + 1
+
+        if mask is not None:
+            # Skipped rows are excluded by starting those episodes at the next step
+            self._episode_start[~np.asarray(mask, dtype=np.bool_)] = step + 1
+        done = stage["terminated"][row] | stage["truncated"][row]
+        if mask is not None:
+            done &= mask
+        if done.any():
+            self._emit(np.flatnonzero(done), complete=True)
+
+    def end_episodes(self, mask=None):
+        """
+        Queue the running episodes as incomplete; the next recorded step starts new ones.
+
+        Args:
+            mask (np.ndarray): Optional boolean ``(num_envs,)`` array selecting the
+                sub-environments to end (default: all).
+        """
+        self._raise_if_failed()
+        env_ids = np.arange(self.num_envs) if mask is None else np.flatnonzero(mask)
+        self._emit(env_ids, complete=False)
+
+    def _grow_stage(self):
+        capacity = self._stage_capacity
+        steps = np.arange(self._episode_start.min(), self._step)
+        for name, stage in self._stage.items():
+            grown = np.empty((2 * capacity,) + stage.shape[1:], dtype=stage.dtype)
+            grown[steps % (2 * capacity)] = stage[steps % capacity]
+            self._stage[name] = grown
+        self._stage_capacity = 2 * capacity
+
+    def _emit(self, env_ids, complete):
+        """Queue the staged episodes of ``env_ids`` as one block and restart them."""
+        starts = self._episode_start[env_ids]
+        lengths = self._step - starts
+        keep = lengths > 0
+        env_ids, starts, lengths = env_ids[keep], starts[keep], lengths[keep]
+        self._episode_start[env_ids] = self._step
+        if len(env_ids) == 0:
+            return
+        # Ring rows and columns of every transition, episode after episode
+        offsets = np.arange(lengths.sum()) - np.repeat(np.cumsum(lengths) - lengths, lengths)
+        rows = (np.repeat(starts, lengths) + offsets) % self._stage_capacity
+        columns = np.repeat(env_ids, lengths)
+        block = {name: stage[rows, columns] for name, stage in self._stage.items()}
+        self._queue.put((block, lengths, env_ids, complete))
+
+    def _write_loop(self):
+        last_flush = time.monotonic()
+        dirty = False
+        try:
+            while True:
+                try:
+                    item = self._queue.get(timeout=self.flush_interval)
+                except queue.Empty:
+                    item = ()
+                if item is None:
+                    break
+                if item:
+                    block, lengths, env_ids, complete = item
+                    start = self._columns["states"].size
+                    for name, column in self._columns.items():
+                        column.append(block[name])
+                    self._episodes.append(np.column_stack([
+                        start + np.cumsum(lengths) - lengths,
+                        lengths,
+                        env_ids,
+                        np.full(len(lengths), int(complete)),
+                    ]).astype(np.int64))
+                    dirty = True
+                if dirty and time.monotonic() - last_flush >= self.flush_interval:
+                    self._flush()
+                    dirty = False
+                    last_flush = time.monotonic()
+        except BaseException as e:  # Surfaced in the stepping thread
+            self._error = e
+            # Keep draining so that producers never block on a dead writer
+            while self._queue.get() is not None:
+                pass
+
+    def _flush(self):
+        for column in self._columns.values():
+            column.flush()
+        # The episode table last, so that readers never see episodes past the data
+        self._episodes.flush()
+
+    def _raise_if_failed(self):
+        if self._error is not None:
+            raise RuntimeError(f"Transition writer failed: {self._error!r}") from self._error
+
+    def close(self):
+        """Write unfinished episodes as incomplete, finalize all files and stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        self._emit(np.arange(self.num_envs), complete=False)  # Not end_episodes: may have failed
+        self._queue.put(None)
+        self._writer.join()
+        self._raise_if_failed()
+        for column in self._columns.values():
+            column.close()
+        self._episodes.close()
+
+        meta = {
+            "num_transitions": self._columns["states"].size,
+            "num_episodes": self._episodes.size,
+            "dtype": self.dtype.name,
+            "columns": list(self._columns),
+            "episode_fields": list(EPISODE_FIELDS),
+            **self.metadata,
+        }
+        with open(os.path.join(self.path, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class RecordTransitions(gym.Wrapper):
+    """
+    Record every transition of a :class:`CartPoleSwingUpEnv` with a :class:`TransitionRecorder`.
+
+    States are the physical ``[x, x_dot, theta, theta_dot]`` of the unwrapped
+    environment, independent of ``obs_mode``. A ``reset`` before the episode ended
+    stores the steps so far as an incomplete episode.
+
+    Args:
+        env (gym.Env): Environment to record (possibly wrapped).
+        path (str): Output directory, used when ``recorder`` is not given.
+        recorder (TransitionRecorder): Existing single-environment recorder.
+        **recorder_kwargs: Forwarded to :class:`TransitionRecorder`.
+    """
+
+    def __init__(self, env, path: str = None, recorder: TransitionRecorder = None, **recorder_kwargs):
+        super().__init__(env)
+        self.recorder = recorder if recorder is not None else TransitionRecorder(path, **recorder_kwargs)
+
+    def reset(self, *, seed=None, options=None):
+        self.recorder.end_episodes()
+        return self.env.reset(seed=seed, options=options)
+
+    def step(self, action):
+        # A copy: with preallocate=True the state array is updated in place
+        state = np.array(self.env.unwrapped.state, dtype=np.float64)
+        obs, reward, terminated, truncated, info = self.env.step(action)
+        self.recorder.record(
+            state[None],
+            np.asarray(action)[None],
+            np.asarray([reward]),
+            np.asarray(self.env.unwrapped.state, dtype=np.float64)[None],
+            np.asarray([terminated]),
+            np.asarray([truncated]),
+        )
+        return obs, reward, terminated, truncated, info
+
+    def close(self):
+        self.recorder.close()
+        super().close()
+
+
+class RecordTransitionsVector(VectorWrapper):
+    """
+    Record the transitions of a batched CartPoleSwingUp vector environment.
+
+    Works with any vector environment exposing the batched physical state as
+    ``unwrapped.state`` (:class:`CartPoleSwingUpVectorEnv`,
+    :class:`CartPoleSwingUpParallelVectorEnv`). Autoreset steps are not recorded, and
+    ``reset`` stores the running episodes as incomplete.
+
+    Args:
+        env (VectorEnv): Vector environment to record.
+        path (str): Output directory, used when ``recorder`` is not given.
+        recorder (TransitionRecorder): Existing recorder with matching ``num_envs``.
+        **recorder_kwargs: Forwarded to :class:`TransitionRecorder`.
+    """
+
+    def __init__(self, env, path: str = None, recorder: TransitionRecorder = None, **recorder_kwargs):
+        super().__init__(env)
+        if recorder is None:
+            recorder = TransitionRecorder(path, num_envs=env.num_envs, **recorder_kwargs)
+        self.recorder = recorder
+        self._autoreset = np.zeros(env.num_envs, dtype=np.bool_)
+
+    def reset(self, *, seed=None, options=None):
+        self.recorder.end_episodes()
+        self._autoreset = np.zeros(self.num_envs, dtype=np.bool_)
+        return self.env.reset(seed=seed, options=options)
+
+    def step(self, actions):
+        states = np.array(self.env.unwrapped.state, dtype=np.float64)
+        obs, rewards, terminated, truncated, info = self.env.step(actions)
+        self.recorder.record(
+            states,
+            actions,
+            rewards,
+            np.asarray(self.env.unwrapped.state),
+            terminated,
+            truncated,
+            mask=~self._autoreset,
+        )
+        self._autoreset = np.logical_or(terminated, truncated)
+        return obs, rewards, terminated, truncated, info
+
+    def close(self, **kwargs):
+        self.recorder.close()
+        return super().close(**kwargs)
+
+
+class TransitionDataset:
+    """
+    Lazy reader of a dataset written by :class:`TransitionRecorder`.
+
+    Columns are memory-mapped on first access, so opening a dataset and slicing a few
+    episodes touches only those pages. Can be opened while recording is in progress;
+    it then sees the episodes published by the last flush.
+
+    Example:
+        >>> dataset = TransitionDataset("data/run0")
+        >>> len(dataset)                    # number of episodes
+        >>> episode = dataset[3]            # dict of column slices of episode 3
+        >>> rewards = dataset["rewards"]    # whole column as a read-only memmap
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self._columns = {}
+        self.episodes = np.load(os.path.join(path, "episodes.npy"), mmap_mode="r")
+
+    @property
+    def metadata(self) -> dict:
+        """Contents of ``meta.json`` (empty while recording is in progress)."""
+        meta_path = os.path.join(self.path, "meta.json")
+        if not os.path.exists(meta_path):
+            return {}
+        with open(meta_path) as f:
+            return json.load(f)
+
+    def column(self, name: str) -> np.ndarray:
+        """Read-only memory map of a whole column."""
+        if name not in self._columns:
+            self._columns[name] = np.load(os.path.join(self.path, f"{name}.npy"), mmap_mode="r")
+        return self._columns[name]
+
+    @property
+    def num_transitions(self) -> int:
+        """Number of transitions in the published episodes."""
+        if len(self.episodes) == 0:
+            return 0
+        start, length = self.episodes[-1, :2]
+        return int(start + length)
+
+    def episode(self, index: int) -> dict:
+        """Column slices (memory-map views) of episode ``index``."""
+        start, length = (int(v) for v in self.episodes[index, :2])
+        episode = {name: self.column(name)[start:start + length] for name in COLUMNS}
+        episode["env_id"] = int(self.episodes[index, 2])
+        episode["complete"] = bool(self.episodes[index, 3])
+        return episode
+
+    def __len__(self):
+        return len(self.episodes)
+
+    def __getitem__(self, key):
+        if isinstance(key, str):
+            return self.column(key)
+        return self.episode(key)
+
+    def __iter__(self):
+        for index in range(len(self)):
+            yield self.episode(index)
@@ -0,0 +1,450 @@
+"""
+Shared batched simulator served to many client processes over a local socket.
+
+:class:`SimulationServer` runs an asyncio server on a Unix socket or on localhost TCP.
+Each connection is one environment with its own state, step counter and generator.
+Step requests that arrive while the server is busy, or within ``max_batch_delay``
+seconds of each other, are advanced together with one call of the batched dynamics of
+:class:`CartPoleSwingUpFunctional`. :class:`RemoteCartPoleSwingUpEnv` is the matching
+client and implements ``gymnasium.Env``, so actors only need NumPy and a socket.
+
+Messages are length-prefixed binary frames: a request is ``!IB`` (payload length,
+opcode) followed by the payload and a reply is ``!IB`` (payload length, status)
+followed by the payload, an error message if the status is not 0. Actions
+travel as raw float32 bytes and observations as raw bytes of the observation dtype;
+nothing is pickled.
+
+Example:
+    >>> server = SimulationServer(cost_mode="pilco")
+    >>> address = server.start_background(path="/tmp/cartpole.sock")
+    >>> env = RemoteCartPoleSwingUpEnv(address)  # in any process
+    >>> obs, info = env.reset(seed=0)
+    >>> obs, reward, terminated, truncated, info = env.step(env.action_space.sample())
+    >>> env.stats()  # client-side request latency
+    >>> server.stats()  # batch sizes and throughput
+"""
+
+import asyncio
+import contextlib
+import json
+import os
+import socket
+import struct
+import threading
+import time
+from collections import deque
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+
+from gymnasium_cartpole_swingup.cartpole_swingup import make_observation_space
+
+_REQUEST = struct.Struct("!IB")
+_REPLY = struct.Struct("!IB")
+_STEP_RESULT = struct.Struct("!d??")
+
+OP_INFO = 0
+OP_RESET = 1
+OP_STEP = 2
+OP_STATS = 3
+
+
+class _Session:
+    """Simulator state of one connected client."""
+
+    __slots__ = ("state", "t", "np_random")
+
+    def __init__(self):
+        self.state = None
+        self.t = 0
+        self.np_random = np.random.default_rng()
+
+
+class SimulationServer:
+    """
+    Asyncio server that steps the environments of all connected clients in batches.
+
+    Args:
+        max_batch_delay (float): Seconds to wait after the first pending step request
+            for more requests to join the batch. 0 batches only the requests that are
+            already pending, which adds no latency.
+        max_batch_size (int): Maximum number of requests advanced in one batch.
+        **kwargs: Keyword arguments of :class:`CartPoleSwingUpVectorEnv` defining the
+            simulated environment (physical parameters, ``obs_mode``, ``cost_mode``,
+            ``time_limit``, ``integrator``, ...). ``custom_reward_fn`` must be marked
+            with ``batched_reward``.
+    """
+
+    def __init__(self, max_batch_delay: float = 0.0, max_batch_size: int = 4096, **kwargs):
+        # Imported here because vector.py is not needed by the client side
+        from gymnasium_cartpole_swingup.rewards import is_batched_reward
+        from gymnasium_cartpole_swingup.vector import CartPoleSwingUpVectorEnv
+
+        reward_fn = kwargs.get("custom_reward_fn")
+        if reward_fn is not None and not is_batched_reward(reward_fn):
+            raise ValueError("custom_reward_fn must be decorated with batched_reward to be served")
+        if kwargs.get("randomize"):
+            raise ValueError("randomize is not supported by SimulationServer")
+        template = CartPoleSwingUpVectorEnv(num_envs=1, **kwargs)
+        self.func = template.func
+        self.params = template.params
+        self.t_limit = template.t_limit
+        self.reward_fn = reward_fn
+        self.max_batch_delay = max_batch_delay
+        self.max_batch_size = max_batch_size
+        self.env_info = {
+            "obs_mode": template.obs_mode,
+            "x_threshold": self.params.x_threshold,
+            "pixel_width": self.func.pixel_width,
+            "pixel_height": self.func.pixel_height,
+            "grayscale": self.func.grayscale,
+            "t_limit": self.t_limit,
+            "dtype": self.func.observation_space.dtype.name,
+        }
+
+        self._queue = None
+        self._server = None
+        self._loop = None
+        self._thread = None
+        self._connections = {}  # Task -> stream writer of every connected client
+        self._clients = 0
+        self._steps = 0
+        self._batches = 0
+        self._busy_s = 0.0
+        self._started = None
+
+    # Serving
+
+    async def start(self, path: str = None, host: str = "127.0.0.1", port: int = 0):
+        """
+        Start listening on the Unix socket ``path`` or on ``host:port`` (port 0 picks a
+        free port) and return the address to pass to :class:`RemoteCartPoleSwingUpEnv`.
+        """
+        self._loop = asyncio.get_running_loop()
+        self._queue = asyncio.Queue()
+        self._started = time.perf_counter()
+        if path is not None:
+            if os.path.exists(path):
+                os.unlink(path)
+            self._server = await asyncio.start_unix_server(self._handle, path=path)
+            address = path
+        else:
+            self._server = await asyncio.start_server(self._handle, host=host, port=port)
+            address = self._server.sockets[0].getsockname()[:2]
+        self._batcher = asyncio.ensure_future(self._run_batches())
+        return address
+
+    async def serve_forever(self, path: str = None, host: str = "127.0.0.1", port: int = 0, ready=None):
+        """Start and serve until cancelled; ``ready(address)`` is called once listening."""
+        address = await self.start(path=path, host=host, port=port)
+        if ready is not None:
+            ready(address)
+        try:
+            await self._server.serve_forever()
+        finally:
+            await self.stop()
+
+    async def stop(self):
+        """Stop listening, disconnect the clients and cancel the batching task."""
+        if self._server is not None:
+            self._server.close()
+        # Connection tasks left pending would be destroyed with the event loop. Closing
+        # a connection ends its task at the next read; cancel any that do not finish
+        connections = dict(self._connections)
+        for writer in connections.values():
+            writer.close()
+        if connections:
+            _, pending = await asyncio.wait(connections, timeout=1.0)
+            for task in pending:
+                task.cancel()
+            await asyncio.gather(*pending, return_exceptions=True)
+        if getattr(self, "_batcher", None) is not None:
+            self._batcher.cancel()
+            await asyncio.gather(self._batcher, return_exceptions=True)
+            self._batcher = None
+        if self._server is not None:
+            await self._server.wait_closed()
+            self._server = None
+
+    def start_background(self, path: str = None, host: str = "127.0.0.1", port: int = 0):
+        """Run the server on an event loop in a daemon thread and return its address."""
+        ready = threading.Event()
+        result = {}
+
+        def run():
+            loop = asyncio.new_event_loop()
+            asyncio.set_event_loop(loop)
+            try:
+                result["address"] = loop.run_until_complete(self.start(path=path, host=host, port=port))
+            except BaseException as error:
+                result["error"] = error
+                ready.set()
+                return
+            ready.set()
+            loop.run_forever()
+            loop.run_until_complete(self.stop())
+            loop.close()
+
+        self._thread = threading.Thread(target=run, name="SimulationServer", daemon=True)
+        self._thread.start()
+        ready.wait()
+        if "error" in result:
+            raise result["error"]
+        return result["address"]
+
+    def close(self):
+        """Stop a server started with :meth:`start_background`."""
+        if self._thread is not None and self._loop is not None:
+            self._loop.call_soon_threadsafe(self._loop.stop)
+            self._thread.join(timeout=5)
+            self._thread = None
+
+    def stats(self) -> dict:
+        """Throughput counters: connected clients, steps, batches and batch statistics."""
+        elapsed = time.perf_counter() - self._started if self._started else 0.0
+        return {
+            "clients": self._clients,
+            "steps": self._steps,
+            "batches": self._batches,
+            "mean_batch_size": self._steps / self._batches if self._batches else 0.0,
+            "mean_batch_us": self._busy_s / self._batches * 1e6 if self._batches else 0.0,
+            "steps_per_s": self._steps / elapsed if elapsed else 0.0,
+        }
+
+    # Connections
+
+    async def _handle(self, reader, writer):
+        sock = writer.get_extra_info("socket")
+        if sock is not None and sock.family in (socket.AF_INET, socket.AF_INET6):
+            sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        session = _Session()
+        task = asyncio.current_task()
+        self._connections[task] = writer
+        self._clients += 1
+        try:
+            while True:
+                length, opcode = _REQUEST.unpack(await reader.readexactly(_REQUEST.size))
+                payload = await reader.readexactly(length) if length else b""
+                status = 0
+                try:
+                    if opcode == OP_STEP:
+                        if session.state is None:
+                            raise RuntimeError("Call reset before using step method.")
+                        future = self._loop.create_future()
+                        action = np.frombuffer(payload, dtype=np.float32)[0]
+                        self._queue.put_nowait((session, action, future))
+                        reply = await future
+                    elif opcode == OP_RESET:
+                        reply = self._reset(session, json.loads(payload))
+                    elif opcode == OP_INFO:
+                        reply = json.dumps(self.env_info).encode()
+                    elif opcode == OP_STATS:
+                        reply = json.dumps(self.stats()).encode()
+                    else:
+                        raise ValueError(f"Unknown opcode {opcode}")
+                except Exception as error:
+                    status, reply = 1, f"{type(error).__name__}: {error}".encode()
+                writer.write(_REPLY.pack(len(reply), status) + reply)
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            self._clients -= 1
+            self._connections.pop(task, None)
+            writer.close()
+
+    def _reset(self, session, request):
+        if request.get("seed") is not None:
+            session.np_random = np.random.default_rng(request["seed"])
+        if request.get("initial_state") is not None:
+            state = np.array(request["initial_state"], dtype=self.func.state_dtype)
+            if state.shape != (4,):
+                raise ValueError(
+                    f"initial_state must be [x, x_dot, theta, theta_dot], got shape {state.shape}"
+                )
+            session.state = state
+        else:
+            session.state = self.func.initial(session.np_random, self.params)
+        session.t = 0
+        return self.func.observation(session.state[None], None, self.params)[0].tobytes()
+
+    # Batching
+
+    async def _run_batches(self):
+        queue = self._queue
+        while True:
+            batch = [await queue.get()]
+            # Let requests that are already on their way join this batch
+            await asyncio.sleep(self.max_batch_delay)
+            while len(batch) < self.max_batch_size and not queue.empty():
+                batch.append(queue.get_nowait())
+            try:
+                self._step_batch(batch)
+            except Exception:
+                # Step the requests one by one, so that only the clients whose
+                # request fails receive the error
+                for request in batch:
+                    try:
+                        self._step_batch([request])
+                    except Exception as error:
+                        if not request[2].done():
+                            request[2].set_exception(error)
+
+    def _step_batch(self, batch):
+        """Advance the sessions of ``batch``; none is modified if an error is raised."""
+        start = time.perf_counter()
+        sessions = [request[0] for request in batch]
+        states = np.array([session.state for session in sessions])
+        actions = np.array([request[1] for request in batch], dtype=np.float32).reshape(-1, 1)
+        # Round through float32 exactly like CartPoleSwingUpEnv.step
+        clipped = np.clip(actions, -1.0, 1.0).astype(np.float32)
+
+        next_states = self.func.transition(states, clipped, None, self.params)
+        if self.reward_fn is not None:
+            rewards = np.asarray(self.reward_fn(states, actions, next_states), dtype=np.float64)
+        else:
+            rewards = self.func.reward(states, actions, next_states, None, self.params)
+        terminated = self.func.terminal(next_states, None, self.params)
+        observations = self.func.observation(next_states, None, self.params)
+
+        for i, (session, _, future) in enumerate(batch):
+            session.state = next_states[i]
+            session.t += 1
+            truncated = session.t >= self.t_limit and not terminated[i]
+            reply = _STEP_RESULT.pack(float(rewards[i]), bool(terminated[i]), truncated)
+            if not future.done():
+                future.set_result(reply + observations[i].tobytes())
+
+        self._steps += len(batch)
+        self._batches += 1
+        self._busy_s += time.perf_counter() - start
+
+
+class RemoteCartPoleSwingUpEnv(gym.Env):
+    """
+    ``gymnasium.Env`` client of a :class:`SimulationServer`.
+
+    Each instance opens one connection and owns one environment on the server. Steps
+    block until the server replies. The request round-trip times are kept for
+    :meth:`stats`.
+
+    Args:
+        address: Unix socket path (str) or ``(host, port)`` of the server.
+        timeout (float): Socket timeout in seconds.
+        latency_window (int): Number of recent step latencies kept for :meth:`stats`.
+
+    Note:
+        Episodes are truncated at the server's ``time_limit``; rendering is not
+        supported.
+    """
+
+    metadata = {"render_modes": []}
+
+    def __init__(self, address, timeout: float = 30.0, latency_window: int = 100_000):
+        if isinstance(address, (str, os.PathLike)):
+            self._socket = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        else:
+            self._socket = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            self._socket.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        self._socket.settimeout(timeout)
+        self._socket.connect(address if isinstance(address, (str, os.PathLike)) else tuple(address))
+        self._file = self._socket.makefile("rb")
+
+        info = json.loads(self._request(OP_INFO))
+        self.env_info = info
+        self.action_space = spaces.Box(low=-1.0, high=1.0, shape=(1,), dtype=np.float32)
+        self.observation_space = make_observation_space(
+            info["obs_mode"], info["x_threshold"], info["pixel_width"], info["pixel_height"], info["grayscale"],
+            info["dtype"],
+        )
+        self._obs_shape = self.observation_space.shape
+        self._obs_dtype = self.observation_space.dtype
+        self._latencies = deque(maxlen=latency_window)
+        self._steps = 0
+        self._step_time = 0.0
+
+    def _request(self, opcode, payload=b""):
+        self._socket.sendall(_REQUEST.pack(len(payload), opcode) + payload)
+        header = self._file.read(_REPLY.size)
+        if len(header) != _REPLY.size:
+            raise ConnectionError("Connection to the simulation server was closed")
+        length, status = _REPLY.unpack(header)
+        reply = self._file.read(length)
+        if len(reply) != length:
+            raise ConnectionError("Connection to the simulation server was closed")
+        if status != 0:
+            raise RuntimeError(f"Simulation server error: {reply.decode()}")
+        return reply
+
+    def _observation(self, data):
+        return np.frombuffer(data, dtype=self._obs_dtype).reshape(self._obs_shape).copy()
+
+    def reset(self, seed=None, options=None):
+        super().reset(seed=seed)
+        request = {"seed": seed}
+        if options is not None and "initial_state" in options:
+            request["initial_state"] = np.asarray(options["initial_state"], dtype=np.float64).tolist()
+        return self._observation(self._request(OP_RESET, json.dumps(request).encode())), {}
+
+    def step(self, action):
+        start = time.perf_counter()
+        payload = np.asarray(action, dtype=np.float32).reshape(1).tobytes()
+        reply = self._request(OP_STEP, payload)
+        elapsed = time.perf_counter() - start
+        self._latencies.append(elapsed)
+        self._steps += 1
+        self._step_time += elapsed
+        reward, terminated, truncated = _STEP_RESULT.unpack_from(reply)
+        return self._observation(reply[_STEP_RESULT.size:]), reward, terminated, truncated, {}
+
+    def stats(self) -> dict:
+        """Step request latency (recent window) and throughput of this client."""
+        latencies = np.array(self._latencies) * 1e6
+        if not len(latencies):
+            latencies = np.zeros(1)
+        return {
+            "steps": self._steps,
+            "latency_mean_us": float(latencies.mean()),
+            "latency_p50_us": float(np.percentile(latencies, 50)),
+            "latency_p99_us": float(np.percentile(latencies, 99)),
+            "steps_per_s": self._steps / self._step_time if self._step_time else 0.0,
+        }
+
+    def server_stats(self) -> dict:
+        """The server's :meth:`SimulationServer.stats`."""
+        return json.loads(self._request(OP_STATS))
+
+    def close(self):
+        if self._socket is not None:
+            self._file.close()
+            self._socket.close()
+            self._socket = None
+        super().close()
+
+
+def main(argv=None):
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Serve a batched CartPoleSwingUp simulator.")
+    parser.add_argument("--unix", help="Unix socket path (default: TCP)")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=5555)
+    parser.add_argument("--max-batch-delay", type=float, default=0.0, help="seconds to wait for a fuller batch")
+    parser.add_argument("--env-kwargs", type=json.loads, default={}, help="JSON keyword arguments of the env")
+    args = parser.parse_args(argv)
+
+    server = SimulationServer(max_batch_delay=args.max_batch_delay, **args.env_kwargs)
+
+    def ready(address):
+        # Only once bound, so that the message means clients can connect
+        if not isinstance(address, str):
+            address = f"{address[0]}:{address[1]}"
+        print(f"Serving on {address}", flush=True)
+
+    with contextlib.suppress(KeyboardInterrupt):
+        asyncio.run(server.serve_forever(path=args.unix, host=args.host, port=args.port, ready=ready))
+
+
+if __name__ == "__main__":
+    main()
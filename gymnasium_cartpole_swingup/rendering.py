@@ -0,0 +1,359 @@
+"""
+Rendering helpers for the cart-pole swing-up environment.
+
+Drawing geometry matches the original ``CartPoleSwingUpEnv.render``: a 5 m wide world
+mapped onto the surface, a red cart with black wheels, a blue pole with a cyan axle and
+a black tip, and a black track line.
+"""
+
+import math
+
+import numpy as np
+from gymnasium.error import DependencyNotInstalled
+
+SCREEN_WIDTH = 600
+SCREEN_HEIGHT = 600
+WORLD_WIDTH = 5.0  # Visible range [-2.5, 2.5]m
+CART_WIDTH = 40.0
+CART_HEIGHT = 20.0
+POLE_WIDTH = 6.0
+
+BACKGROUND_COLOR = (255, 255, 255)
+CART_COLOR = (255, 0, 0)
+POLE_COLOR = (0, 0, 255)
+AXLE_COLOR = (26, 255, 255)
+TIP_COLOR = (0, 0, 0)
+WHEEL_COLOR = (0, 0, 0)
+TRACK_COLOR = (0, 0, 0)
+
+
+def _import_pygame():
+    """Import pygame on first use so that non-rendering processes never load it."""
+    try:
+        import pygame
+        import pygame.gfxdraw
+    except ImportError as e:
+        raise DependencyNotInstalled(
+            "pygame is not installed, run `pip install pygame`"
+        ) from e
+    return pygame
+
+
+class PygameRenderer:
+    """
+    Draws cart-pole frames onto a persistent Pygame surface.
+
+    Everything that does not depend on the state is prepared once: the cart body and
+    wheels are cached as a sprite that is blitted at the cart position, and the pole
+    outline is kept as unrotated corner offsets. Geometry is computed directly in
+    screen coordinates (y pointing down), so no intermediate surface or vertical flip
+    is needed per frame.
+
+    Args:
+        surface (pygame.Surface): Target surface, either the display surface or an
+            offscreen surface. It is reused for every frame.
+        pole_length (float): Length of the pole in meters.
+    """
+
+    def __init__(self, surface, pole_length: float):
+        pygame = _import_pygame()
+        self._pygame = pygame
+        self.surface = surface
+        self.width, self.height = surface.get_size()
+
+        # Scale for coordinate conversion (world width 5m maps to the surface width)
+        self.scale = self.width / WORLD_WIDTH
+        self.pole_len = self.scale * pole_length  # Pole length in pixels
+        # Screen row of the cart center (the axle); the world y axis points up
+        self.carty = self._flip_y(self.height / 2)
+
+        wheel_radius = CART_HEIGHT / 4.0
+        self.axle_radius = int(POLE_WIDTH / 2)
+        # Ground height, drawn over the pole like the original renderer
+        self.track_y = int(self._flip_y(self.height / 2 - CART_HEIGHT / 2 - wheel_radius))
+
+        # Pole corners relative to the pivot before rotation (y up)
+        self._pole_corners = [
+            (-POLE_WIDTH / 2, -POLE_WIDTH / 2),
+            (-POLE_WIDTH / 2, self.pole_len - POLE_WIDTH / 2),
+            (POLE_WIDTH / 2, self.pole_len - POLE_WIDTH / 2),
+            (POLE_WIDTH / 2, -POLE_WIDTH / 2),
+        ]
+
+        self._cart_sprite, self._cart_origin = self._make_cart_sprite(wheel_radius)
+
+    def _flip_y(self, y):
+        """Convert a y coordinate from the world-up frame to a screen row."""
+        return self.height - 1 - y
+
+    def _make_cart_sprite(self, wheel_radius):
+        """Draw the cart body and wheels once onto an opaque sprite."""
+        pygame = self._pygame
+        half_w = int(math.ceil(CART_WIDTH / 2 + wheel_radius)) + 1
+        top = int(math.ceil(CART_HEIGHT / 2)) + 1
+        bottom = int(math.ceil(CART_HEIGHT / 2 + wheel_radius)) + 1
+        sprite = pygame.Surface((2 * half_w + 1, top + bottom + 1))
+        sprite.fill(BACKGROUND_COLOR)
+
+        # Sprite pixel (half_w, top) is the cart center; y points down
+        cx, cy = half_w, top
+        cart_coords = [
+            (cx - CART_WIDTH / 2, cy + CART_HEIGHT / 2),
+            (cx - CART_WIDTH / 2, cy - CART_HEIGHT / 2),
+            (cx + CART_WIDTH / 2, cy - CART_HEIGHT / 2),
+            (cx + CART_WIDTH / 2, cy + CART_HEIGHT / 2),
+        ]
+        pygame.gfxdraw.aapolygon(sprite, cart_coords, CART_COLOR)
+        pygame.gfxdraw.filled_polygon(sprite, cart_coords, CART_COLOR)
+
+        wheel_y = int(cy + CART_HEIGHT / 2)
+        for wheel_x in (int(cx - CART_WIDTH / 2), int(cx + CART_WIDTH / 2)):
+            pygame.gfxdraw.aacircle(sprite, wheel_x, wheel_y, int(wheel_radius), WHEEL_COLOR)
+            pygame.gfxdraw.filled_circle(sprite, wheel_x, wheel_y, int(wheel_radius), WHEEL_COLOR)
+        return sprite, (cx, cy)
+
+    def draw(self, state, profiler=None):
+        """
+        Draw the frame for ``state = [x, x_dot, theta, theta_dot]``.
+
+        Args:
+            state: Cart-pole state.
+            profiler (PhaseProfiler): Optional profiler charged with the 'render.clear',
+                'render.blit' and 'render.draw' phases.
+        """
+        if profiler is not None:
+            lap = profiler.clock()
+        gfxdraw = self._pygame.gfxdraw
+        surf = self.surface
+        x, _, theta, _ = state
+
+        # Cart center coordinates (px). x=0 corresponds to screen center
+        cartx = x * self.scale + self.width / 2.0
+        carty = self.carty
+
+        surf.fill(BACKGROUND_COLOR)
+        if profiler is not None:
+            lap = profiler.lap("render.clear", lap)
+        surf.blit(
+            self._cart_sprite,
+            (int(cartx) - self._cart_origin[0], int(carty) - self._cart_origin[1]),
+        )
+        if profiler is not None:
+            lap = profiler.lap("render.blit", lap)
+
+        # Rotate the pole by theta in the world frame, then map to screen rows
+        s = math.sin(theta)
+        c = math.cos(theta)
+        pole_coords = [
+            (cartx + px * c - py * s, carty - (px * s + py * c))
+            for px, py in self._pole_corners
+        ]
+        gfxdraw.aapolygon(surf, pole_coords, POLE_COLOR)
+        gfxdraw.filled_polygon(surf, pole_coords, POLE_COLOR)
+
+        # Draw axle (circle at pole base)
+        gfxdraw.aacircle(surf, int(cartx), int(carty), self.axle_radius, AXLE_COLOR)
+        gfxdraw.filled_circle(surf, int(cartx), int(carty), self.axle_radius, AXLE_COLOR)
+
+        # Draw pole tip (small black circle)
+        tip_x = int(cartx - self.pole_len * s)
+        tip_y = int(carty - self.pole_len * c)
+        gfxdraw.aacircle(surf, tip_x, tip_y, self.axle_radius, TIP_COLOR)
+        gfxdraw.filled_circle(surf, tip_x, tip_y, self.axle_radius, TIP_COLOR)
+
+        gfxdraw.hline(surf, 0, self.width, self.track_y, TRACK_COLOR)
+        if profiler is not None:
+            profiler.lap("render.draw", lap)
+
+    def frame(self, out: np.ndarray = None) -> np.ndarray:
+        """
+        Copy the current surface into an ``(height, width, 3)`` uint8 array.
+
+        Args:
+            out (np.ndarray): Optional C-contiguous buffer to write the frame into. A new
+                array is allocated when omitted.
+        """
+        if out is None:
+            out = np.empty((self.height, self.width, 3), dtype=np.uint8)
+        # A zero-copy view of the surface, copied once into out. Channel by channel,
+        # since the view's channel stride is usually negative (BGRX memory), which
+        # sends a whole-array copy down a much slower path
+        pixels = self._pygame.surfarray.pixels3d(self.surface).transpose(1, 0, 2)
+        try:
+            for channel in range(3):
+                np.copyto(out[..., channel], pixels[..., channel])
+        finally:
+            # The view locks the surface until it is released
+            del pixels
+        return out
+
+
+def _coverage(distance, antialias):
+    """
+    Fraction of each pixel covered by a shape, given signed distances in pixels.
+
+    Shapes are grown by half a pixel, matching gfxdraw which fills polygon and circle
+    boundaries inclusively.
+    """
+    if antialias:
+        return np.clip(1.0 - distance, 0.0, 1.0)
+    return (distance <= 0.5).astype(np.float32)
+
+
+def _composite(canvas, coverage, color):
+    """Paint ``color`` over ``canvas`` (n, H, W, 3) with per-pixel ``coverage``."""
+    canvas += coverage[..., None] * (np.asarray(color, dtype=np.float32) - canvas)
+
+
+def rasterize(
+    states,
+    pole_length,
+    x_threshold: float = None,
+    width: int = SCREEN_WIDTH,
+    height: int = SCREEN_HEIGHT,
+    antialias: bool = True,
+    out: np.ndarray = None,
+    chunk_size: int = 256,
+) -> np.ndarray:
+    """
+    Rasterize a batch of states into RGB frames with NumPy only.
+
+    Draws the same scene as :class:`PygameRenderer` (cart, wheels, pole, axle, tip and
+    track) with vectorized signed-distance geometry, so no Pygame surface is needed and
+    all frames of a chunk are produced by a handful of array operations. Shapes are
+    only evaluated inside a fixed-size window around each cart, which is then scattered
+    into the background-filled frames. Sizes are defined in world units, so frames at
+    any resolution show the same picture as the 600x600 renderer scaled down.
+
+    Args:
+        states (np.ndarray): ``(N, 4)`` array of ``[x, x_dot, theta, theta_dot]``
+            (a single ``(4,)`` state is also accepted and yields one frame).
+        pole_length (float or np.ndarray): Pole length, scalar or one per state.
+        x_threshold (float): If given, the view is widened when necessary so that the
+            whole track ``[-x_threshold, x_threshold]`` and the cart stay visible
+            (the largest value is used when an array is given).
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        antialias (bool): Whether to blend shape edges by pixel coverage.
+        out (np.ndarray): Optional ``(N, height, width, 3)`` uint8 output buffer.
+        chunk_size (int): Number of frames rasterized together, bounding the size of
+            the intermediates.
+
+    Returns:
+        np.ndarray: ``(N, height, width, 3)`` uint8 frames (``(height, width, 3)`` for
+        a single state).
+    """
+    states = np.asarray(states, dtype=np.float64)
+    single = states.ndim == 1
+    states = states.reshape(-1, 4)
+    n = states.shape[0]
+    pole_length = np.broadcast_to(np.asarray(pole_length, dtype=np.float64), (n,))
+
+    world_width = WORLD_WIDTH
+    if x_threshold is not None:
+        world_width = max(
+            world_width, 2 * float(np.max(x_threshold)) + CART_WIDTH * WORLD_WIDTH / SCREEN_WIDTH
+        )
+    scale = width / world_width  # Pixels per meter
+    # Geometry in meters, derived from the 600px-wide reference renderer
+    px_to_m = WORLD_WIDTH / SCREEN_WIDTH
+    cart_hw = CART_WIDTH / 2 * px_to_m
+    cart_hh = CART_HEIGHT / 2 * px_to_m
+    pole_hw = POLE_WIDTH / 2 * px_to_m
+    wheel_r = CART_HEIGHT / 4 * px_to_m
+    axle_r = POLE_WIDTH / 2 * px_to_m
+    track_y = -cart_hh - wheel_r
+    # Keep thin features at least one pixel wide at low resolutions
+    min_half = 0.5 / scale
+
+    # Half size (px) of the window around the axle that contains every shape
+    reach = max(float(pole_length.max()) + 2 * axle_r, cart_hw + wheel_r)
+    half = int(math.ceil(reach * scale)) + 2
+    offsets = np.arange(-half, half + 1)
+    rows = np.arange(max(0, height // 2 - half), min(height, height // 2 + half + 1))
+    # World coordinates of pixels (integer pixel coordinates are pixel centers, and
+    # the axle sits on row height / 2 - 1 like in PygameRenderer)
+    wy = ((height / 2 - 1 - rows) / scale).astype(np.float32)[None, :, None]
+    track_rows = np.abs((height / 2 - 1 - np.arange(height)) / scale - track_y) < min_half
+
+    background = np.asarray(BACKGROUND_COLOR, dtype=np.uint8)
+    if out is None:
+        out = np.empty((n, height, width, 3), dtype=np.uint8)
+    # Frames padded horizontally so that windows of off-screen carts can be scattered
+    pad = 2 * half
+    padded = np.empty((min(chunk_size, n), height, width + 2 * pad, 3), dtype=np.uint8)
+    for start in range(0, n, chunk_size):
+        stop = min(start + chunk_size, n)
+        m = stop - start
+        x = states[start:stop, 0]
+        theta = states[start:stop, 2]
+        sin_t = np.sin(theta).astype(np.float32)[:, None, None]
+        cos_t = np.cos(theta).astype(np.float32)[:, None, None]
+        length = pole_length[start:stop].astype(np.float32)[:, None, None]
+
+        # Window columns centered on each cart
+        center = np.clip(np.floor(x * scale + width / 2.0), -half, width + half - 1).astype(np.int64)
+        cols = center[:, None] + offsets[None, :]
+        dx = (cols / scale - world_width / 2 - x[:, None]).astype(np.float32)[:, None, :]
+
+        canvas = np.empty((m, rows.size, offsets.size, 3), dtype=np.float32)
+        canvas[...] = BACKGROUND_COLOR
+
+        # Cart body and wheels
+        cart = np.maximum(np.abs(dx) - cart_hw, np.abs(wy) - cart_hh)
+        _composite(canvas, _coverage(cart * scale, antialias), CART_COLOR)
+        for side in (-cart_hw, cart_hw):
+            wheel = np.sqrt((dx - side) ** 2 + (wy + cart_hh) ** 2) - wheel_r
+            _composite(canvas, _coverage(wheel * scale, antialias), WHEEL_COLOR)
+
+        # Pole: rectangle along (-sin, cos) from the axle, as drawn by PygameRenderer
+        along = -dx * sin_t + wy * cos_t
+        across = dx * cos_t + wy * sin_t
+        pole = np.maximum(
+            np.abs(along - (length - pole_hw) / 2) - length / 2,
+            np.abs(across) - max(pole_hw, min_half),
+        )
+        _composite(canvas, _coverage(pole * scale, antialias), POLE_COLOR)
+
+        # Axle and pole tip
+        axle = np.sqrt(dx**2 + wy**2) - axle_r
+        _composite(canvas, _coverage(axle * scale, antialias), AXLE_COLOR)
+        tip = np.sqrt((dx + length * sin_t) ** 2 + (wy - length * cos_t) ** 2) - axle_r
+        _composite(canvas, _coverage(tip * scale, antialias), TIP_COLOR)
+
+        frames = padded[:m]
+        frames[...] = background
+        frames[
+            np.arange(m)[:, None, None], rows[None, :, None], (cols + pad)[:, None, :]
+        ] = np.rint(canvas)
+        target = out[start:stop]
+        target[...] = frames[:, :, pad:pad + width]
+        # Track line (one pixel high), drawn over everything like PygameRenderer
+        target[:, track_rows] = TRACK_COLOR
+
+    return out[0] if single else out
+
+
+# ITU-R BT.601 luma weights
+GRAYSCALE_WEIGHTS = np.array([0.299, 0.587, 0.114], dtype=np.float32)
+
+
+def pixel_observation(
+    states,
+    pole_length,
+    x_threshold: float,
+    width: int = 64,
+    height: int = 64,
+    grayscale: bool = False,
+) -> np.ndarray:
+    """
+    Pixel observation(s) rendered directly at the target resolution.
+
+    Returns ``(..., height, width, 3)`` uint8 frames, or ``(..., height, width, 1)``
+    luma frames when ``grayscale`` is set. The view covers the whole track.
+    """
+    frames = rasterize(states, pole_length, x_threshold=x_threshold, width=width, height=height)
+    if grayscale:
+        luma = frames @ GRAYSCALE_WEIGHTS
+        return np.rint(luma, out=luma).astype(np.uint8)[..., None]
+    return frames
@@ -0,0 +1,276 @@
+"""
+Offline rendering of recorded state trajectories.
+
+Simulate at full speed without a ``render_mode``, keep the cheap ``(T, 4)`` state log
+(e.g. the ``states`` column of a
+:class:`~gymnasium_cartpole_swingup.recording.TransitionDataset`) and render only the
+episodes worth looking at afterwards, in a pool of worker processes that never touches
+the simulator:
+
+- :func:`render_frames` splits one trajectory into chunks that the workers rasterize
+  straight into a shared-memory ``(T, H, W, 3)`` frame array.
+- :func:`render_videos` renders one file per trajectory, one trajectory per task, and
+  streams the frames to disk chunk by chunk, so memory use is bounded by
+  ``chunk_size`` frames per worker however long the episode.
+
+Frames are drawn with :func:`~gymnasium_cartpole_swingup.rendering.rasterize` (NumPy
+only). ``.npy`` files need nothing else; video formats (``.mp4``, ``.gif``, ...) are
+written with imageio: ``pip install gymnasium-cartpole-swingup[video]``.
+
+Usage:
+    cartpole-swingup-render data/run0 videos --episodes 0 5 9 --workers 4
+"""
+
+import argparse
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+from gymnasium.error import DependencyNotInstalled
+
+from gymnasium_cartpole_swingup.functional import CartPoleSwingUpParams
+from gymnasium_cartpole_swingup.parallel import _as_array, _shared_array
+from gymnasium_cartpole_swingup.recording import TransitionDataset
+from gymnasium_cartpole_swingup.rendering import SCREEN_HEIGHT, SCREEN_WIDTH, rasterize
+
+DEFAULT_FPS = 10  # Real time at the default dt of 0.1 s
+DEFAULT_POLE_LENGTH = CartPoleSwingUpParams().pole_length
+
+# Arrays shared with the pool by _init_frames_worker
+_frames_worker = {}
+
+
+def _import_imageio():
+    """Import imageio on first use; only video outputs need it."""
+    try:
+        import imageio.v2 as imageio
+    except ImportError as e:
+        raise DependencyNotInstalled(
+            "imageio is not installed, run `pip install gymnasium-cartpole-swingup[video]` "
+            "(or write .npy files)"
+        ) from e
+    return imageio
+
+
+def episode_states(episode: dict) -> np.ndarray:
+    """
+    The ``(length + 1, 4)`` states visited by a recorded episode.
+
+    ``episode`` is an entry of a :class:`TransitionDataset`; the result holds every
+    ``states`` row followed by the last ``next_states`` row.
+    """
+    states = np.asarray(episode["states"], dtype=np.float64)
+    return np.concatenate([states, np.asarray(episode["next_states"], dtype=np.float64)[-1:]])
+
+
+def _num_workers(workers, tasks):
+    if workers is None:
+        workers = os.cpu_count() or 1
+    return max(1, min(workers, tasks))
+
+
+def _prepare(states, pole_length):
+    """States as a float64 ``(n, 4)`` array and pole lengths as one value per state."""
+    states = np.ascontiguousarray(states, dtype=np.float64).reshape(-1, 4)
+    pole_length = np.broadcast_to(np.asarray(pole_length, dtype=np.float64), (len(states),))
+    return states, pole_length
+
+
+def _init_frames_worker(buffer, states, pole_length, render_kwargs):
+    _frames_worker.update(
+        frames=_as_array(buffer), states=states, pole_length=pole_length, kwargs=render_kwargs
+    )
+
+
+def _render_chunk(start, stop):
+    worker = _frames_worker
+    rasterize(
+        worker["states"][start:stop],
+        worker["pole_length"][start:stop],
+        out=worker["frames"][start:stop],
+        **worker["kwargs"],
+    )
+
+
+def render_frames(
+    states,
+    pole_length,
+    x_threshold: float = None,
+    width: int = SCREEN_WIDTH,
+    height: int = SCREEN_HEIGHT,
+    antialias: bool = True,
+    workers: int = None,
+    context: str = None,
+    chunk_size: int = 64,
+) -> np.ndarray:
+    """
+    Render a state trajectory to frames in a pool of worker processes.
+
+    Args:
+        states (np.ndarray): ``(T, 4)`` array of ``[x, x_dot, theta, theta_dot]``.
+        pole_length (float or np.ndarray): Pole length, scalar or one per state.
+        x_threshold (float): If given, the view covers the whole track (see
+            :func:`rasterize`).
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        antialias (bool): Whether to blend shape edges by pixel coverage.
+        workers (int): Worker processes (default: CPU count); 1 renders in this process.
+        context (str): Multiprocessing start method, or None for the platform default.
+        chunk_size (int): Frames per task.
+
+    Returns:
+        np.ndarray: ``(T, height, width, 3)`` uint8 frames, identical to
+        ``rasterize(states, pole_length, ...)``. With several workers the array is
+        backed by the shared-memory buffer the workers wrote to.
+    """
+    states, pole_length = _prepare(states, pole_length)
+    n = len(states)
+    render_kwargs = {"x_threshold": x_threshold, "width": width, "height": height, "antialias": antialias}
+    if n == 0:
+        return np.empty((0, height, width, 3), dtype=np.uint8)
+    workers = _num_workers(workers, -(-n // chunk_size))
+    if workers == 1:
+        return rasterize(states, pole_length, chunk_size=chunk_size, **render_kwargs)
+
+    ctx = multiprocessing.get_context(context)
+    buffer = _shared_array(ctx, (n, height, width, 3), np.uint8)
+    starts = range(0, n, chunk_size)
+    stops = [min(start + chunk_size, n) for start in starts]
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=ctx,
+        initializer=_init_frames_worker,
+        initargs=(buffer, states, pole_length, render_kwargs),
+    ) as pool:
+        # Consume the results to surface errors raised by the workers
+        list(pool.map(_render_chunk, starts, stops))
+    return _as_array(buffer)
+
+
+def _write_file(path, states, pole_length, fps, render_kwargs, chunk_size):
+    """Render one trajectory into ``path``, via a temporary file renamed when complete."""
+    states, pole_length = _prepare(states, pole_length)
+    n = len(states)
+    root, ext = os.path.splitext(path)
+    tmp_path = f"{root}.tmp{ext}"  # The extension selects the format
+    if ext == ".npy":
+        shape = (n, render_kwargs["height"], render_kwargs["width"], 3)
+        frames = np.lib.format.open_memmap(tmp_path, mode="w+", dtype=np.uint8, shape=shape)
+        for start in range(0, n, chunk_size):
+            stop = min(start + chunk_size, n)
+            rasterize(states[start:stop], pole_length[start:stop], out=frames[start:stop], **render_kwargs)
+        frames.flush()
+        del frames
+    else:
+        imageio = _import_imageio()
+        with imageio.get_writer(tmp_path, fps=fps) as writer:
+            for start in range(0, n, chunk_size):
+                stop = min(start + chunk_size, n)
+                for frame in rasterize(states[start:stop], pole_length[start:stop], **render_kwargs):
+                    writer.append_data(frame)
+    os.replace(tmp_path, path)
+    return path
+
+
+def render_videos(
+    trajectories,
+    paths,
+    pole_length=DEFAULT_POLE_LENGTH,
+    fps: float = DEFAULT_FPS,
+    x_threshold: float = None,
+    width: int = SCREEN_WIDTH,
+    height: int = SCREEN_HEIGHT,
+    antialias: bool = True,
+    workers: int = None,
+    context: str = None,
+    chunk_size: int = 64,
+):
+    """
+    Render each state trajectory to its own file, in a pool of worker processes.
+
+    The format follows the extension of each path: ``.npy`` stores the
+    ``(T, height, width, 3)`` uint8 frames, anything else is encoded by imageio
+    (e.g. ``.mp4`` with imageio-ffmpeg, ``.gif``).
+
+    Args:
+        trajectories: Sequence of ``(T_i, 4)`` state arrays.
+        paths: Output file of each trajectory.
+        pole_length: Pole length for every trajectory (scalar or one per state), or a
+            list with one such entry per trajectory.
+        fps (float): Frame rate of video files.
+        x_threshold (float): If given, the view covers the whole track.
+        width (int): Frame width in pixels.
+        height (int): Frame height in pixels.
+        antialias (bool): Whether to blend shape edges by pixel coverage.
+        workers (int): Worker processes (default: CPU count); 1 renders in this process.
+        context (str): Multiprocessing start method, or None for the platform default.
+        chunk_size (int): Frames rasterized and written at a time.
+
+    Returns:
+        list: The written paths.
+    """
+    trajectories = list(trajectories)
+    paths = [os.fspath(path) for path in paths]
+    if len(paths) != len(trajectories):
+        raise ValueError(
+            f"Got {len(trajectories)} trajectories but {len(paths)} paths. Must be equal"
+        )
+    if not isinstance(pole_length, list):
+        pole_length = [pole_length] * len(trajectories)
+    if any(os.path.splitext(path)[1] != ".npy" for path in paths):
+        _import_imageio()  # Fail before rendering anything
+    render_kwargs = {"x_threshold": x_threshold, "width": width, "height": height, "antialias": antialias}
+    tasks = [
+        (path, np.asarray(states, dtype=np.float64), length, fps, render_kwargs, chunk_size)
+        for path, states, length in zip(paths, trajectories, pole_length)
+    ]
+
+    workers = _num_workers(workers, len(tasks))
+    if workers == 1:
+        return [_write_file(*task) for task in tasks]
+    with ProcessPoolExecutor(max_workers=workers, mp_context=multiprocessing.get_context(context)) as pool:
+        futures = [pool.submit(_write_file, *task) for task in tasks]
+        return [future.result() for future in futures]
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="cartpole-swingup-render",
+        description=__doc__.split("\n\n")[0],
+        formatter_class=argparse.RawDescriptionHelpFormatter,
+        epilog=__doc__.split("\n\n", 1)[1],
+    )
+    parser.add_argument("dataset", help="TransitionDataset directory")
+    parser.add_argument("output", help="directory for the rendered episodes")
+    parser.add_argument("--episodes", type=int, nargs="*", help="episode indices (default: all)")
+    parser.add_argument("--format", default="mp4", help="file extension: mp4, gif, npy, ...")
+    parser.add_argument("--fps", type=float, default=DEFAULT_FPS)
+    parser.add_argument("--width", type=int, default=SCREEN_WIDTH)
+    parser.add_argument("--height", type=int, default=SCREEN_HEIGHT)
+    parser.add_argument("--pole-length", type=float, default=DEFAULT_POLE_LENGTH)
+    parser.add_argument("--x-threshold", type=float, help="widen the view to the whole track")
+    parser.add_argument("--workers", type=int, default=os.cpu_count(), help="worker processes")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    dataset = TransitionDataset(args.dataset)
+    indices = range(len(dataset)) if args.episodes is None else args.episodes
+    os.makedirs(args.output, exist_ok=True)
+    paths = render_videos(
+        [episode_states(dataset[index]) for index in indices],
+        [os.path.join(args.output, f"episode-{index:05d}.{args.format}") for index in indices],
+        pole_length=args.pole_length,
+        fps=args.fps,
+        x_threshold=args.x_threshold,
+        width=args.width,
+        height=args.height,
+        workers=args.workers,
+    )
+    print(f"Rendered {len(paths)} episodes to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,78 @@
+"""
+Array-in/array-out reward functions for the cart-pole swing-up task.
+
+The built-in rewards operate on states of shape ``(..., 4)`` and return rewards of
+shape ``(...)``, so a single call covers a whole batch of transitions.
+
+Custom reward functions passed as ``custom_reward_fn`` are called once per transition
+with ``(state, action, next_state)``. Decorating one with :func:`batched_reward`
+declares that it accepts whole batches instead: it is then called once per vector step
+with ``(N, 4)`` states, ``(N, 1)`` actions and ``(N, 4)`` next states and must return
+``N`` rewards.
+"""
+
+import numpy as np
+
+
+def default_reward(state):
+    """Default reward ``cos(theta) * cos(x)`` for state(s) of shape ``(..., 4)``."""
+    state = np.asarray(state)
+    return np.cos(state[..., 2]) * np.cos(state[..., 0])
+
+
+def pilco_reward(state, pole_length, sigma_c):
+    """PILCO reward based on the squared distance of the pole tip from upright."""
+    state = np.asarray(state)
+    x = state[..., 0]
+    theta = state[..., 2]
+    tip_x = x + pole_length * np.sin(theta)
+    tip_y = pole_length * np.cos(theta)
+    square_distance = tip_x**2 + (tip_y - pole_length) ** 2
+    return -(1 - np.exp(-square_distance / (2 * sigma_c**2)))
+
+
+def default_reward_gradient(state):
+    """Gradient of :func:`default_reward` with respect to state(s) of shape ``(..., 4)``."""
+    state = np.asarray(state)
+    x = state[..., 0]
+    theta = state[..., 2]
+    gradient = np.zeros(state.shape)
+    gradient[..., 0] = -np.cos(theta) * np.sin(x)
+    gradient[..., 2] = -np.sin(theta) * np.cos(x)
+    return gradient
+
+
+def pilco_reward_gradient(state, pole_length, sigma_c):
+    """Gradient of :func:`pilco_reward` with respect to state(s) of shape ``(..., 4)``."""
+    state = np.asarray(state)
+    x = state[..., 0]
+    theta = state[..., 2]
+    s = np.sin(theta)
+    c = np.cos(theta)
+    tip_x = x + pole_length * s
+    tip_y = pole_length * c
+    square_distance = tip_x**2 + (tip_y - pole_length) ** 2
+    # d reward / d square_distance
+    scale = -np.exp(-square_distance / (2 * sigma_c**2)) / (2 * sigma_c**2)
+    gradient = np.zeros(np.broadcast(state[..., 0], scale).shape + (4,))
+    gradient[..., 0] = scale * 2 * tip_x
+    gradient[..., 2] = scale * 2 * pole_length * (tip_x * c - (tip_y - pole_length) * s)
+    return gradient
+
+
+def batched_reward(fn):
+    """
+    Mark a custom reward function as operating on whole batches.
+
+    Example:
+        >>> @batched_reward
+        ... def upright_bonus(states, actions, next_states):
+        ...     return np.cos(next_states[:, 2]) - 0.1 * np.abs(actions[:, 0])
+    """
+    fn.batched = True
+    return fn
+
+
+def is_batched_reward(fn):
+    """Whether ``fn`` was declared batched with :func:`batched_reward`."""
+    return getattr(fn, "batched", False) is True
@@ -0,0 +1,449 @@
+import time
+
+import gymnasium as gym
+import numpy as np
+from gymnasium import spaces
+from gymnasium.vector import AutoresetMode, VectorEnv
+from gymnasium.vector.utils import batch_space
+
+from gymnasium_cartpole_swingup.cartpole_swingup import (
+    SNAPSHOT_SIZE,
+    decode_rng_state,
+    encode_rng_state,
+    resolve_dtypes,
+)
+from gymnasium_cartpole_swingup.functional import (
+    CartPoleSwingUpFunctional,
+    CartPoleSwingUpParams,
+)
+from gymnasium_cartpole_swingup.profiling import PhaseProfiler
+from gymnasium_cartpole_swingup.rendering import rasterize
+from gymnasium_cartpole_swingup.rewards import is_batched_reward
+
+# Physical parameters that can be drawn per sub-environment with ``randomize``
+RANDOMIZABLE_PARAMS = ("gravity", "cart_mass", "pole_mass", "pole_length", "friction", "force_mag")
+
+# Per-episode statistics reported in ``info["episode"]`` with ``episode_statistics=True``
+EPISODE_STATISTICS = {
+    "r": np.float64,
+    "l": np.int64,
+    "t": np.float64,
+    "upright_time": np.float64,
+    "balanced_fraction": np.float64,
+    "max_excursion": np.float64,
+}
+
+
+class CartPoleSwingUpVectorEnv(VectorEnv):
+    """
+    Natively batched cart-pole swing-up environment.
+
+    All ``num_envs`` states are held in a single ``(num_envs, 4)`` array and advanced
+    together with one vectorized evaluation of the dynamics used by
+    :class:`CartPoleSwingUpEnv`, so stepping cost grows with array size rather than
+    with the number of Python objects.
+
+    Sub-environments that terminate or truncate are reset on the following call to
+    ``step`` (Gymnasium's ``AutoresetMode.NEXT_STEP``); for that step the returned
+    reward is 0 and both ``terminated`` and ``truncated`` are False.
+
+    Args:
+        num_envs (int): Number of sub-environments.
+        render_mode (str): Rendering mode (None or 'rgb_array').
+        gravity (float): Gravitational acceleration.
+        cart_mass (float): Mass of the cart.
+        pole_mass (float): Mass of the pole.
+        pole_length (float): Length of the pole.
+        force_mag (float): Maximum force magnitude applied to the cart.
+        dt (float): Simulation time step.
+        friction (float): Friction coefficient.
+        x_threshold (float): Threshold for cart position (episode terminates if exceeded).
+        time_limit (int): Maximum number of steps per episode.
+        cost_mode (str): Reward function mode ('default' or 'pilco').
+        sigma_c (float): Parameter for PILCO reward function.
+        obs_mode (str): Observation mode ('raw', 'trig' or 'pixels').
+        custom_reward_fn (callable): Custom reward function, called once per
+            sub-environment with ``(state, action, next_state)``, or once per step
+            over all sub-environments if marked with ``batched_reward``.
+        initial_state_mean (np.ndarray): Mean of the initial state distribution [x, x_dot, theta, theta_dot].
+        initial_state_noise (np.ndarray): Standard deviation for each state component.
+        integrator (str): Integration scheme ('euler', 'semi_implicit_euler' or 'rk4').
+        substeps (int): Number of integrator steps of length dt / substeps per step.
+        dtype: Precision of the batched state, of the dynamics and of the
+            observations: np.float32 (half the memory and bandwidth) or np.float64.
+            The default None keeps float64 states with float32 observations.
+            Randomized parameters are held at the same precision; rewards are float64.
+        profile (bool): Record the time spent in each phase of ``step`` and ``render``
+            in ``self.profiler`` (a :class:`PhaseProfiler`).
+        episode_statistics (bool): Accumulate per-episode statistics of every
+            sub-environment with array operations and report them on the step an
+            episode ends (see Note).
+        balance_angle (float): Half-width in radians of the band ``|theta| <=
+            balance_angle`` in which the pole counts as upright for the episode
+            statistics.
+        randomize (dict): Domain randomization: maps any of ``gravity``, ``cart_mass``,
+            ``pole_mass``, ``pole_length``, ``friction`` and ``force_mag`` to a
+            ``(low, high)`` uniform range or to a callable ``fn(rng, n)`` returning
+            ``n`` values. These parameters become ``(num_envs,)`` arrays in
+            ``self.params``, drawn for every sub-environment on ``reset`` and again for
+            each sub-environment on its autoreset.
+        pixel_width (int): Observation width in pixels when obs_mode is 'pixels'.
+        pixel_height (int): Observation height in pixels when obs_mode is 'pixels'.
+        grayscale (bool): Whether 'pixels' observations have a single luma channel.
+        max_episode_steps (int): Optional step limit supplied by ``gym.make_vec``;
+            episodes are truncated at the smaller of this and ``time_limit``.
+
+    Note:
+        ``reset`` accepts ``options={"initial_state": ...}`` with either a single
+        ``[x, x_dot, theta, theta_dot]`` state (broadcast to every sub-environment)
+        or a ``(num_envs, 4)`` array of states.
+
+        With ``episode_statistics=True``, the ``info`` of a step on which any
+        sub-environment terminates or truncates holds ``info["_episode"]``, the mask
+        of those sub-environments, and ``info["episode"]``, a dict of
+        ``(num_envs,)`` arrays that are 0 outside the mask:
+
+        - ``"r"``, ``"l"``, ``"t"``: episode return, length in steps and elapsed wall
+          time in seconds, as reported by
+          ``gymnasium.wrappers.vector.RecordEpisodeStatistics``
+        - ``"upright_time"``: time in seconds until the pole was first within the
+          balance band (NaN if it never was)
+        - ``"balanced_fraction"``: fraction of steps that ended within the band
+        - ``"max_excursion"``: largest ``|x| / x_threshold`` of the episode
+
+        Autoreset steps do not count towards any episode. ``reset`` and
+        ``set_state`` restart the statistics.
+
+        :meth:`get_state` and :meth:`set_state` use the snapshot layout of
+        :meth:`CartPoleSwingUpEnv.get_state`, one row per sub-environment, so
+        ``envs.set_state(env.get_state())`` forks one scalar environment into
+        ``num_envs`` copies.
+
+        ``render`` rasterizes all sub-environments at once with NumPy (no Pygame) and
+        returns a ``(num_envs, 600, 600, 3)`` uint8 array; use
+        :func:`gymnasium_cartpole_swingup.rendering.rasterize` directly for smaller
+        frames.
+    """
+
+    metadata = {
+        "render_modes": ["rgb_array"],
+        "render_fps": 50,
+        "autoreset_mode": AutoresetMode.NEXT_STEP,
+    }
+
+    def __init__(
+        self,
+        num_envs: int = 1,
+        render_mode: str = None,
+        gravity: float = 9.82,
+        cart_mass: float = 0.5,
+        pole_mass: float = 0.5,
+        pole_length: float = 0.6,
+        force_mag: float = 10.0,
+        dt: float = 0.1,
+        friction: float = 0.1,
+        x_threshold: float = 2.4,
+        time_limit: int = 1000,
+        cost_mode: str = "default",
+        sigma_c: float = 0.25,
+        obs_mode: str = "raw",
+        custom_reward_fn: callable = None,
+        initial_state_mean: np.ndarray = None,
+        initial_state_noise: np.ndarray = None,
+        integrator: str = "euler",
+        substeps: int = 1,
+        dtype=None,
+        profile: bool = False,
+        episode_statistics: bool = False,
+        balance_angle: float = 0.2,
+        randomize: dict = None,
+        pixel_width: int = 64,
+        pixel_height: int = 64,
+        grayscale: bool = False,
+        max_episode_steps: int = None,
+    ):
+        if render_mode is not None and render_mode not in self.metadata["render_modes"]:
+            raise ValueError(
+                f"Invalid render_mode: {render_mode}. Must be None or 'rgb_array'"
+            )
+
+        self.num_envs = num_envs
+        self.render_mode = render_mode
+        self.dtype, _ = resolve_dtypes(dtype)
+
+        self.params = CartPoleSwingUpParams(
+            gravity=gravity,
+            cart_mass=cart_mass,
+            pole_mass=pole_mass,
+            pole_length=pole_length,
+            force_mag=force_mag,
+            dt=dt,
+            friction=friction,
+            x_threshold=x_threshold,
+            sigma_c=sigma_c,
+        )
+        self.randomize = dict(randomize or {})
+        for name, distribution in self.randomize.items():
+            if name not in RANDOMIZABLE_PARAMS:
+                raise ValueError(f"Invalid randomize parameter: {name}. Must be one of {RANDOMIZABLE_PARAMS}")
+            if not callable(distribution) and len(distribution) != 2:
+                raise ValueError(
+                    f"Invalid distribution for {name}: {distribution!r}. "
+                    "Must be a (low, high) range or a callable fn(rng, n)"
+                )
+        # Randomized parameters are held per sub-environment and filled in by reset
+        self.params = self.params._replace(
+            **{name: np.full(num_envs, getattr(self.params, name), dtype=self.dtype) for name in self.randomize}
+        )
+        self.t_limit = time_limit
+        if max_episode_steps is not None:
+            self.t_limit = min(self.t_limit, max_episode_steps)
+        self.cost_mode = cost_mode
+        self.obs_mode = obs_mode
+        self.custom_reward_fn = custom_reward_fn
+        self.profiler = PhaseProfiler() if profile else None
+        self.episode_statistics = episode_statistics
+        self.balance_angle = balance_angle
+        # Running statistics of the current episodes, None unless enabled
+        self._stats = None
+        if episode_statistics:
+            self._stats = {
+                "return": np.zeros(num_envs),
+                "length": np.zeros(num_envs, dtype=np.int64),
+                "first_upright": np.full(num_envs, -1, dtype=np.int64),
+                "balanced": np.zeros(num_envs, dtype=np.int64),
+                "max_abs_x": np.zeros(num_envs),
+                "start_time": np.zeros(num_envs),
+            }
+
+        self.initial_state_mean = initial_state_mean if initial_state_mean is not None else np.array([0.0, 0.0, np.pi, 0.0], dtype=np.float32)
+        self.initial_state_noise = initial_state_noise if initial_state_noise is not None else np.array([0.05, 0.05, 0.05, 0.05], dtype=np.float32)
+
+        # Stateless batched dynamics shared with the functional API
+        self.func = CartPoleSwingUpFunctional({
+            "obs_mode": obs_mode,
+            "cost_mode": cost_mode,
+            "initial_state_mean": self.initial_state_mean,
+            "initial_state_noise": self.initial_state_noise,
+            "integrator": integrator,
+            "substeps": substeps,
+            "pixel_width": pixel_width,
+            "pixel_height": pixel_height,
+            "grayscale": grayscale,
+            "dtype": dtype,
+        })
+
+        self.single_action_space = spaces.Box(low=-1.0, high=1.0, shape=(1,), dtype=np.float32)
+        self.action_space = batch_space(self.single_action_space, num_envs)
+        self.single_observation_space = self.func.observation_space
+        self.observation_space = batch_space(self.single_observation_space, num_envs)
+
+        # Batched internal state, one row per sub-environment
+        self.state = None
+        self.t = np.zeros(num_envs, dtype=np.int32)
+        self.prev_done = np.zeros(num_envs, dtype=np.bool_)
+
+    def reset(self, *, seed=None, options=None):
+        super().reset(seed=seed)
+
+        if options is not None and "initial_state" in options:
+            initial_state = np.asarray(options["initial_state"], dtype=self.dtype)
+            self.state = np.array(
+                np.broadcast_to(initial_state, (self.num_envs, 4)), dtype=self.dtype
+            )
+        else:
+            self.state = self._sample_initial_states(self.num_envs)
+        if self.randomize:
+            self._sample_params(np.ones(self.num_envs, dtype=np.bool_))
+
+        self.t = np.zeros(self.num_envs, dtype=np.int32)
+        self.prev_done = np.zeros(self.num_envs, dtype=np.bool_)
+        if self._stats is not None:
+            self._clear_statistics(slice(None))
+
+        return self._get_obs(), {}
+
+    def get_state(self) -> np.ndarray:
+        """
+        Snapshots of all sub-environments as a ``(num_envs, SNAPSHOT_SIZE)`` array.
+
+        Each row is ``[x, x_dot, theta, theta_dot, t, rng...]`` as in
+        :meth:`CartPoleSwingUpEnv.get_state`; the sub-environments share one generator,
+        so every row holds the same RNG state. Randomized parameters are not included.
+        """
+        assert self.state is not None, "Call reset before using get_state method."
+        snapshots = np.empty((self.num_envs, SNAPSHOT_SIZE))
+        snapshots[:, :4] = self.state
+        snapshots[:, 4] = self.t
+        snapshots[:, 5:] = encode_rng_state(self.np_random)
+        return snapshots
+
+    def set_state(self, snapshots):
+        """
+        Restore ``(num_envs, SNAPSHOT_SIZE)`` snapshots, or clone a single snapshot.
+
+        A single ``(SNAPSHOT_SIZE,)`` snapshot, e.g. from
+        :meth:`CartPoleSwingUpEnv.get_state`, is copied into every sub-environment. The
+        generator state is taken from the first row. Pending autoresets are dropped.
+        """
+        snapshots = np.asarray(snapshots, dtype=np.float64)
+        if snapshots.shape not in ((SNAPSHOT_SIZE,), (self.num_envs, SNAPSHOT_SIZE)):
+            raise ValueError(
+                f"Invalid snapshot shape: {snapshots.shape}. "
+                f"Must be ({SNAPSHOT_SIZE},) or ({self.num_envs}, {SNAPSHOT_SIZE})"
+            )
+        snapshots = np.broadcast_to(snapshots, (self.num_envs, SNAPSHOT_SIZE))
+        self.state = snapshots[:, :4].astype(self.dtype)
+        self.t = snapshots[:, 4].astype(np.int32)
+        self.prev_done = np.zeros(self.num_envs, dtype=np.bool_)
+        if self._stats is not None:
+            self._clear_statistics(slice(None))
+        decode_rng_state(self.np_random, snapshots[0, 5:])
+
+    def _sample_initial_states(self, n):
+        """Draw ``n`` initial states from the configured normal distribution."""
+        return self.func.initial(self.np_random, self.params, batch_size=n)
+
+    def _sample_params(self, mask):
+        """Redraw the randomized parameters of the sub-environments selected by ``mask``."""
+        n = int(mask.sum())
+        for name, distribution in self.randomize.items():
+            if callable(distribution):
+                values = distribution(self.np_random, n)
+            else:
+                values = self.np_random.uniform(distribution[0], distribution[1], n)
+            getattr(self.params, name)[mask] = values
+
+    def _clear_statistics(self, index):
+        """Start new episode statistics for the sub-environments selected by ``index``."""
+        stats = self._stats
+        stats["return"][index] = 0.0
+        stats["length"][index] = 0
+        stats["first_upright"][index] = -1
+        stats["balanced"][index] = 0
+        stats["max_abs_x"][index] = 0.0
+        stats["start_time"][index] = time.perf_counter()
+
+    def _record_statistics(self, reward, done):
+        """Accumulate the statistics of one step and report the episodes ending in it."""
+        stats = self._stats
+        length = stats["length"]
+        length += 1
+        stats["return"] += reward
+        upright = np.abs(self.state[:, 2]) <= self.balance_angle
+        stats["balanced"] += upright
+        first = stats["first_upright"]
+        np.copyto(first, length, where=upright & (first < 0))
+        np.maximum(stats["max_abs_x"], np.abs(self.state[:, 0]), out=stats["max_abs_x"])
+        # Sub-environments reset by this step begin a new episode with the next step,
+        # so what was just accumulated for them is dropped
+        if self.prev_done.any():
+            self._clear_statistics(self.prev_done)
+
+        if not done.any():
+            return {}
+        # Only the ended sub-environments are computed; the rest report 0
+        ended = np.flatnonzero(done)
+        episode = {key: np.zeros(self.num_envs, dtype=dtype) for key, dtype in EPISODE_STATISTICS.items()}
+        ended_length = length[ended]
+        ended_first = first[ended]
+        episode["r"][ended] = stats["return"][ended]
+        episode["l"][ended] = ended_length
+        episode["t"][ended] = np.round(time.perf_counter() - stats["start_time"][ended], 6)
+        episode["upright_time"][ended] = np.where(ended_first >= 0, ended_first * self.params.dt, np.nan)
+        episode["balanced_fraction"][ended] = stats["balanced"][ended] / ended_length
+        episode["max_excursion"][ended] = stats["max_abs_x"][ended] / self.params.x_threshold
+        return {"episode": episode, "_episode": done}
+
+    def _get_obs(self):
+        """Convert the batched internal state to the desired observation format."""
+        return self.func.observation(self.state, None, self.params)
+
+    def _compute_reward(self, prev_state, action, state):
+        """Calculate the reward of every sub-environment for one transition."""
+        if self.custom_reward_fn is not None:
+            if is_batched_reward(self.custom_reward_fn):
+                reward = self.custom_reward_fn(prev_state, action, state)
+                return np.asarray(reward, dtype=np.float64).reshape(self.num_envs)
+            return np.array(
+                [
+                    self.custom_reward_fn(prev_state[i], action[i], state[i])
+                    for i in range(self.num_envs)
+                ],
+                dtype=np.float64,
+            )
+
+        reward = self.func.reward(prev_state, action, state, None, self.params)
+        return np.asarray(reward, dtype=np.float64)
+
+    def step(self, actions):
+        assert self.state is not None, "Call reset before using step method."
+        profiler = self.profiler
+        if profiler is not None:
+            lap = profiler.clock()
+
+        actions = np.asarray(actions).reshape(self.num_envs, 1)
+        # Round through float32 exactly like CartPoleSwingUpEnv.step
+        act = np.clip(actions, -1.0, 1.0).astype(np.float32)
+        if profiler is not None:
+            lap = profiler.lap("step.action", lap)
+
+        prev_state = self.state
+        self.state = self.func.transition(prev_state, act, None, self.params)
+        if profiler is not None:
+            lap = profiler.lap("step.dynamics", lap)
+
+        reward = self._compute_reward(prev_state, actions, self.state)
+        if profiler is not None:
+            lap = profiler.lap("step.reward", lap)
+
+        terminated = self.func.terminal(self.state, None, self.params)
+        self.t += 1
+        truncated = (self.t >= self.t_limit) & ~terminated
+        if profiler is not None:
+            lap = profiler.lap("step.termination", lap)
+
+        # Reset sub-environments that finished on the previous step
+        if self.prev_done.any():
+            n_done = int(self.prev_done.sum())
+            self.state[self.prev_done] = self._sample_initial_states(n_done)
+            if self.randomize:
+                self._sample_params(self.prev_done)
+            self.t[self.prev_done] = 0
+            reward[self.prev_done] = 0.0
+            terminated[self.prev_done] = False
+            truncated[self.prev_done] = False
+
+        done = terminated | truncated
+        if profiler is not None:
+            lap = profiler.lap("step.autoreset", lap)
+
+        info = {}
+        if self._stats is not None:
+            info = self._record_statistics(reward, done)
+            if profiler is not None:
+                lap = profiler.lap("step.statistics", lap)
+        self.prev_done = done
+
+        obs = self._get_obs()
+        if profiler is not None:
+            profiler.lap("step.observation", lap)
+
+        return obs, reward, terminated, truncated, info
+
+    def render(self):
+        if self.render_mode is None:
+            gym.logger.warn(
+                "You are calling render method without specifying any render mode. "
+                "You can specify the render_mode at initialization, "
+                'e.g. gym.make_vec("CartPoleSwingUp-v0", num_envs=N, render_mode="rgb_array")'
+            )
+            return None
+        if self.state is None:
+            return None
+        if self.profiler is None:
+            return rasterize(self.state, self.params.pole_length)
+        lap = self.profiler.clock()
+        frames = rasterize(self.state, self.params.pole_length)
+        self.profiler.lap("render.rasterize", lap)
+        return frames
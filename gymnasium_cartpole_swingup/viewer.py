@@ -0,0 +1,170 @@
+"""
+Live viewer that displays a running simulation without slowing it down.
+
+:class:`LiveViewer` owns a Pygame window in a separate Python process. The simulation
+only publishes its latest state into a few words of shared memory, which takes a couple
+of microseconds and never waits; the viewer process wakes up at its own frame rate, draws
+the most recent state and skips everything published in between. A long training or
+evaluation job can therefore be watched live at full simulation speed.
+
+Example:
+    >>> viewer = LiveViewer(pole_length=0.6)
+    >>> for _ in range(100_000):
+    ...     envs.step(actions)
+    ...     viewer.show(envs.state[0])
+    >>> viewer.close()
+"""
+
+import os
+import subprocess
+import sys
+import tempfile
+
+import numpy as np
+
+from gymnasium_cartpole_swingup.rendering import (
+    SCREEN_HEIGHT,
+    SCREEN_WIDTH,
+    PygameRenderer,
+    _import_pygame,
+)
+
+# Layout of the shared float64 buffer: a sequence counter (odd while a state is being
+# written), the published state and pole length, and the viewer's counters
+_SEQ = 0
+_STATE = slice(1, 5)
+_POLE_LENGTH = 5
+_SHOWN = 6
+_CLOSED = 7
+_BUFFER_SIZE = 8
+
+# Started with ``python -c`` rather than multiprocessing, so the simulating script is
+# never re-imported and needs no ``if __name__ == "__main__"`` guard
+_VIEWER_COMMAND = "from gymnasium_cartpole_swingup.viewer import _viewer_main; _viewer_main()"
+
+
+def _read(view):
+    """Latest consistent ``(seq, state, pole_length)``, or None while it is being written."""
+    seq = view[_SEQ]
+    if seq % 2:
+        return None
+    state = view[_STATE].copy()
+    pole_length = view[_POLE_LENGTH]
+    if view[_SEQ] != seq:
+        return None
+    return seq, state, pole_length
+
+
+def _viewer_main():
+    """Entry point of the viewer process: ``path fps title parent_pid``."""
+    path, fps, title, parent_pid = sys.argv[1:5]
+    view = np.memmap(path, dtype=np.float64, mode="r+", shape=(_BUFFER_SIZE,)).view(np.ndarray)
+    _viewer_loop(view, float(fps), title, int(parent_pid))
+
+
+def _viewer_loop(view, fps, title, parent_pid):
+    pygame = _import_pygame()
+    pygame.init()
+    pygame.display.init()
+    screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+    pygame.display.set_caption(title)
+    clock = pygame.time.Clock()
+    renderer, drawn_length, drawn_seq = None, None, 0.0
+    try:
+        # Also stop when the simulating process has died
+        while not view[_CLOSED] and os.getppid() == parent_pid:
+            for event in pygame.event.get():
+                if event.type == pygame.QUIT:
+                    return
+            latest = _read(view)
+            if latest is not None and latest[0] != drawn_seq:
+                drawn_seq, state, pole_length = latest
+                if pole_length != drawn_length:
+                    renderer = PygameRenderer(screen, pole_length)
+                    drawn_length = pole_length
+                renderer.draw(state)
+                pygame.display.flip()
+                view[_SHOWN] += 1
+            clock.tick(fps)
+    finally:
+        # Also tells the simulation to stop publishing when the window was closed
+        view[_CLOSED] = 1.0
+        pygame.quit()
+
+
+class LiveViewer:
+    """
+    Non-blocking human viewer of a cart-pole state, running in its own process.
+
+    :meth:`show` publishes a state and returns immediately. The viewer process redraws
+    at most ``fps`` times per second, always with the most recent state; intermediate
+    states are dropped. Closing the window stops the viewer, after which :meth:`show`
+    does nothing.
+
+    Args:
+        pole_length (float): Pole length of the displayed states (see :meth:`show`).
+        fps (float): Maximum display frame rate.
+        title (str): Window title.
+    """
+
+    def __init__(self, pole_length: float = 0.6, fps: float = 50, title: str = "CartPoleSwingUp"):
+        fd, self._path = tempfile.mkstemp(prefix="cartpole-viewer-")
+        os.close(fd)
+        self._memmap = np.memmap(self._path, dtype=np.float64, mode="w+", shape=(_BUFFER_SIZE,))
+        # A plain ndarray view: indexing an np.memmap costs several microseconds
+        self._view = self._memmap.view(np.ndarray)
+        self._view[_POLE_LENGTH] = pole_length
+        self.published = 0
+        self.process = subprocess.Popen(
+            [sys.executable, "-c", _VIEWER_COMMAND, self._path, str(fps), title, str(os.getpid())]
+        )
+
+    @property
+    def shown(self) -> int:
+        """Number of frames the viewer has displayed."""
+        return int(self._view[_SHOWN])
+
+    @property
+    def closed(self) -> bool:
+        """Whether the viewer was closed, by :meth:`close` or through its window."""
+        return bool(self._view[_CLOSED])
+
+    def show(self, state, pole_length: float = None):
+        """
+        Publish ``state = [x, x_dot, theta, theta_dot]`` for display, without waiting.
+
+        Args:
+            state: Cart-pole state.
+            pole_length (float): New pole length, e.g. of a randomized environment;
+                the previous one is kept when omitted.
+        """
+        view = self._view
+        if view[_CLOSED]:
+            return
+        view[_SEQ] += 1
+        view[_STATE] = state
+        if pole_length is not None:
+            view[_POLE_LENGTH] = pole_length
+        view[_SEQ] += 1
+        self.published += 1
+
+    def close(self, timeout: float = 1.0):
+        """Close the window, stop the viewer process and release the shared buffer."""
+        if self.process is None:
+            return
+        self._view[_CLOSED] = 1.0
+        try:
+            self.process.wait(timeout)
+        except subprocess.TimeoutExpired:
+            self.process.kill()
+            self.process.wait()
+        self.process = None
+        # Keep the final counters in ordinary memory and unmap the file before removing
+        # it: Windows refuses to delete a file that is still mapped
+        self._view = self._view.copy()
+        self._memmap = None
+        os.remove(self._path)
+
+    def __del__(self):
+        if getattr(self, "process", None) is not None:
+            self.close()
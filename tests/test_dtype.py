@@ -0,0 +1,211 @@
+"""Tests for the dtype option: state storage, dynamics and observation precision."""
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpEnv,
+    CartPoleSwingUpFunctional,
+    CartPoleSwingUpParallelVectorEnv,
+    CartPoleSwingUpVectorEnv,
+    batched_reward,
+)
+
+START = np.random.default_rng(1).normal([0.0, 0.0, np.pi, 0.0], [0.1, 0.1, 0.5, 0.5], size=(16, 4))
+
+
+def _trajectory(dtype, steps, num_envs=16, actions=None, **kwargs):
+    """States after each of ``steps`` steps from START, as float64."""
+    envs = CartPoleSwingUpVectorEnv(num_envs=num_envs, dtype=dtype, time_limit=10**6, **kwargs)
+    envs.reset(options={"initial_state": START[:num_envs]})
+    states = []
+    for k in range(steps):
+        envs.step(np.zeros((num_envs, 1)) if actions is None else actions[k])
+        states.append(envs.state.astype(np.float64))
+    return np.array(states)
+
+
+def _distance(a, b):
+    """Largest state difference per step, with theta compared modulo 2 pi."""
+    diff = np.abs(a - b)
+    diff[..., 2] = np.abs((a[..., 2] - b[..., 2] + np.pi) % (2 * np.pi) - np.pi)
+    return diff.reshape(len(a), -1).max(axis=1)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+@pytest.mark.parametrize("preallocate", [False, True])
+@pytest.mark.parametrize("obs_mode", ["raw", "trig"])
+def test_scalar_env_stores_state_at_dtype(dtype, preallocate, obs_mode):
+    """Test that reset, step, rollout and set_state keep one storage dtype."""
+    env = CartPoleSwingUpEnv(dtype=dtype, preallocate=preallocate, obs_mode=obs_mode)
+    assert env.observation_space.dtype == dtype
+
+    obs, _ = env.reset(seed=0)
+    assert env.state.dtype == dtype and obs.dtype == dtype
+    for _ in range(3):
+        obs, reward, *_ = env.step(np.array([0.5], dtype=np.float32))
+        assert env.state.dtype == dtype and obs.dtype == dtype
+        assert type(reward) is float
+        assert env.observation_space.contains(obs)
+
+    observations, *_ = env.rollout(np.zeros((4, 1)))
+    assert observations.dtype == dtype and env.state.dtype == dtype
+    env.set_state(env.get_state())
+    assert env.state.dtype == dtype
+    env.reset(options={"initial_state": [0.1, 0.0, 3.0, 0.0]})
+    assert env.state.dtype == dtype
+
+
+def test_scalar_env_defaults_and_assigned_states():
+    """Test the default tuple state and that assigned states are adopted."""
+    env = CartPoleSwingUpEnv()
+    obs, _ = env.reset(seed=0)
+    assert isinstance(env.state, tuple) and obs.dtype == np.float32
+    env.step(np.zeros(1))
+    env.rollout(np.zeros((2, 1)))
+    env.set_state(env.get_state())
+    assert all(type(value) is float for value in env.state)
+
+    env.state = np.array([0.1, 0.2, 3.0, 0.4], dtype=np.float32)
+    env.step(np.zeros(1))
+    assert all(type(value) is float for value in env.state)
+
+    # Initial states are no longer rounded through float32
+    env.reset(options={"initial_state": [0.1, 0.0, 3.0, 0.0]})
+    assert env.state[0] == 0.1
+
+    env = CartPoleSwingUpEnv(dtype=np.float64)
+    env.reset(seed=0)
+    env.state = (0.1, 0.2, 3.0, 0.4)
+    env.step(np.zeros(1))
+    assert isinstance(env.state, np.ndarray) and env.state.dtype == np.float64
+
+    with pytest.raises(ValueError, match="Invalid dtype"):
+        CartPoleSwingUpEnv(dtype=np.int32)
+
+
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_batched_variants_honor_dtype(dtype):
+    """Test that the vector, functional and multi-process variants use the dtype throughout."""
+    envs = CartPoleSwingUpVectorEnv(num_envs=4, dtype=dtype, randomize={"pole_length": (0.5, 0.7)})
+    assert envs.single_observation_space.dtype == dtype
+    obs, _ = envs.reset(seed=0)
+    assert envs.state.dtype == dtype and obs.dtype == dtype
+    assert envs.params.pole_length.dtype == dtype
+    obs, rewards, *_ = envs.step(np.ones((4, 1)))
+    assert envs.state.dtype == dtype and obs.dtype == dtype
+    assert rewards.dtype == np.float64
+    envs.set_state(envs.get_state())
+    assert envs.state.dtype == dtype
+
+    func = CartPoleSwingUpFunctional({"dtype": dtype, "obs_mode": "trig"})
+    states = func.initial(np.random.default_rng(0), batch_size=4)
+    assert states.dtype == dtype
+    assert func.transition(states, np.ones((4, 1))).dtype == dtype
+    assert func.observation(states).dtype == dtype
+    rollout_states, *_ = func.rollout(states, np.zeros((4, 3, 1)))
+    assert rollout_states.dtype == dtype
+
+    parallel = CartPoleSwingUpParallelVectorEnv(num_envs=4, num_workers=2, dtype=dtype)
+    try:
+        obs, _ = parallel.reset(seed=0)
+        obs, *_ = parallel.step(np.ones((4, 1)))
+        assert parallel.state.dtype == dtype and obs.dtype == dtype
+    finally:
+        parallel.close()
+
+
+def test_float64_matches_default_precision():
+    """Test that dtype=float64 runs the default dynamics and only widens the observations."""
+    actions = np.random.default_rng(0).uniform(-1.0, 1.0, size=(200, 4, 1))
+    kwargs = {"num_envs": 4, "actions": actions, "x_threshold": 1e9}
+    default = _trajectory(None, 200, **kwargs)
+    np.testing.assert_array_equal(_trajectory(np.float64, 200, **kwargs), default)
+
+    scalar = CartPoleSwingUpEnv(dtype=np.float64, time_limit=10**6, x_threshold=1e9)
+    scalar.reset(options={"initial_state": START[0]})
+    for k in range(200):
+        scalar.step(actions[k, 0])
+    np.testing.assert_array_equal(scalar.state, default[-1, 0])
+
+
+@pytest.mark.parametrize("integrator", ["semi_implicit_euler", "rk4"])
+def test_float32_drift_stays_bounded_on_damped_dynamics(integrator):
+    """Test that float32 tracks float64 over a long episode when the dynamics are stable."""
+    single = _trajectory(np.float32, 1000, integrator=integrator, friction=0.5)
+    double = _trajectory(np.float64, 1000, integrator=integrator, friction=0.5)
+    drift = _distance(single, double)
+    assert drift.max() < 1e-4
+
+
+def test_float32_drift_grows_on_chaotic_dynamics():
+    """Test that float32 agrees only over short horizons once the motion is chaotic."""
+    actions = np.random.default_rng(0).uniform(-0.3, 0.3, size=(1000, 16, 1))
+    kwargs = {"actions": actions, "x_threshold": 1e9}
+    single = _trajectory(np.float32, 1000, **kwargs)
+    double = _trajectory(np.float64, 1000, **kwargs)
+    drift = _distance(single, double)
+    assert drift[:10].max() < 1e-4
+    assert drift[-1] > 1e-2
+
+    # The scalar environment stays as close, though it only rounds a float64 step
+    scalar = CartPoleSwingUpEnv(dtype=np.float32, time_limit=10**6, x_threshold=1e9)
+    scalar.reset(options={"initial_state": START[0]})
+    for k in range(10):
+        scalar.step(actions[k, 0])
+    np.testing.assert_allclose(scalar.state, single[9, 0], atol=1e-4)
+
+
+def test_scalar_float32_rounds_float64_steps():
+    """Test that scalar float32 is float64 dynamics with the state stored at float32."""
+    action = np.array([0.7], dtype=np.float32)
+    single = CartPoleSwingUpEnv(dtype=np.float32)
+    double = CartPoleSwingUpEnv(dtype=np.float64)
+    single.reset(options={"initial_state": START[0]})
+    for _ in range(20):
+        double.reset(options={"initial_state": single.state})
+        single.step(action)
+        double.step(action)
+        np.testing.assert_array_equal(single.state, double.state.astype(np.float32))
+
+    # The batched float32 dynamics round every operation, so they differ slightly
+    envs = CartPoleSwingUpVectorEnv(num_envs=1, dtype=np.float32, x_threshold=1e9)
+    single = CartPoleSwingUpEnv(dtype=np.float32, x_threshold=1e9)
+    envs.reset(options={"initial_state": START[:1]})
+    single.reset(options={"initial_state": START[0]})
+    for _ in range(10):
+        envs.step(action[None])
+        single.step(action)
+    assert not np.array_equal(envs.state[0], single.state)
+    np.testing.assert_allclose(envs.state[0], single.state, atol=1e-4)
+
+
+@pytest.mark.parametrize("preallocate", [False, True])
+def test_float32_termination_reads_the_rounded_state(preallocate):
+    """Test that jit and Python steps terminate alike when rounding crosses x_threshold."""
+    # x lands just inside the boundary at float64 and just outside it at float32
+    start = np.array([2.3, 1.000000238418579, 0.0, 0.0], dtype=np.float32)
+    results = []
+    for jit in (False, True):
+        env = CartPoleSwingUpEnv(dtype=np.float32, jit=jit, preallocate=preallocate, x_threshold=2.4)
+        env.reset(options={"initial_state": start})
+        _, reward, terminated, _, _ = env.step(np.zeros(1, dtype=np.float32))
+        assert env.state.item(0) > 2.4 and terminated
+        results.append(reward)
+    assert results[0] == results[1]
+
+
+@pytest.mark.parametrize("preallocate", [False, True])
+def test_batched_custom_reward_sees_state_dtype(preallocate):
+    """Test that batched reward functions receive state arrays of the configured dtype."""
+    seen = []
+
+    @batched_reward
+    def record(states, actions, next_states):
+        seen.append((states.dtype, states.shape, next_states.dtype))
+        return np.zeros(len(states))
+
+    env = CartPoleSwingUpEnv(dtype=np.float32, preallocate=preallocate, custom_reward_fn=record)
+    env.reset(seed=0)
+    env.step(np.zeros(1, dtype=np.float32))
+    assert seen == [(np.float32, (1, 4), np.float32)]
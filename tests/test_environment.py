@@ -1,5 +1,10 @@
 """Tests for the CartPoleSwingUp environment."""
 
+import pickle
+import subprocess
+import sys
+import tracemalloc
+
 import gymnasium as gym
 import numpy as np
 import pytest
@@ -325,3 +330,122 @@ def test_reward_function_receives_correct_values():
     np.testing.assert_allclose(received_values["state"], prev_state)
     np.testing.assert_allclose(received_values["action"], action)
     np.testing.assert_allclose(received_values["next_state"], next_state)
+
+
+def test_import_does_not_load_pygame():
+    """Test that pygame is only imported once rendering is requested."""
+    code = (
+        "import sys, gymnasium as gym, gymnasium_cartpole_swingup\n"
+        "env = gym.make('CartPoleSwingUp-v0')\n"
+        "env.reset(seed=0)\n"
+        "env.step(env.action_space.sample())\n"
+        "assert 'pygame' not in sys.modules\n"
+    )
+    subprocess.run([sys.executable, "-c", code], check=True)
+
+
+def test_pickle_excludes_render_handles():
+    """Test that a rendering environment pickles without its Pygame handles."""
+    env = gym.make("CartPoleSwingUp-v0", render_mode="rgb_array")
+    env.reset(seed=0)
+    env.render()
+    assert env.unwrapped.screen is not None
+
+    clone = pickle.loads(pickle.dumps(env))
+    assert clone.unwrapped.screen is None
+    assert clone.unwrapped.clock is None
+    np.testing.assert_allclose(clone.unwrapped.state, env.unwrapped.state)
+
+    # The clone steps identically and can render again on demand
+    action = np.array([0.5])
+    obs, reward, _, _, _ = env.step(action)
+    clone_obs, clone_reward, _, _, _ = clone.step(action)
+    np.testing.assert_array_equal(obs, clone_obs)
+    assert reward == clone_reward
+    assert clone.render().shape == (600, 600, 3)
+
+
+def test_render_rgb_array_into_buffer():
+    """Test that frames can be written into a caller-provided buffer."""
+    env = gym.make("CartPoleSwingUp-v0", render_mode="rgb_array")
+    env.reset(options={"initial_state": [0.0, 0.0, 0.0, 0.0]})
+
+    frame = env.render()
+    buffer = np.zeros((600, 600, 3), dtype=np.uint8)
+    returned = env.unwrapped.render(out=buffer)
+
+    assert returned is buffer
+    np.testing.assert_array_equal(frame, buffer)
+    assert frame.flags.writeable
+
+    # No frame-sized temporary is allocated on the way into the buffer
+    tracemalloc.start()
+    try:
+        env.unwrapped.render(out=buffer)
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+    assert peak < buffer.nbytes // 10
+    np.testing.assert_array_equal(frame, buffer)
+
+    # Upright pole at the screen center: cart and axle below, tip above the axle
+    np.testing.assert_array_equal(frame[299, 300], (26, 255, 255))  # Axle
+    np.testing.assert_array_equal(frame[299, 285], (255, 0, 0))  # Cart body
+    np.testing.assert_array_equal(frame[260, 300], (0, 0, 255))  # Pole
+    np.testing.assert_array_equal(frame[50, 300], (255, 255, 255))  # Background
+
+    # The persistent surface is fully redrawn for each new state
+    # (the first Euler step only changes velocities)
+    env.step(np.array([1.0]))
+    env.step(np.array([1.0]))
+    assert not np.array_equal(env.render(), frame)
+
+
+def test_pixel_obs_mode():
+    """Test pixel observations rendered directly at the requested resolution."""
+    env = gym.make("CartPoleSwingUp-v0", obs_mode="pixels", pixel_width=84, pixel_height=84)
+    assert env.observation_space.shape == (84, 84, 3)
+    assert env.observation_space.dtype == np.uint8
+
+    obs, _ = env.reset(seed=0)
+    assert obs.shape == (84, 84, 3)
+    assert obs.dtype == np.uint8
+    assert env.observation_space.contains(obs)
+
+    obs, _, _, _, _ = env.step(np.array([0.5]))
+    assert env.observation_space.contains(obs)
+
+    # Grayscale observations keep a single channel
+    env_gray = gym.make("CartPoleSwingUp-v0", obs_mode="pixels", grayscale=True)
+    obs, _ = env_gray.reset(seed=0)
+    assert obs.shape == (64, 64, 1)
+    assert env_gray.observation_space.contains(obs)
+
+    # Pixel observations do not require a render mode or Pygame surfaces
+    assert env.unwrapped.screen is None
+
+
+def test_integrators_accuracy():
+    """Test that higher-order integration and substeps approach a fine reference."""
+    initial_state = [0.0, 0.0, np.pi - 0.5, 0.0]
+    actions = np.sin(np.arange(20) * 0.3)[:, None]
+
+    def final_state(**kwargs):
+        env = gym.make("CartPoleSwingUp-v0", **kwargs)
+        env.reset(options={"initial_state": initial_state})
+        for action in actions:
+            env.step(action)
+        return np.array(env.unwrapped.state)
+
+    reference = final_state(integrator="rk4", substeps=200)
+    euler_error = np.abs(final_state() - reference).max()
+    euler_substep_error = np.abs(final_state(substeps=10) - reference).max()
+    rk4_error = np.abs(final_state(integrator="rk4") - reference).max()
+
+    assert euler_substep_error < euler_error
+    assert rk4_error < euler_substep_error
+
+    with pytest.raises(ValueError):
+        gym.make("CartPoleSwingUp-v0", integrator="invalid")
+    with pytest.raises(ValueError):
+        gym.make("CartPoleSwingUp-v0", substeps=0)
@@ -0,0 +1,195 @@
+"""Tests for the stateless functional CartPoleSwingUp dynamics."""
+
+import gymnasium as gym
+import numpy as np
+import pytest
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpEnv,
+    CartPoleSwingUpFunctional,
+    CartPoleSwingUpParams,
+)
+
+
+def _random_states(rng, batch_size):
+    return np.column_stack([
+        rng.uniform(-2.0, 2.0, batch_size),
+        rng.uniform(-1.0, 1.0, batch_size),
+        rng.uniform(-np.pi, np.pi, batch_size),
+        rng.uniform(-3.0, 3.0, batch_size),
+    ])
+
+
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+def test_transition_matches_environment_step(cost_mode):
+    """Test that batched transitions and rewards agree with CartPoleSwingUpEnv.step."""
+    rng = np.random.default_rng(0)
+    states = _random_states(rng, 16)
+    actions = rng.uniform(-1.0, 1.0, size=(16, 1)).astype(np.float32)
+
+    func = CartPoleSwingUpFunctional({"cost_mode": cost_mode})
+    next_states = func.transition(states, actions)
+    rewards = func.reward(states, actions, next_states)
+    assert next_states.shape == (16, 4)
+    assert rewards.shape == (16,)
+
+    env = CartPoleSwingUpEnv(cost_mode=cost_mode)
+    env.reset()
+    for i in range(16):
+        env.state = tuple(float(v) for v in states[i])
+        _, reward, _, _, _ = env.step(actions[i])
+        np.testing.assert_allclose(next_states[i], env.state, rtol=1e-10, atol=1e-10)
+        np.testing.assert_allclose(rewards[i], reward, rtol=1e-10, atol=1e-10)
+
+
+def test_transition_is_pure():
+    """Test that transition neither mutates its inputs nor depends on call history."""
+    func = CartPoleSwingUpFunctional()
+    states = _random_states(np.random.default_rng(1), 8)
+    actions = np.full((8, 1), 0.3)
+    states_copy = states.copy()
+
+    first = func.transition(states, actions)
+    second = func.transition(states, actions)
+
+    np.testing.assert_array_equal(states, states_copy)
+    np.testing.assert_array_equal(first, second)
+
+
+def test_per_sample_parameters_broadcast():
+    """Test that array-valued parameters apply one value per batch element."""
+    func = CartPoleSwingUpFunctional()
+    states = np.tile([0.0, 0.0, np.pi / 2, 0.0], (2, 1))
+    actions = np.zeros((2, 1))
+    params = func.get_default_params(pole_length=np.array([0.6, 1.2]))
+
+    batched = func.transition(states, actions, None, params)
+    short = func.transition(states[:1], actions[:1], None, func.get_default_params(pole_length=0.6))
+    long = func.transition(states[:1], actions[:1], None, func.get_default_params(pole_length=1.2))
+
+    np.testing.assert_allclose(batched[0], short[0])
+    np.testing.assert_allclose(batched[1], long[0])
+
+
+def test_params_from_env():
+    """Test that parameters can be read back from a configured environment."""
+    env = gym.make("CartPoleSwingUp-v0", pole_length=0.8, friction=0.2, dt=0.05)
+    params = CartPoleSwingUpParams.from_env(env)
+    assert params.pole_length == 0.8
+    assert params.friction == 0.2
+    assert params.dt == 0.05
+    assert params.gravity == 9.82
+
+
+def test_observation_terminal_and_initial():
+    """Test observation modes, termination and initial state sampling."""
+    states = np.array([[0.0, 0.0, np.pi / 3, 0.0], [2.5, 0.0, 0.0, 0.0]])
+
+    obs = CartPoleSwingUpFunctional({"obs_mode": "trig"}).observation(states)
+    assert obs.shape == (2, 5)
+    assert obs.dtype == np.float32
+    np.testing.assert_allclose(obs[0, 2:4], [np.sin(np.pi / 3), np.cos(np.pi / 3)], rtol=1e-6)
+
+    func = CartPoleSwingUpFunctional()
+    np.testing.assert_array_equal(func.terminal(states), [False, True])
+    assert func.initial(np.random.default_rng(0)).shape == (4,)
+    assert func.initial(np.random.default_rng(0), batch_size=32).shape == (32, 4)
+
+    with pytest.raises(ValueError):
+        CartPoleSwingUpFunctional({"cost_mode": "invalid"})
+
+
+@pytest.mark.parametrize("integrator", ["euler", "semi_implicit_euler", "rk4"])
+@pytest.mark.parametrize("substeps", [1, 3])
+def test_integrators_match_environment_step(integrator, substeps):
+    """Test that every integrator agrees between the functional and scalar envs."""
+    rng = np.random.default_rng(2)
+    states = _random_states(rng, 8)
+    actions = rng.uniform(-1.0, 1.0, size=(8, 1)).astype(np.float32)
+
+    func = CartPoleSwingUpFunctional({"integrator": integrator, "substeps": substeps})
+    next_states = func.transition(states, actions)
+
+    env = CartPoleSwingUpEnv(integrator=integrator, substeps=substeps)
+    env.reset()
+    for i in range(8):
+        env.state = tuple(float(v) for v in states[i])
+        env.step(actions[i])
+        np.testing.assert_allclose(next_states[i], env.state, rtol=1e-10, atol=1e-10)
+
+
+def _central_difference(fn, x, eps=1e-6):
+    """Jacobian of ``fn`` at ``x`` (shape ``(B, n)``) by central differences, ``(B, m, n)``."""
+    columns = []
+    for j in range(x.shape[-1]):
+        step = np.zeros(x.shape[-1])
+        step[j] = eps
+        columns.append((fn(x + step) - fn(x - step)) / (2 * eps))
+    return np.stack(columns, axis=-1)
+
+
+@pytest.mark.parametrize("integrator", ["euler", "semi_implicit_euler", "rk4"])
+@pytest.mark.parametrize("substeps", [1, 3])
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+def test_jacobians_match_finite_differences(integrator, substeps, cost_mode):
+    """Test the analytic transition Jacobians and reward gradients, per-sample params included."""
+    rng = np.random.default_rng(3)
+    states = _random_states(rng, 8)
+    states[:, 2] = rng.uniform(-2.5, 2.5, 8)  # Away from the theta wrap
+    actions = rng.uniform(-0.9, 0.9, size=(8, 1))
+    func = CartPoleSwingUpFunctional(
+        {"integrator": integrator, "substeps": substeps, "cost_mode": cost_mode}
+    )
+    params = func.get_default_params(
+        pole_length=rng.uniform(0.4, 1.0, 8), cart_mass=0.7, friction=0.2, dt=0.05
+    )
+
+    jacobian_state, jacobian_action = func.transition_jacobians(states, actions, None, params)
+    assert jacobian_state.shape == (8, 4, 4)
+    assert jacobian_action.shape == (8, 4, 1)
+    np.testing.assert_allclose(
+        jacobian_state,
+        _central_difference(lambda s: func.transition(s, actions, None, params), states),
+        atol=1e-7,
+    )
+    np.testing.assert_allclose(
+        jacobian_action,
+        _central_difference(lambda a: func.transition(states, a, None, params), actions),
+        atol=1e-7,
+    )
+
+    def reward(s, a):
+        return func.reward(s, a, func.transition(s, a, None, params), None, params)[..., None]
+
+    reward_state, reward_action = func.reward_gradients(states, actions, None, params)
+    np.testing.assert_allclose(
+        reward_state, _central_difference(lambda s: reward(s, actions), states)[:, 0], atol=1e-7
+    )
+    np.testing.assert_allclose(
+        reward_action, _central_difference(lambda a: reward(states, a), actions)[:, 0], atol=1e-7
+    )
+
+
+def test_jacobians_of_environment_step():
+    """Test that the Jacobians linearize CartPoleSwingUpEnv.step with its own parameters."""
+    env = CartPoleSwingUpEnv(cart_mass=1.0, pole_length=0.5, friction=0.3, dt=0.02)
+    env.reset(seed=0)
+    params = CartPoleSwingUpParams.from_env(env)
+    func = CartPoleSwingUpFunctional()
+    state = np.array([0.1, -0.2, 0.3, 0.5])
+    action = np.array([0.25], dtype=np.float32)
+    jacobian_state, jacobian_action = func.transition_jacobians(state, action, None, params)
+
+    def step(state, action):
+        env.state = tuple(float(v) for v in state)
+        env.step(np.asarray(action, dtype=np.float32))
+        return np.array(env.state)
+
+    delta = np.array([1e-5, -2e-5, 1e-5, 3e-5])
+    predicted = step(state, action) + jacobian_state @ delta + jacobian_action @ [1e-3]
+    np.testing.assert_allclose(step(state + delta, action + 1e-3), predicted, atol=1e-7)
+
+    # Saturated actions have no effect on the next state
+    _, saturated = func.transition_jacobians(state, np.array([1.5]), None, params)
+    np.testing.assert_array_equal(saturated, 0.0)
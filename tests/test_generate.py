@@ -0,0 +1,89 @@
+"""Tests for the cartpole-swingup-generate dataset command."""
+
+import json
+import os
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import TransitionDataset
+from gymnasium_cartpole_swingup.generate import load_policy, main, zero_policy
+
+ARGS = ["--num-shards", "3", "--steps-per-shard", "40", "--num-envs", "4", "--seed", "7"]
+
+
+def read_shards(path, num_shards=3):
+    return [
+        TransitionDataset(os.path.join(path, f"shard-{i:05d}"))["states"][:].copy()
+        for i in range(num_shards)
+    ]
+
+
+def test_shards_independent_of_workers(tmp_path):
+    """Test that the content of each shard does not depend on the worker count."""
+    main([str(tmp_path / "serial"), *ARGS, "--policy", "energy", "--noise", "0.1", "--workers", "1"])
+    main([str(tmp_path / "pool"), *ARGS, "--policy", "energy", "--noise", "0.1", "--workers", "2"])
+
+    serial, pool = read_shards(tmp_path / "serial"), read_shards(tmp_path / "pool")
+    for a, b in zip(serial, pool):
+        assert a.dtype == np.float32
+        assert 0 < len(a) <= 160  # Autoreset steps are not recorded
+        np.testing.assert_array_equal(a, b)
+    assert not np.array_equal(serial[0], serial[1])  # Shards are seeded differently
+
+
+def test_resume_skips_completed_shards(tmp_path):
+    """Test that a re-run only regenerates missing or unfinished shards."""
+    output = tmp_path / "data"
+    main([str(output), *ARGS, "--workers", "1"])
+    before = read_shards(output)
+    kept = os.path.getmtime(output / "shard-00000" / "meta.json")
+
+    # Simulate an interrupted run: shard 1 lost, shard 2 half-written
+    os.rename(output / "shard-00001", output / "shard-00001.tmp")
+    os.rename(output / "shard-00002", output / "shard-00002.tmp")
+    os.remove(output / "shard-00002.tmp" / "meta.json")
+    main([str(output), *ARGS, "--workers", "1"])
+
+    assert os.path.getmtime(output / "shard-00000" / "meta.json") == kept
+    assert not any(name.endswith(".tmp") for name in os.listdir(output))
+    for a, b in zip(before, read_shards(output)):
+        np.testing.assert_array_equal(a, b)
+
+
+def test_resume_rejects_different_settings(tmp_path):
+    """Test that resuming with other settings fails unless --overwrite is given."""
+    main([str(tmp_path), *ARGS, "--workers", "1"])
+    with pytest.raises(SystemExit, match="different settings"):
+        main([str(tmp_path), *ARGS, "--workers", "1", "--noise", "0.5"])
+
+    main([str(tmp_path), *ARGS, "--workers", "1", "--noise", "0.5", "--overwrite"])
+    with open(tmp_path / "config.json") as f:
+        assert json.load(f)["noise"] == 0.5
+
+
+def test_user_policy_and_env_kwargs(tmp_path):
+    """Test a module:factory policy and environment keyword arguments."""
+    main(
+        [
+            str(tmp_path),
+            *ARGS,
+            "--workers",
+            "1",
+            "--policy",
+            "gymnasium_cartpole_swingup.generate:zero_policy",
+            "--env-kwargs",
+            '{"time_limit": 5}',
+        ]
+    )
+    dataset = TransitionDataset(tmp_path / "shard-00000")
+    assert np.all(dataset["actions"][:] == 0)
+    assert np.all(dataset.episodes[:, 1] <= 5)
+
+
+def test_load_policy():
+    """Test resolution of built-in and user policies."""
+    assert load_policy("zero") is zero_policy
+    assert load_policy("gymnasium_cartpole_swingup.generate:zero_policy") is zero_policy
+    with pytest.raises(ValueError, match="Unknown policy"):
+        load_policy("greedy")
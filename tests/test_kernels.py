@@ -0,0 +1,72 @@
+"""Tests for the fused (optionally Numba-compiled) scalar step kernel."""
+
+import subprocess
+import sys
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, kernels
+
+
+def _run(env, states, actions):
+    results = []
+    for state, action in zip(states, actions):
+        env.state = tuple(float(v) for v in state)
+        obs, reward, terminated, truncated, _ = env.step(action)
+        results.append((np.asarray(env.state), reward, terminated))
+    return results
+
+
+@pytest.mark.parametrize("integrator", ["euler", "semi_implicit_euler", "rk4"])
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+def test_jit_step_matches_python_step(integrator, cost_mode):
+    """Test that jit=True reproduces the reference step for every integrator and cost mode."""
+    rng = np.random.default_rng(0)
+    states = rng.uniform([-2.5, -1.0, -np.pi, -3.0], [2.5, 1.0, np.pi, 3.0], size=(32, 4))
+    actions = rng.uniform(-1.0, 1.0, size=(32, 1)).astype(np.float32)
+
+    results = []
+    for jit in (False, True):
+        env = CartPoleSwingUpEnv(cost_mode=cost_mode, integrator=integrator, substeps=3, jit=jit)
+        env.reset(seed=0)
+        results.append(_run(env, states, actions))
+
+    for (state, reward, terminated), (jit_state, jit_reward, jit_terminated) in zip(*results):
+        np.testing.assert_allclose(jit_state, state, rtol=1e-12, atol=1e-12)
+        assert jit_reward == pytest.approx(reward, rel=1e-12, abs=1e-12)
+        assert jit_terminated == terminated
+        assert isinstance(jit_terminated, bool)
+
+
+def test_python_kernel_matches_compiled_kernel():
+    """Test that the compiled kernel agrees with its pure-Python source."""
+    pytest.importorskip("numba")
+    kernel, compiled = kernels._get_kernels()
+    assert compiled and kernel is not kernels.step_kernel
+    args = (0.3, -0.2, 2.5, 1.0, 4.0, 0.5, 0.5, 0.6, 9.82, 0.1, 0.1, 4, 2, 2.4, 1, 0.25)
+    np.testing.assert_allclose(kernel(*args), kernels.step_kernel(*args), rtol=1e-12)
+
+
+def test_numba_is_imported_only_for_jit():
+    """Test that importing the package and building jit=False environments skips Numba."""
+    code = (
+        "import sys, gymnasium_cartpole_swingup as g; g.CartPoleSwingUpEnv(); "
+        "print('numba' in sys.modules); g.CartPoleSwingUpEnv(jit=True); print('numba' in sys.modules)"
+    )
+    output = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True).stdout
+    assert output.split() == ["False", str(kernels.NUMBA_AVAILABLE)]
+
+
+def test_jit_with_custom_reward():
+    """Test that a custom reward function still overrides the kernel reward."""
+    env = CartPoleSwingUpEnv(jit=True, custom_reward_fn=lambda s, a, ns: 1.5)
+    env.reset(seed=0)
+    _, reward, _, _, _ = env.step(np.array([0.5], dtype=np.float32))
+    assert reward == 1.5
+
+
+def test_jit_invalid_cost_mode():
+    """Test that jit=True validates cost_mode eagerly."""
+    with pytest.raises(ValueError):
+        CartPoleSwingUpEnv(jit=True, cost_mode="invalid")
@@ -0,0 +1,136 @@
+"""Tests for the shared-memory multi-process vector environment."""
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpParallelVectorEnv,
+    CartPoleSwingUpVectorEnv,
+)
+
+
+@pytest.mark.parametrize("obs_mode", ["raw", "trig"])
+def test_matches_single_process_vector_env(obs_mode):
+    """Test that partitioning across workers does not change the trajectories."""
+    num_envs = 10
+    rng = np.random.default_rng(0)
+    initial_states = rng.normal([0.0, 0.0, np.pi, 0.0], 0.1, size=(num_envs, 4))
+
+    reference = CartPoleSwingUpVectorEnv(num_envs=num_envs, obs_mode=obs_mode, cost_mode="pilco")
+    envs = CartPoleSwingUpParallelVectorEnv(
+        num_envs=num_envs, num_workers=3, obs_mode=obs_mode, cost_mode="pilco"
+    )
+    try:
+        assert [s.stop - s.start for s in envs.slices] == [3, 3, 4]
+        assert envs.observation_space == reference.observation_space
+
+        expected_obs, _ = reference.reset(options={"initial_state": initial_states})
+        obs, _ = envs.reset(options={"initial_state": initial_states})
+        np.testing.assert_array_equal(obs, expected_obs)
+
+        # Autoreset draws come from per-worker generators, so compare first episodes only
+        done = np.zeros(num_envs, dtype=bool)
+        for _ in range(20):
+            actions = rng.uniform(-1.0, 1.0, size=(num_envs, 1)).astype(np.float32)
+            expected = reference.step(actions)
+            result = envs.step(actions)
+            for value, expected_value in zip(result[:4], expected[:4]):
+                assert value.dtype == expected_value.dtype
+                np.testing.assert_array_equal(value[~done], expected_value[~done])
+            np.testing.assert_array_equal(envs.state[~done], reference.state[~done])
+            done |= expected[2] | expected[3]
+        assert not done.all()
+    finally:
+        envs.close()
+
+
+def test_autoreset_and_shared_state_edits():
+    """Test that edits to the shared state reach the workers and autoreset follows."""
+    envs = CartPoleSwingUpParallelVectorEnv(num_envs=4, num_workers=2, time_limit=5)
+    try:
+        envs.reset(seed=0)
+        envs.state[1] = [10.0, 0.0, 0.0, 0.0]  # Off the track: terminates next step
+        _, _, terminated, truncated, _ = envs.step(np.zeros((4, 1)))
+        np.testing.assert_array_equal(terminated, [False, True, False, False])
+
+        _, rewards, terminated, truncated, _ = envs.step(np.zeros((4, 1)))
+        assert rewards[1] == 0.0 and not terminated[1]
+        assert abs(envs.state[1, 0]) < 1.0
+
+        for _ in range(3):
+            _, _, _, truncated, _ = envs.step(np.zeros((4, 1)))
+        np.testing.assert_array_equal(truncated, [True, False, True, True])
+    finally:
+        envs.close()
+
+
+def failing_reward(state, action, next_state):
+    """Module level, so that workers can unpickle it under the spawn start method."""
+    raise ZeroDivisionError("boom")
+
+
+def test_worker_error_is_raised():
+    """Test that an exception in a worker surfaces in the parent process."""
+    envs = CartPoleSwingUpParallelVectorEnv(num_envs=2, num_workers=2, custom_reward_fn=failing_reward)
+    envs.reset(seed=0)
+    with pytest.raises(RuntimeError, match="ZeroDivisionError"):
+        envs.step(np.zeros((2, 1)))
+    assert envs.closed
+
+
+def test_invalid_arguments_raise_in_parent():
+    """Test that invalid options are rejected before any worker starts."""
+    with pytest.raises(ValueError):
+        CartPoleSwingUpParallelVectorEnv(num_envs=2, cost_mode="invalid")
+
+
+def test_randomized_parameters_are_shared():
+    """Test that parameters drawn by the workers are visible in the parent."""
+    envs = CartPoleSwingUpParallelVectorEnv(
+        num_envs=6, num_workers=2, randomize={"pole_length": (0.3, 1.0)}
+    )
+    try:
+        envs.reset(seed=0)
+        lengths = envs.params.pole_length.copy()
+        assert len(np.unique(lengths)) == 6
+        envs.state[0] = [10.0, 0.0, 0.0, 0.0]  # Terminates, then autoresets
+        envs.step(np.zeros((6, 1)))
+        envs.step(np.zeros((6, 1)))
+        assert envs.params.pole_length[0] != lengths[0]
+        np.testing.assert_array_equal(envs.params.pole_length[1:], lengths[1:])
+    finally:
+        envs.close()
+
+
+def test_episode_statistics_match_single_process_vector_env():
+    """Test that workers report the same episode statistics through shared memory."""
+    num_envs = 6
+    initial_states = np.random.default_rng(0).normal([0.0, 0.0, 0.3, 0.0], 0.5, size=(num_envs, 4))
+    kwargs = {"num_envs": num_envs, "time_limit": 15, "episode_statistics": True}
+    reference = CartPoleSwingUpVectorEnv(**kwargs)
+    envs = CartPoleSwingUpParallelVectorEnv(num_workers=2, **kwargs)
+    try:
+        reference.reset(options={"initial_state": initial_states})
+        envs.reset(options={"initial_state": initial_states})
+        ended = np.zeros(num_envs, dtype=bool)
+        for _ in range(15):
+            actions = np.full((num_envs, 1), 0.5)
+            _, _, _, _, expected = reference.step(actions)
+            _, _, _, _, info = envs.step(actions)
+            # Autoreset draws differ per worker, so compare first episodes only
+            first = expected.get("_episode", np.zeros(num_envs, dtype=bool)) & ~ended
+            if not first.any():
+                continue
+            np.testing.assert_array_equal(info["_episode"][first], True)
+            for key, value in expected["episode"].items():
+                assert info["episode"][key].dtype == value.dtype
+                if key == "t":
+                    # Wall time is measured by each process
+                    assert np.all(info["episode"]["t"][first] > 0)
+                    continue
+                np.testing.assert_array_equal(info["episode"][key][first], value[first])
+            ended |= first
+        # Every first episode has ended by the time limit at the latest
+        assert ended.all()
+    finally:
+        envs.close()
@@ -0,0 +1,93 @@
+"""Tests for the zero-allocation (preallocate=True) step mode."""
+
+import tracemalloc
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv
+
+
+@pytest.mark.parametrize("obs_mode", ["raw", "trig"])
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+@pytest.mark.parametrize("integrator", ["euler", "rk4"])
+def test_matches_default_step(obs_mode, cost_mode, integrator):
+    """Test that the preallocated path reproduces the default step exactly."""
+    kwargs = {"obs_mode": obs_mode, "cost_mode": cost_mode, "integrator": integrator, "time_limit": 30}
+    env = CartPoleSwingUpEnv(**kwargs)
+    fast = CartPoleSwingUpEnv(preallocate=True, **kwargs)
+    env.reset(seed=0)
+    fast.reset(seed=0)
+    assert isinstance(fast.state, np.ndarray)
+    state = (0.1, -0.2, 3.0, 0.5)
+    env.state = state
+    fast.state = state
+
+    rng = np.random.default_rng(0)
+    for _ in range(30):
+        action = rng.uniform(-1.5, 1.5, size=1).astype(np.float32)
+        obs, reward, terminated, truncated, info = env.step(action)
+        fast_obs, fast_reward, fast_terminated, fast_truncated, fast_info = fast.step(action)
+        np.testing.assert_array_equal(fast_obs, obs)
+        np.testing.assert_array_equal(fast.state, np.asarray(env.state))
+        assert fast_reward == reward
+        assert (fast_terminated, fast_truncated) == (terminated, truncated)
+        assert fast_info == info
+        if terminated or truncated:
+            break
+
+
+def test_buffers_are_reused():
+    """Test that observations and info are written into the same objects."""
+    buffer = np.zeros(5, dtype=np.float32)
+    env = CartPoleSwingUpEnv(obs_mode="trig", obs_buffer=buffer)
+    obs, info = env.reset(seed=0)
+    assert obs is buffer
+    state = env.state
+    next_obs, _, _, _, next_info = env.step(np.array([0.5], dtype=np.float32))
+    assert next_obs is buffer and next_info is info and env.state is state
+    np.testing.assert_allclose(buffer[2] ** 2 + buffer[3] ** 2, 1.0, rtol=1e-6)
+
+
+@pytest.mark.skipif(not hasattr(tracemalloc, "reset_peak"), reason="needs Python 3.9+")
+@pytest.mark.parametrize("jit", [False, True])
+@pytest.mark.parametrize("obs_mode", ["raw", "trig"])
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+@pytest.mark.parametrize("integrator, substeps", [("euler", 1), ("rk4", 2)])
+def test_step_does_not_allocate(jit, obs_mode, cost_mode, integrator, substeps):
+    """Test with tracemalloc that a step allocates no memory, even transiently."""
+    env = CartPoleSwingUpEnv(
+        obs_mode=obs_mode,
+        cost_mode=cost_mode,
+        integrator=integrator,
+        substeps=substeps,
+        jit=jit,
+        preallocate=True,
+        time_limit=10**9,
+    )
+    env.reset(seed=0)
+    action = np.array([0.3], dtype=np.float32)
+    step = env.step
+    for _ in range(10):
+        step(action)
+
+    tracemalloc.start()
+    try:
+        for _ in range(20):
+            start, _ = tracemalloc.get_traced_memory()
+            tracemalloc.reset_peak()
+            step(action)
+            current, peak = tracemalloc.get_traced_memory()
+            assert (current - start, peak - start) == (0, 0)
+    finally:
+        tracemalloc.stop()
+
+
+def test_invalid_buffers():
+    """Test that unsupported modes and mismatched buffers are rejected."""
+    with pytest.raises(ValueError):
+        CartPoleSwingUpEnv(obs_mode="pixels", preallocate=True)
+    with pytest.raises(ValueError):
+        CartPoleSwingUpEnv(obs_mode="trig", obs_buffer=np.zeros(4, dtype=np.float32))
+    with pytest.raises(ValueError):
+        CartPoleSwingUpEnv(obs_buffer=np.zeros(4, dtype=np.float64))
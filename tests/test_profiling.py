@@ -0,0 +1,80 @@
+"""Tests for the opt-in per-phase profiling hooks."""
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpParallelVectorEnv,
+    CartPoleSwingUpVectorEnv,
+    PhaseProfiler,
+)
+
+STEP_PHASES = {"step.action", "step.dynamics", "step.reward", "step.termination", "step.observation"}
+
+
+def test_profiler_disabled_by_default():
+    """Test that environments do not profile unless asked to."""
+    env = gym.make("CartPoleSwingUp-v0")
+    assert env.unwrapped.profiler is None
+    assert CartPoleSwingUpVectorEnv(num_envs=2).profiler is None
+
+
+def test_step_and_render_phases():
+    """Test that every step and render phase is counted once per call."""
+    env = gym.make("CartPoleSwingUp-v0", profile=True, render_mode="rgb_array")
+    profiler = env.unwrapped.profiler
+    env.reset(seed=0)
+    for _ in range(5):
+        env.step(env.action_space.sample())
+    env.render()
+
+    snapshot = profiler.snapshot()
+    assert set(snapshot) >= STEP_PHASES
+    assert {"render.clear", "render.blit", "render.draw", "render.pixels"} <= set(snapshot)
+    for phase in STEP_PHASES:
+        assert snapshot[phase]["calls"] == 5
+        assert snapshot[phase]["total_s"] >= 0.0
+    assert snapshot["render.pixels"]["calls"] == 1
+    assert "step.dynamics" in profiler.report()
+
+    # Snapshots are copies; reset clears the live counters only
+    profiler.reset()
+    assert profiler.snapshot() == {}
+    assert snapshot["step.action"]["calls"] == 5
+
+
+def test_profiler_with_fake_clock():
+    """Test lap accounting and merging with a deterministic clock."""
+    ticks = iter([0.0, 1.0, 3.0, 6.0])
+    profiler = PhaseProfiler(clock=lambda: next(ticks))
+    lap = profiler.clock()
+    lap = profiler.lap("a", lap)
+    lap = profiler.lap("b", lap)
+    profiler.lap("a", lap)
+    assert profiler.snapshot() == {
+        "a": {"total_s": 4.0, "calls": 2, "mean_us": 2e6},
+        "b": {"total_s": 2.0, "calls": 1, "mean_us": 2e6},
+    }
+    profiler.merge(profiler.snapshot())
+    assert profiler.snapshot()["a"]["calls"] == 4
+
+
+def test_vector_env_phases():
+    """Test the batched and multi-process vector environments."""
+    envs = CartPoleSwingUpVectorEnv(num_envs=4, profile=True)
+    envs.reset(seed=0)
+    envs.step(np.zeros((4, 1)))
+    assert STEP_PHASES | {"step.autoreset"} <= set(envs.profiler.snapshot())
+
+    envs = CartPoleSwingUpParallelVectorEnv(num_envs=4, num_workers=2, profile=True)
+    try:
+        envs.reset(seed=0)
+        envs.step(np.zeros((4, 1)))
+        assert {"step.dispatch", "step.wait", "step.output"} <= set(envs.profiler.snapshot())
+        workers = envs.worker_profiles(reset=True)
+        assert len(workers) == 2
+        assert all(worker["step.dynamics"]["calls"] == 1 for worker in workers)
+        assert envs.worker_profiles() == [{}, {}]
+    finally:
+        envs.close()
@@ -0,0 +1,130 @@
+"""Tests for the streaming transition recorder and lazy dataset reader."""
+
+import time
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpVectorEnv,
+    RecordTransitions,
+    RecordTransitionsVector,
+    TransitionDataset,
+    TransitionRecorder,
+)
+
+
+def test_record_scalar_environment(tmp_path):
+    """Test that recorded episodes reproduce the stepped transitions."""
+    env = RecordTransitions(
+        gym.make("CartPoleSwingUp-v0", time_limit=30), tmp_path, dtype=np.float64, initial_capacity=8
+    )
+    rng = np.random.default_rng(0)
+    stepped = []
+    for episode in range(3):
+        env.reset(seed=episode)
+        done = False
+        while not done:
+            state = np.array(env.unwrapped.state, dtype=np.float64)
+            action = rng.uniform(-0.2, 0.2, size=1).astype(np.float32)  # Stays on the track
+            _, reward, terminated, truncated, _ = env.step(action)
+            stepped.append((state, action, reward, terminated, truncated))
+            done = terminated or truncated
+    env.close()
+
+    dataset = TransitionDataset(tmp_path)
+    assert len(dataset) == 3
+    assert dataset.num_transitions == len(stepped) == 90
+    assert dataset.metadata["num_transitions"] == 90
+    np.testing.assert_array_equal(dataset["states"], [s[0] for s in stepped])
+    np.testing.assert_array_equal(dataset["actions"], [s[1] for s in stepped])
+    np.testing.assert_array_equal(dataset["rewards"], [s[2] for s in stepped])
+    np.testing.assert_array_equal(dataset["states"][1:30], dataset["next_states"][:29])
+
+    episode = dataset[1]
+    assert episode["complete"] and episode["env_id"] == 0
+    assert len(episode["rewards"]) == 30
+    assert episode["truncated"][-1] and not episode["truncated"][:-1].any()
+    assert isinstance(episode["states"], np.memmap)
+
+
+def test_record_vector_environment(tmp_path):
+    """Test that vector episodes are stored contiguously and skip autoreset steps."""
+    num_envs = 4
+    envs = RecordTransitionsVector(
+        CartPoleSwingUpVectorEnv(num_envs=num_envs, time_limit=7), tmp_path, initial_capacity=4
+    )
+    envs.reset(seed=0)
+    envs.unwrapped.state[1] = [2.3, 5.0, 0.0, 0.0]  # Terminates on the first step
+    for _ in range(17):
+        envs.step(np.zeros((num_envs, 1)))
+    envs.close()
+
+    dataset = TransitionDataset(tmp_path)
+    episodes = list(dataset)
+    assert dataset.metadata["num_episodes"] == len(episodes)
+    # Every stored transition is a real one: 17 steps minus autoreset steps
+    for env_id in range(num_envs):
+        mine = [e for e in episodes if e["env_id"] == env_id]
+        assert sum(len(e["rewards"]) for e in mine) <= 17
+        for e in mine:
+            np.testing.assert_allclose(e["states"][1:], e["next_states"][:-1], rtol=1e-6)
+            if e["complete"]:
+                assert e["terminated"][-1] or e["truncated"][-1]
+            else:
+                assert not (e["terminated"] | e["truncated"]).any()
+    first = [e for e in episodes if e["env_id"] == 1][0]
+    assert len(first["rewards"]) == 1 and first["terminated"][0]
+    assert [len(e["rewards"]) for e in episodes if e["env_id"] == 0] == [7, 7, 1]
+
+
+def test_dataset_is_readable_while_recording(tmp_path):
+    """Test that flushed episodes are visible before the recorder is closed."""
+    recorder = TransitionRecorder(tmp_path, num_envs=2, flush_interval=0.0)
+    done = np.array([False, True])
+    for _ in range(3):
+        recorder.record(
+            np.zeros((2, 4)), np.zeros((2, 1)), np.ones(2), np.zeros((2, 4)), done, np.zeros(2, bool)
+        )
+    for _ in range(200):  # Wait for the background writer to publish
+        dataset = TransitionDataset(tmp_path)
+        if len(dataset) == 3:
+            break
+        time.sleep(0.01)
+    assert len(dataset) == 3 and dataset.metadata == {}
+    assert dataset.num_transitions == 3
+    recorder.close()
+    dataset = TransitionDataset(tmp_path)
+    assert len(dataset) == 4 and not dataset[3]["complete"] and len(dataset[3]["rewards"]) == 3
+
+
+def test_reset_mid_episode_ends_the_episode(tmp_path):
+    """Test that a manual reset stores the running episodes as incomplete ones."""
+    env = RecordTransitions(gym.make("CartPoleSwingUp-v0"), tmp_path / "scalar")
+    env.reset(seed=0)
+    for _ in range(5):
+        env.step(np.zeros(1, dtype=np.float32))
+    env.reset(seed=1)
+    for _ in range(3):
+        env.step(np.zeros(1, dtype=np.float32))
+    env.close()
+
+    dataset = TransitionDataset(tmp_path / "scalar")
+    np.testing.assert_array_equal(dataset.episodes, [[0, 5, 0, 0], [5, 3, 0, 0]])
+    for episode in dataset:
+        np.testing.assert_array_equal(episode["states"][1:], episode["next_states"][:-1])
+
+    envs = RecordTransitionsVector(CartPoleSwingUpVectorEnv(num_envs=2), tmp_path / "vector")
+    envs.reset(seed=0)
+    for _ in range(4):
+        envs.step(np.zeros((2, 1)))
+    envs.reset(seed=1)
+    envs.reset(seed=2)  # Nothing recorded in between: no empty episodes
+    envs.step(np.zeros((2, 1)))
+    envs.close()
+
+    dataset = TransitionDataset(tmp_path / "vector")
+    assert [(e["env_id"], len(e["rewards"]), e["complete"]) for e in dataset] == [
+        (0, 4, 0), (1, 4, 0), (0, 1, 0), (1, 1, 0)
+    ]
@@ -0,0 +1,172 @@
+"""Tests for the batched simulation server and its gymnasium.Env client."""
+
+import logging
+import socket
+import subprocess
+import sys
+import threading
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, batched_reward
+from gymnasium_cartpole_swingup.remote import RemoteCartPoleSwingUpEnv, SimulationServer
+
+requires_unix_sockets = pytest.mark.skipif(not hasattr(socket, "AF_UNIX"), reason="needs Unix domain sockets")
+
+
+@pytest.fixture
+def server():
+    server = SimulationServer(cost_mode="pilco", time_limit=50, max_batch_delay=0.001)
+    yield server
+    server.close()
+
+
+@requires_unix_sockets
+def test_client_matches_local_environment(server, tmp_path):
+    """Test that a remote episode reproduces CartPoleSwingUpEnv over a Unix socket."""
+    env = RemoteCartPoleSwingUpEnv(server.start_background(path=str(tmp_path / "sim.sock")))
+    local = CartPoleSwingUpEnv(cost_mode="pilco", time_limit=50)
+    try:
+        assert env.observation_space == local.observation_space
+        obs, _ = env.reset(seed=3)
+        expected, _ = local.reset(seed=3)
+        np.testing.assert_array_equal(obs, expected)
+
+        actions = np.random.default_rng(0).uniform(-1, 1, size=(50, 1)).astype(np.float32)
+        steps = 0
+        for action in actions:
+            steps += 1
+            obs, reward, terminated, truncated, _ = env.step(action)
+            expected, expected_reward, expected_terminated, expected_truncated, _ = local.step(action)
+            np.testing.assert_allclose(obs, expected, rtol=1e-5, atol=1e-6)
+            assert reward == pytest.approx(expected_reward, abs=1e-9)
+            assert (terminated, truncated) == (expected_terminated, expected_truncated)
+            if terminated:
+                break
+        assert truncated or terminated
+
+        stats = env.stats()
+        assert stats["steps"] == steps
+        assert stats["latency_p50_us"] > 0
+        assert env.server_stats()["steps"] == steps
+    finally:
+        env.close()
+
+
+def test_concurrent_clients_are_batched(server):
+    """Test that concurrent clients over TCP are advanced together and stay independent."""
+    address = server.start_background(port=0)
+    num_clients, num_steps = 6, 30
+    finals = [None] * num_clients
+
+    def actor(index):
+        env = RemoteCartPoleSwingUpEnv(address)
+        env.reset(options={"initial_state": [0.0, 0.0, np.pi, 0.0]})
+        for _ in range(num_steps):
+            obs, *_ = env.step(np.array([0.1 * index - 0.25], dtype=np.float32))
+        finals[index] = obs
+        env.close()
+
+    threads = [threading.Thread(target=actor, args=(i,)) for i in range(num_clients)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    # The server runs the batched functional dynamics; clients do not autoreset
+    states = np.tile([0.0, 0.0, np.pi, 0.0], (num_clients, 1))
+    actions = (0.1 * np.arange(num_clients) - 0.25).astype(np.float32).reshape(-1, 1)
+    for _ in range(num_steps):
+        states = server.func.transition(states, actions, None, server.params)
+    np.testing.assert_allclose(np.array(finals), states, rtol=1e-5, atol=1e-5)
+
+    stats = server.stats()
+    assert stats["steps"] == num_clients * num_steps
+    assert stats["mean_batch_size"] > 1.0
+
+
+def test_errors_are_reported_to_the_client(server):
+    """Test that server-side errors raise in the client without dropping the connection."""
+    env = RemoteCartPoleSwingUpEnv(server.start_background(port=0))
+    try:
+        with pytest.raises(RuntimeError, match="Call reset before"):
+            env.step(np.zeros(1, dtype=np.float32))
+        with pytest.raises(RuntimeError, match="initial_state must be"):
+            env.reset(options={"initial_state": [0.0, 0.0, 0.0]})
+        env.reset(seed=0)
+        env.step(np.zeros(1, dtype=np.float32))
+    finally:
+        env.close()
+
+    with pytest.raises(ValueError, match="batched_reward"):
+        SimulationServer(custom_reward_fn=lambda s, a, ns: 0.0)
+
+
+def test_command_announces_the_bound_address():
+    """Test that the server command prints its address once clients can connect."""
+    process = subprocess.Popen(
+        [sys.executable, "-m", "gymnasium_cartpole_swingup.remote", "--port", "0"],
+        stdout=subprocess.PIPE,
+        text=True,
+    )
+    try:
+        line = process.stdout.readline()
+        assert line.startswith("Serving on 127.0.0.1:")
+        port = int(line.rsplit(":", 1)[1])
+        assert port > 0  # The port actually bound, not the requested 0
+        env = RemoteCartPoleSwingUpEnv(("127.0.0.1", port))
+        env.reset(seed=0)
+        env.close()
+    finally:
+        process.kill()
+        process.wait()
+
+
+def test_failing_request_does_not_fail_its_batch():
+    """Test that an error while stepping a batch reaches only the client that caused it."""
+
+    @batched_reward
+    def reward(states, actions, next_states):
+        if (np.abs(next_states[:, 0]) > 100.0).any():
+            raise FloatingPointError("cart left the universe")
+        return np.zeros(len(states))
+
+    server = SimulationServer(custom_reward_fn=reward, max_batch_delay=0.2)
+    address = server.start_background(port=0)
+    results = {}
+
+    def actor(name, x):
+        env = RemoteCartPoleSwingUpEnv(address)
+        env.reset(options={"initial_state": [x, 0.0, np.pi, 0.0]})
+        try:
+            results[name] = env.step(np.zeros(1, dtype=np.float32))[1]
+        except RuntimeError as error:
+            results[name] = error
+        env.close()
+
+    try:
+        threads = [threading.Thread(target=actor, args=args) for args in [("good", 0.0), ("bad", 1e3)]]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert server.stats()["batches"] >= 1
+    finally:
+        server.close()
+    assert results["good"] == 0.0
+    assert "cart left the universe" in str(results["bad"])
+
+
+def test_close_with_connected_client(caplog):
+    """Test that closing the server disconnects clients without leaving tasks behind."""
+    server = SimulationServer()
+    env = RemoteCartPoleSwingUpEnv(server.start_background(port=0))
+    env.reset(seed=0)
+    with caplog.at_level(logging.ERROR, logger="asyncio"):
+        server.close()
+    assert server._thread is None
+    assert caplog.records == []
+    with pytest.raises(ConnectionError):
+        env.step(np.zeros(1, dtype=np.float32))
+    env.close()
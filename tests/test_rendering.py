@@ -0,0 +1,70 @@
+"""Tests for the NumPy batched rasterizer."""
+
+import sys
+
+import numpy as np
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, CartPoleSwingUpVectorEnv
+from gymnasium_cartpole_swingup.rendering import rasterize
+
+
+def test_rasterize_batch_shape_and_dtype():
+    """Test that a batch of states becomes a batch of RGB frames."""
+    states = np.random.default_rng(0).normal(size=(5, 4))
+    frames = rasterize(states, pole_length=0.6, width=84, height=64)
+    assert frames.shape == (5, 64, 84, 3)
+    assert frames.dtype == np.uint8
+
+    single = rasterize(states[0], pole_length=0.6, width=84, height=64)
+    assert single.shape == (64, 84, 3)
+    np.testing.assert_array_equal(single, frames[0])
+
+
+def test_rasterize_matches_pygame_renderer():
+    """Test that the rasterized scene agrees with the Pygame renderer."""
+    env = CartPoleSwingUpEnv(render_mode="rgb_array")
+    states = np.array([
+        [0.0, 0.0, 0.0, 0.0],
+        [0.3, 0.0, np.pi, 0.0],
+        [1.0, 0.0, 1.0, 0.0],
+        [-1.7, 0.0, -2.0, 0.0],
+    ])
+    frames = rasterize(states, pole_length=env.l)
+    for state, frame in zip(states, frames):
+        env.reset(options={"initial_state": state})
+        reference = env.render()
+        # Only anti-aliased edge pixels may differ noticeably
+        differs = np.any(np.abs(frame.astype(int) - reference) > 100, axis=2)
+        assert differs.sum() < 100
+    env.close()
+
+
+def test_rasterize_per_state_pole_length_and_buffer():
+    """Test per-state pole lengths and writing into a caller-provided buffer."""
+    states = np.zeros((2, 4))
+    out = np.zeros((2, 600, 600, 3), dtype=np.uint8)
+    frames = rasterize(states, pole_length=np.array([0.5, 1.0]), out=out)
+    assert frames is out
+
+    # Pole tips are black circles at the top of each (upright) pole
+    np.testing.assert_array_equal(frames[0, 299 - 60, 300], (0, 0, 0))
+    np.testing.assert_array_equal(frames[1, 299 - 120, 300], (0, 0, 0))
+    np.testing.assert_array_equal(frames[0, 299 - 120, 300], (255, 255, 255))
+
+
+def test_rasterize_off_screen_cart():
+    """Test that carts outside the visible range do not break rasterization."""
+    frames = rasterize(np.array([[10.0, 0.0, 0.0, 0.0], [-10.0, 0.0, 1.0, 0.0]]), 0.6, width=64, height=64)
+    # Only background and the track line remain
+    assert set(np.unique(frames)) <= {0, 255}
+
+
+def test_vector_env_render_does_not_use_pygame():
+    """Test that the vector env renders all sub-environments without Pygame."""
+    pygame_loaded = "pygame" in sys.modules
+    envs = CartPoleSwingUpVectorEnv(num_envs=3, render_mode="rgb_array")
+    envs.reset(seed=0)
+    frames = envs.render()
+    assert frames.shape == (3, 600, 600, 3)
+    assert ("pygame" in sys.modules) == pygame_loaded
@@ -0,0 +1,86 @@
+"""Tests for offline rendering of recorded state trajectories."""
+
+import importlib.util
+import os
+
+import numpy as np
+import pytest
+from gymnasium.error import DependencyNotInstalled
+
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpVectorEnv,
+    RecordTransitionsVector,
+    TransitionDataset,
+)
+from gymnasium_cartpole_swingup.rendering import rasterize
+from gymnasium_cartpole_swingup.replay import (
+    episode_states,
+    main,
+    render_frames,
+    render_videos,
+)
+
+
+def _trajectory(steps, seed=0):
+    rng = np.random.default_rng(seed)
+    states = np.zeros((steps, 4))
+    states[:, 0] = np.cumsum(rng.normal(0.0, 0.1, steps))
+    states[:, 2] = np.cumsum(rng.normal(0.0, 0.3, steps))
+    return states
+
+
+def test_render_frames_matches_rasterize():
+    """Test that the pool renders exactly the frames of rasterize, chunk boundaries included."""
+    states = _trajectory(23)
+    pole_length = np.linspace(0.4, 0.8, 23)
+    expected = rasterize(states, pole_length, x_threshold=2.4, width=48, height=40)
+
+    frames = render_frames(states, pole_length, x_threshold=2.4, width=48, height=40, workers=2, chunk_size=5)
+    np.testing.assert_array_equal(frames, expected)
+    serial = render_frames(states, pole_length, x_threshold=2.4, width=48, height=40, workers=1)
+    np.testing.assert_array_equal(serial, expected)
+    assert render_frames(np.zeros((0, 4)), 0.6, width=8, height=8).shape == (0, 8, 8, 3)
+
+
+def test_render_videos_writes_npy_files(tmp_path):
+    """Test one .npy frame file per trajectory with per-trajectory pole lengths."""
+    trajectories = [_trajectory(7, seed=0), _trajectory(12, seed=1)]
+    paths = [tmp_path / "a.npy", tmp_path / "b.npy"]
+    written = render_videos(
+        trajectories, paths, pole_length=[0.6, 0.9], width=32, height=32, workers=2, chunk_size=4
+    )
+
+    assert written == [str(path) for path in paths]
+    assert sorted(os.listdir(tmp_path)) == ["a.npy", "b.npy"]
+    for path, states, length in zip(paths, trajectories, [0.6, 0.9]):
+        np.testing.assert_array_equal(np.load(path), rasterize(states, length, width=32, height=32))
+
+    with pytest.raises(ValueError, match="Must be equal"):
+        render_videos(trajectories, paths[:1])
+
+
+@pytest.mark.skipif(importlib.util.find_spec("imageio") is not None, reason="imageio is installed")
+def test_video_formats_need_imageio(tmp_path):
+    """Test that video files fail early without the optional dependency."""
+    with pytest.raises(DependencyNotInstalled, match="video"):
+        render_videos([_trajectory(3)], [tmp_path / "a.mp4"], workers=1)
+    assert os.listdir(tmp_path) == []
+
+
+def test_render_command_renders_recorded_episodes(tmp_path):
+    """Test the command on selected episodes of a recorded dataset."""
+    envs = RecordTransitionsVector(CartPoleSwingUpVectorEnv(num_envs=2, time_limit=6), tmp_path / "data")
+    envs.reset(seed=0)
+    for _ in range(14):
+        envs.step(np.ones((2, 1)))
+    envs.close()
+    dataset = TransitionDataset(tmp_path / "data")
+
+    main([str(tmp_path / "data"), str(tmp_path / "out"), "--episodes", "0", "2", "--format", "npy",
+          "--width", "24", "--height", "24", "--workers", "1"])
+
+    assert sorted(os.listdir(tmp_path / "out")) == ["episode-00000.npy", "episode-00002.npy"]
+    states = episode_states(dataset[2])
+    assert len(states) == dataset.episodes[2, 1] + 1
+    frames = np.load(tmp_path / "out" / "episode-00002.npy")
+    np.testing.assert_array_equal(frames, rasterize(states, 0.6, width=24, height=24))
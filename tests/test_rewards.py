@@ -0,0 +1,66 @@
+"""Tests for the vectorized reward functions and the batched reward protocol."""
+
+import gymnasium as gym
+import numpy as np
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+from gymnasium_cartpole_swingup import (
+    CartPoleSwingUpEnv,
+    CartPoleSwingUpVectorEnv,
+    batched_reward,
+    default_reward,
+    pilco_reward,
+)
+
+
+def test_builtin_rewards_match_scalar_implementations():
+    """Test that the array rewards agree with the scalar env's reward methods."""
+    rng = np.random.default_rng(0)
+    states = np.column_stack([
+        rng.uniform(-2.0, 2.0, 32),
+        rng.uniform(-1.0, 1.0, 32),
+        rng.uniform(-np.pi, np.pi, 32),
+        rng.uniform(-3.0, 3.0, 32),
+    ])
+    env = CartPoleSwingUpEnv(pole_length=0.7, sigma_c=0.3)
+
+    default = default_reward(states)
+    pilco = pilco_reward(states, pole_length=0.7, sigma_c=0.3)
+    assert default.shape == (32,)
+    assert pilco.shape == (32,)
+    for i, state in enumerate(states):
+        np.testing.assert_allclose(default[i], env._compute_default_reward(state))
+        np.testing.assert_allclose(pilco[i], env._compute_pilco_reward(state))
+
+
+def test_batched_custom_reward_called_once_per_vector_step():
+    """Test that a batched reward receives whole arrays in a single call."""
+    calls = []
+
+    @batched_reward
+    def upright_bonus(states, actions, next_states):
+        calls.append((states.shape, actions.shape, next_states.shape))
+        return np.cos(next_states[:, 2]) - 0.1 * np.abs(actions[:, 0])
+
+    envs = CartPoleSwingUpVectorEnv(num_envs=16, custom_reward_fn=upright_bonus)
+    envs.reset(seed=0)
+    actions = np.full((16, 1), 0.5, dtype=np.float32)
+    _, rewards, _, _, _ = envs.step(actions)
+
+    assert calls == [((16, 4), (16, 1), (16, 4))]
+    np.testing.assert_allclose(rewards, np.cos(envs.state[:, 2]) - 0.05)
+
+
+def test_batched_custom_reward_in_single_environment():
+    """Test that a batched reward also works with the scalar environment."""
+    @batched_reward
+    def upright_bonus(states, actions, next_states):
+        assert states.shape == (1, 4)
+        return np.cos(next_states[:, 2]) * 2.0
+
+    env = gym.make("CartPoleSwingUp-v0", custom_reward_fn=upright_bonus)
+    env.reset(seed=42)
+    _, reward, _, _, _ = env.step(np.array([0.5]))
+
+    assert isinstance(reward, float)
+    np.testing.assert_allclose(reward, np.cos(env.unwrapped.state[2]) * 2.0)
@@ -0,0 +1,107 @@
+"""Tests for multi-step rollouts of action sequences."""
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, batched_reward
+
+START = (0.2, 0.5, 2.8, -0.3)
+
+
+def _stepped(env, actions):
+    """Reference results from repeated calls to step."""
+    results = []
+    for action in actions:
+        obs, reward, terminated, truncated, _ = env.step(action)
+        results.append((obs, reward, terminated, truncated))
+        if terminated or truncated:
+            break
+    return [np.array(values) for values in zip(*results)]
+
+
+@pytest.mark.parametrize("obs_mode", ["raw", "trig", "pixels"])
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+def test_rollout_matches_step(obs_mode, cost_mode):
+    """Test that a single-sequence rollout equals T calls to step."""
+    kwargs = {"obs_mode": obs_mode, "cost_mode": cost_mode, "pixel_width": 32, "pixel_height": 32}
+    env, reference = CartPoleSwingUpEnv(**kwargs), CartPoleSwingUpEnv(**kwargs)
+    for e in (env, reference):
+        e.reset(seed=0)
+        e.state = START
+    actions = np.random.default_rng(0).uniform(-1.0, 1.0, size=(25, 1)).astype(np.float32)
+
+    observations, rewards, terminated, truncated, info = env.rollout(actions)
+    expected = _stepped(reference, actions)
+    for value, expected_value in zip((observations, rewards, terminated, truncated), expected):
+        np.testing.assert_array_equal(value, expected_value)
+    assert observations.dtype == reference.observation_space.dtype
+    assert info == {}
+    # The environment continues from where the rollout ended
+    assert isinstance(env.state, tuple)
+    np.testing.assert_array_equal(env.state, reference.state)
+    assert env.t == reference.t
+
+
+def test_rollout_stops_at_termination_and_time_limit():
+    """Test that a rollout ends early when the episode ends."""
+    env = CartPoleSwingUpEnv(time_limit=10)
+    env.reset(seed=0)
+    env.state = (2.3, 5.0, np.pi, 0.0)
+    _, rewards, terminated, truncated, _ = env.rollout(np.ones((20, 1)))
+    assert len(rewards) < 10 and terminated[-1] and not terminated[:-1].any()
+
+    env.reset(seed=0)
+    _, rewards, terminated, truncated, _ = env.rollout(np.zeros((20, 1)))
+    assert len(rewards) == 10 and truncated[-1] and not terminated.any()
+
+
+def test_batched_rollout_matches_single_rollouts():
+    """Test that every row of a batched rollout matches a single-sequence rollout."""
+    env = CartPoleSwingUpEnv(obs_mode="trig", cost_mode="pilco", time_limit=40)
+    env.reset(seed=0)
+    env.state = START
+    env.t = 10
+    actions = np.random.default_rng(1).uniform(-1.0, 1.0, size=(6, 40, 1))
+    actions[0] = 1.0  # Drives the cart off the track
+
+    observations, rewards, terminated, truncated, info = env.rollout(actions)
+    assert observations.shape == (6, 40, 5)
+    assert rewards.shape == terminated.shape == truncated.shape == (6, 40)
+    assert env.state == START and env.t == 10  # Batched rollouts leave the env unchanged
+
+    for i in range(6):
+        single = CartPoleSwingUpEnv(obs_mode="trig", cost_mode="pilco", time_limit=40)
+        single.reset(seed=0)
+        single.state = START
+        single.t = 10
+        obs, rew, term, trunc, _ = single.rollout(actions[i])
+        length = info["lengths"][i]
+        assert length == len(rew)
+        np.testing.assert_allclose(observations[i, :length], obs, rtol=1e-6, atol=1e-6)
+        np.testing.assert_allclose(rewards[i, :length], rew, rtol=1e-10, atol=1e-12)
+        np.testing.assert_array_equal(terminated[i, :length], term)
+        np.testing.assert_array_equal(truncated[i, :length], trunc)
+        # Masked after the end: frozen observation, no reward, no flags
+        assert (observations[i, length:] == observations[i, length - 1]).all()
+        assert not rewards[i, length:].any()
+        assert not (terminated[i, length:] | truncated[i, length:]).any()
+    assert info["lengths"][0] < 30 and terminated[0].any()
+
+
+def test_batched_rollout_custom_rewards():
+    """Test per-transition and batched custom rewards in batched rollouts."""
+    def speed(state, action, next_state):
+        return abs(next_state[1])
+
+    @batched_reward
+    def batched_speed(states, actions, next_states):
+        return np.abs(next_states[:, 1])
+
+    actions = np.random.default_rng(2).uniform(-1.0, 1.0, size=(3, 15, 1))
+    results = []
+    for fn in (speed, batched_speed):
+        env = CartPoleSwingUpEnv(custom_reward_fn=fn)
+        env.reset(seed=0)
+        results.append(env.rollout(actions)[1])
+    np.testing.assert_allclose(results[0], results[1])
+    assert results[0].shape == (3, 15)
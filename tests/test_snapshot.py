@@ -0,0 +1,79 @@
+"""Tests for simulator snapshots and batched cloning."""
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, CartPoleSwingUpVectorEnv
+from gymnasium_cartpole_swingup.cartpole_swingup import SNAPSHOT_SIZE
+
+
+def _run(env, actions):
+    """Observations and rewards of ``actions`` followed by the initial state of a fresh reset."""
+    results = [(np.array(obs), reward) for obs, reward, *_ in map(env.step, actions)]
+    return results, np.array(env.reset()[0])
+
+
+@pytest.mark.parametrize("preallocate", [False, True])
+def test_snapshot_restores_trajectory_and_rng(preallocate):
+    """Test that restoring a snapshot replays steps, truncation and RNG draws exactly."""
+    env = CartPoleSwingUpEnv(time_limit=12, preallocate=preallocate)
+    env.reset(seed=5)
+    actions = np.random.default_rng(0).uniform(-1, 1, size=(8, 1)).astype(np.float32)
+    for action in actions:
+        env.step(action)
+
+    snapshot = env.get_state()
+    assert snapshot.shape == (SNAPSHOT_SIZE,)
+    assert snapshot[4] == 8
+
+    first, first_reset = _run(env, actions[:4])
+    env.set_state(snapshot)
+    second, second_reset = _run(env, actions[:4])
+    for (obs_a, reward_a), (obs_b, reward_b) in zip(first, second):
+        np.testing.assert_array_equal(obs_a, obs_b)
+        assert reward_a == reward_b
+    np.testing.assert_array_equal(first_reset, second_reset)
+
+    # The snapshot also transfers to another environment
+    other = CartPoleSwingUpEnv(time_limit=12)
+    other.reset(seed=99)
+    other.set_state(snapshot)
+    _, _, _, truncated, _ = other.step(actions[0])
+    assert other.t == 9 and not truncated
+
+    with pytest.raises(ValueError, match="Invalid snapshot shape"):
+        other.set_state(snapshot[:5])
+
+
+def test_vector_clone_matches_scalar_branches():
+    """Test forking one snapshot into K sub-environments, each following its own action."""
+    env = CartPoleSwingUpEnv()
+    env.reset(seed=1)
+    for _ in range(3):
+        env.step(np.array([0.5], dtype=np.float32))
+    snapshot = env.get_state()
+
+    num_branches = 5
+    envs = CartPoleSwingUpVectorEnv(num_envs=num_branches)
+    envs.reset(seed=0)
+    envs.set_state(snapshot)
+    np.testing.assert_array_equal(envs.get_state(), np.tile(snapshot, (num_branches, 1)))
+
+    actions = np.linspace(-1, 1, num_branches, dtype=np.float32).reshape(num_branches, 1)
+    _, rewards, _, _, _ = envs.step(actions)
+    for i in range(num_branches):
+        env.set_state(snapshot)
+        _, reward, _, _, _ = env.step(actions[i])
+        np.testing.assert_allclose(envs.state[i], env.state, rtol=1e-12, atol=1e-12)
+        assert rewards[i] == pytest.approx(reward, abs=1e-12)
+
+    # Row-wise restore and the shared generator
+    snapshots = envs.get_state()
+    envs.step(actions)
+    expected_reset = envs.reset()[0]
+    envs.set_state(snapshots)
+    envs.step(actions)
+    np.testing.assert_array_equal(envs.reset()[0], expected_reset)
+
+    with pytest.raises(ValueError, match="Invalid snapshot shape"):
+        envs.set_state(np.zeros((2, SNAPSHOT_SIZE)))
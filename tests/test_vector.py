@@ -0,0 +1,235 @@
+"""Tests for the batched CartPoleSwingUp vector environment."""
+
+import time
+
+import gymnasium as gym
+import numpy as np
+import pytest
+from gymnasium.wrappers.vector import RecordEpisodeStatistics
+
+import gymnasium_cartpole_swingup  # noqa: F401 - Required for environment registration
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, CartPoleSwingUpVectorEnv
+
+
+def test_make_vec_uses_vector_entry_point():
+    """Test that gym.make_vec picks up the native vector environment."""
+    envs = gym.make_vec("CartPoleSwingUp-v0", num_envs=8)
+    assert isinstance(envs.unwrapped, CartPoleSwingUpVectorEnv)
+    assert envs.unwrapped.t_limit == 1000
+
+    observations, info = envs.reset(seed=0)
+    assert observations.shape == (8, 4)
+    assert observations.dtype == np.float32
+    assert isinstance(info, dict)
+
+    observations, rewards, terminated, truncated, info = envs.step(
+        envs.action_space.sample()
+    )
+    assert observations.shape == (8, 4)
+    assert rewards.shape == (8,)
+    assert terminated.shape == (8,) and terminated.dtype == np.bool_
+    assert truncated.shape == (8,) and truncated.dtype == np.bool_
+
+
+@pytest.mark.parametrize("obs_mode", ["raw", "trig"])
+@pytest.mark.parametrize("cost_mode", ["default", "pilco"])
+def test_matches_single_environment(obs_mode, cost_mode):
+    """Test that every sub-environment follows the scalar environment."""
+    num_envs = 4
+    initial_states = np.array([
+        [0.0, 0.0, np.pi, 0.0],
+        [0.5, -0.2, np.pi / 4, 1.0],
+        [-1.0, 0.3, -np.pi / 2, -0.5],
+        [0.1, 0.0, 0.1, 0.0],
+    ])
+    envs = CartPoleSwingUpVectorEnv(num_envs=num_envs, obs_mode=obs_mode, cost_mode=cost_mode)
+    envs.reset(options={"initial_state": initial_states})
+    singles = [CartPoleSwingUpEnv(obs_mode=obs_mode, cost_mode=cost_mode) for _ in range(num_envs)]
+    for env, state in zip(singles, initial_states):
+        env.reset()
+        # reset() stores float32; use the exact float64 state the vector env holds
+        env.state = tuple(float(v) for v in state)
+
+    rng = np.random.default_rng(0)
+    done = np.zeros(num_envs, dtype=bool)
+    for _ in range(20):
+        actions = rng.uniform(-1.0, 1.0, size=(num_envs, 1)).astype(np.float32)
+        observations, rewards, terminated, truncated, _ = envs.step(actions)
+        for i, env in enumerate(singles):
+            if done[i]:
+                continue  # The vector env autoresets, the scalar env does not
+            obs, reward, term, trunc, _ = env.step(actions[i])
+            assert (term, trunc) == (terminated[i], truncated[i])
+            done[i] = term or trunc
+            np.testing.assert_allclose(observations[i], obs, rtol=1e-6, atol=1e-6)
+            np.testing.assert_allclose(rewards[i], reward, rtol=1e-9, atol=1e-9)
+
+
+def test_autoreset_next_step():
+    """Test that finished sub-environments are reset on the following step."""
+    envs = CartPoleSwingUpVectorEnv(num_envs=2, time_limit=3)
+    envs.reset(seed=0, options={"initial_state": [0.0, 0.0, np.pi, 0.0]})
+    actions = np.zeros((2, 1), dtype=np.float32)
+
+    for _ in range(2):
+        _, _, terminated, truncated, _ = envs.step(actions)
+        assert not terminated.any() and not truncated.any()
+
+    _, _, terminated, truncated, _ = envs.step(actions)
+    assert truncated.all() and not terminated.any()
+
+    # The next step only resets: zero reward and no termination flags
+    observations, rewards, terminated, truncated, _ = envs.step(actions)
+    np.testing.assert_array_equal(rewards, 0.0)
+    assert not terminated.any() and not truncated.any()
+    np.testing.assert_array_equal(envs.t, 0)
+    assert np.all(np.abs(np.abs(observations[:, 2]) - np.pi) < 0.5)
+
+
+def test_termination_per_environment():
+    """Test that termination is tracked independently for each sub-environment."""
+    envs = CartPoleSwingUpVectorEnv(num_envs=2)
+    envs.reset(options={"initial_state": [[2.39, 1.0, np.pi, 0.0], [0.0, 0.0, np.pi, 0.0]]})
+    _, _, terminated, truncated, _ = envs.step(np.zeros((2, 1), dtype=np.float32))
+    np.testing.assert_array_equal(terminated, [True, False])
+    np.testing.assert_array_equal(truncated, [False, False])
+
+
+def test_custom_reward_function():
+    """Test that a custom reward function is applied to every sub-environment."""
+    def custom_reward(state, action, next_state):
+        return np.cos(next_state[2]) * 2.0
+
+    envs = CartPoleSwingUpVectorEnv(num_envs=3, custom_reward_fn=custom_reward)
+    envs.reset(seed=1)
+    _, rewards, _, _, _ = envs.step(np.full((3, 1), 0.5, dtype=np.float32))
+    np.testing.assert_allclose(rewards, np.cos(envs.state[:, 2]) * 2.0)
+
+
+def test_invalid_modes():
+    """Test that invalid observation and cost modes are rejected."""
+    with pytest.raises(ValueError):
+        CartPoleSwingUpVectorEnv(num_envs=2, obs_mode="invalid")
+    with pytest.raises(ValueError):
+        CartPoleSwingUpVectorEnv(num_envs=2, cost_mode="invalid")
+
+
+def test_pixel_observations():
+    """Test that pixel observations are produced for every sub-environment."""
+    envs = gym.make_vec("CartPoleSwingUp-v0", num_envs=4, obs_mode="pixels", grayscale=True)
+    observations, _ = envs.reset(seed=0)
+    assert observations.shape == (4, 64, 64, 1)
+    assert observations.dtype == np.uint8
+    observations, _, _, _, _ = envs.step(np.zeros((4, 1), dtype=np.float32))
+    assert envs.observation_space.contains(observations)
+
+
+def test_domain_randomization():
+    """Test per-environment parameters, redrawn only for sub-environments that autoreset."""
+    envs = CartPoleSwingUpVectorEnv(
+        num_envs=6,
+        time_limit=100,
+        randomize={
+            "pole_length": (0.3, 1.0),
+            "gravity": lambda rng, n: rng.normal(9.82, 0.5, n),
+        },
+    )
+    envs.reset(seed=0)
+    lengths = envs.params.pole_length.copy()
+    assert lengths.shape == (6,) and np.all((lengths >= 0.3) & (lengths <= 1.0))
+    assert len(np.unique(lengths)) == 6
+    assert envs.params.cart_mass == 0.5  # Not randomized
+
+    # Each sub-environment steps with its own parameters
+    state = envs.state.copy()
+    actions = np.full((6, 1), 0.5, dtype=np.float32)
+    envs.step(actions)
+    expected = envs.func.transition(state, actions, None, envs.params)
+    np.testing.assert_array_equal(envs.state, expected)
+    single = CartPoleSwingUpEnv(pole_length=lengths[2], gravity=envs.params.gravity[2])
+    single.reset()
+    single.state = tuple(state[2])
+    single.step(actions[2])
+    np.testing.assert_allclose(envs.state[2], single.state, rtol=1e-10, atol=1e-10)
+
+    # Only the autoreset sub-environment draws new parameters
+    envs.state[4] = [10.0, 0.0, 0.0, 0.0]
+    _, _, terminated, _, _ = envs.step(actions)
+    assert terminated[4]
+    envs.step(actions)
+    changed = envs.params.pole_length != lengths
+    np.testing.assert_array_equal(changed, [False, False, False, False, True, False])
+
+    # A new reset redraws every sub-environment
+    envs.reset(seed=1)
+    assert np.all(envs.params.pole_length != lengths)
+
+    with pytest.raises(ValueError, match="Invalid randomize parameter"):
+        CartPoleSwingUpVectorEnv(num_envs=2, randomize={"x_threshold": (1.0, 2.0)})
+    with pytest.raises(ValueError, match="Invalid distribution"):
+        CartPoleSwingUpVectorEnv(num_envs=2, randomize={"pole_mass": (0.1, 0.2, 0.3)})
+
+
+def test_episode_statistics_match_per_step_bookkeeping():
+    """Test the vectorized episode statistics against a per-step Python reference."""
+    num_envs = 5
+    # Widely spread starting angles: some episodes terminate, some never reach the band
+    kwargs = {
+        "num_envs": num_envs,
+        "time_limit": 40,
+        "initial_state_mean": np.array([0.0, 0.0, 0.3, 0.0]),
+        "initial_state_noise": np.array([0.05, 0.05, 1.5, 0.05]),
+    }
+    envs = CartPoleSwingUpVectorEnv(episode_statistics=True, balance_angle=0.5, **kwargs)
+    recorded = RecordEpisodeStatistics(CartPoleSwingUpVectorEnv(**kwargs))
+    start = time.perf_counter()
+    envs.reset(seed=0)
+    recorded.reset(seed=0)
+    rng = np.random.default_rng(0)
+
+    running = [[] for _ in range(num_envs)]  # (reward, state) of each counted step
+    prev_done = np.zeros(num_envs, dtype=bool)
+    ended = never_upright = 0
+    for _ in range(150):
+        actions = rng.uniform(-1.0, 1.0, size=(num_envs, 1))
+        _, rewards, terminated, truncated, info = envs.step(actions)
+        _, _, _, _, recorded_info = recorded.step(actions)
+        done = terminated | truncated
+        for i in range(num_envs):
+            if not prev_done[i]:
+                running[i].append((rewards[i], envs.state[i].copy()))
+        if not done.any():
+            assert "episode" not in info
+            prev_done = done
+            continue
+
+        episode = info["episode"]
+        np.testing.assert_array_equal(info["_episode"], done)
+        assert set(recorded_info["episode"]) <= set(episode)
+        for key in ("r", "l"):
+            np.testing.assert_allclose(episode[key], recorded_info["episode"][key])
+        assert np.all((episode["t"][done] > 0) & (episode["t"][done] <= time.perf_counter() - start))
+        for i in np.flatnonzero(done):
+            steps_rewards, states = zip(*running[i])
+            states = np.array(states)
+            upright = np.abs(states[:, 2]) <= 0.5
+            assert episode["r"][i] == pytest.approx(sum(steps_rewards))
+            assert episode["l"][i] == len(states)
+            if upright.any():
+                assert episode["upright_time"][i] == pytest.approx((np.argmax(upright) + 1) * 0.1)
+            else:
+                assert np.isnan(episode["upright_time"][i])
+                never_upright += 1
+            assert episode["balanced_fraction"][i] == pytest.approx(upright.mean())
+            assert episode["max_excursion"][i] == pytest.approx(np.abs(states[:, 0]).max() / 2.4)
+            running[i] = []
+            ended += 1
+        for key in ("r", "l", "t", "balanced_fraction", "max_excursion"):
+            assert np.all(episode[key][~done] == 0)
+        prev_done = done
+    assert ended >= 2 * num_envs and never_upright > 0
+
+    # Disabled by default
+    plain = CartPoleSwingUpVectorEnv(num_envs=2, time_limit=1)
+    plain.reset(seed=0)
+    assert plain.step(np.zeros((2, 1)))[4] == {}
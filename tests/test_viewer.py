@@ -0,0 +1,69 @@
+"""Tests for the non-blocking live viewer."""
+
+import os
+import pickle
+import time
+
+import numpy as np
+import pytest
+
+from gymnasium_cartpole_swingup import CartPoleSwingUpEnv, LiveViewer
+
+
+@pytest.fixture(autouse=True)
+def headless(monkeypatch):
+    """Let the viewer process open its window without a display."""
+    monkeypatch.setenv("SDL_VIDEODRIVER", "dummy")
+
+
+def _wait_for(condition, timeout=20.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "viewer did not respond"
+        time.sleep(0.01)
+
+
+def test_async_human_rendering_does_not_throttle_step():
+    """Test that step returns immediately while the viewer shows the latest state."""
+    env = CartPoleSwingUpEnv(render_mode="human", async_render=True)
+    env.reset(seed=0)
+    start = time.perf_counter()
+    for _ in range(300):
+        env.step(np.zeros(1, dtype=np.float32))
+    # Paced to render_fps (50) this would take 6 seconds
+    assert time.perf_counter() - start < 2.0
+
+    viewer = env._viewer
+    assert viewer.published == 301  # reset and every step
+    _wait_for(lambda: viewer.shown >= 1)
+    assert viewer.shown <= viewer.published
+
+    # The viewer process is not part of a pickled environment
+    assert pickle.loads(pickle.dumps(env))._viewer is None
+    path = viewer._path
+    env.close()
+    assert env._viewer is None and viewer.closed
+    assert not os.path.exists(path)
+
+
+def test_viewer_drops_intermediate_states():
+    """Test that the viewer redraws at its own rate, skipping states published meanwhile."""
+    viewer = LiveViewer(pole_length=0.8, fps=20)
+    try:
+        state = np.zeros(4)
+        deadline = time.monotonic() + 20.0
+        while viewer.shown < 3 and time.monotonic() < deadline:
+            state[2] += 0.01
+            viewer.show(state)
+        assert viewer.shown >= 3
+        assert viewer.published > 10 * viewer.shown
+    finally:
+        viewer.close()
+
+    published, shown = viewer.published, viewer.shown
+    viewer.show(state)  # Ignored once closed
+    assert viewer.published == published
+    viewer.close()  # Closing twice is harmless
+    # The counters outlive the shared file
+    assert viewer.closed and viewer.shown == shown
+    assert viewer._memmap is None and not os.path.exists(viewer._path)